@@ -1,19 +1,36 @@
 from django.contrib import admin
+from . import search
 from .models import Post, Comment, Photo, Like
 
 
+class ContentSearchMixin(object):
+    """내용 검색을 LIKE '%...%' 대신 역색인(apps.search)으로 한다. (검색어가 너무 짧으면 LIKE)"""
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term.strip():
+            documents = search.get_backend().matches(self.search_kind, search_term)
+            if documents is not None:
+                return queryset.filter(pk__in=documents), False
+        return super().get_search_results(request, queryset, search_term)
+
+
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(ContentSearchMixin, admin.ModelAdmin):
     list_display = ('id', 'user', 'is_public', 'created_at', 'updated_at',)
     list_display_links = ('id',)
     search_fields = ('content',)
+    # F()로 증감하는 counter는 수정하지 않는다. (form을 열었을때 값으로 덮어쓰지 않게)
+    readonly_fields = ('like_count', 'comment_count', 'photo_count', 'view_count',)
+    search_kind = 'post'
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ContentSearchMixin, admin.ModelAdmin):
     list_display = ('id', 'user', 'post', 'created_at', 'updated_at',)
     list_display_links = ('id',)
     search_fields = ('content',)
+    search_kind = 'comment'
 
 
 @admin.register(Photo)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AppsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps'
+
+    def ready(self):
+        # counter 등을 갱신하는 signal 등록
+        from . import signals  # noqa: F401
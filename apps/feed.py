@@ -0,0 +1,67 @@
+from django.conf import settings
+from users.models import Follow
+from .models import Post, Feed
+
+
+def fans_out_on_write(user):
+    """
+    게시물 생성시 팔로워들의 timeline에 넣는 사용자인지 (팔로워 수가 FEED_FAN_OUT_LIMIT 이하)
+    팔로워 수가 많은 사용자는 넣지 않고 조회할때 가져온다.
+    """
+    return user.followers_count <= settings.FEED_FAN_OUT_LIMIT
+
+
+def fan_out_post(post):
+    """
+    게시물 생성시 작성자 본인과 작성자를 팔로우 한 사용자들의 timeline에 게시물 넣기 (fan-out-on-write)
+    """
+    batch_size = settings.FEED_FAN_OUT_BATCH_SIZE
+    Feed.objects.bulk_create(
+        [Feed(user_id=post.user_id, post=post, created_at=post.created_at)], ignore_conflicts=True
+    )
+    if not fans_out_on_write(post.user):
+        return
+
+    follower_ids = Follow.objects.filter(following_id=post.user_id).values_list('follower_id', flat=True)
+    feeds = []
+    for follower_id in follower_ids.iterator(chunk_size=batch_size):
+        feeds.append(Feed(user_id=follower_id, post=post, created_at=post.created_at))
+        if len(feeds) >= batch_size:
+            Feed.objects.bulk_create(feeds, ignore_conflicts=True)
+            feeds = []
+    if feeds:
+        Feed.objects.bulk_create(feeds, ignore_conflicts=True)
+
+
+def pull_posts(user_id, author_ids):
+    """
+    author_ids 사용자들의 최근 게시물을 user_id의 timeline에 넣기 (fan-out-on-read)
+    이미 들어가 있는 게시물은 무시한다.
+    """
+    if not author_ids:
+        return
+    feeds = []
+    for author_id in author_ids:
+        posts = Post.objects.filter(user_id=author_id).values_list('id', 'created_at')
+        feeds += [
+            Feed(user_id=user_id, post_id=post_id, created_at=created_at)
+            for post_id, created_at in posts[:settings.FEED_PULL_SIZE]
+        ]
+    Feed.objects.bulk_create(feeds, ignore_conflicts=True)
+
+
+def pull_fan_out_skipped_posts(user):
+    """
+    팔로워가 많아서 fan-out 되지 않은 사용자들의 게시물을 조회 시점에 가져와서 timeline에 합치기
+    (팔로우 한 사용자 중 해당되는 사용자가 없으면 쿼리 1번으로 끝난다.)
+    """
+    author_ids = list(Follow.objects.filter(
+        follower=user,
+        following__followers_count__gt=settings.FEED_FAN_OUT_LIMIT,
+    ).values_list('following_id', flat=True))
+    pull_posts(user.pk, author_ids)
+
+
+def remove_author_posts(user_id, author_id):
+    """언팔로우 했을때 해당 사용자의 게시물을 timeline에서 빼기"""
+    Feed.objects.filter(user_id=user_id, post__user_id=author_id).delete()
@@ -0,0 +1,330 @@
+"""
+좋아요 write-behind buffer (settings.LIKE_BUFFER_ENABLED)
+
+좋아요가 몰릴때 요청마다 Like row를 저장하지 않고 process 안의 buffer에 모았다가 한번에 저장한다.
+- (user, post)별로 마지막 요청(좋아요/취소)만 남긴다. (좋아요 -> 취소 -> 좋아요 는 좋아요 1번)
+- buffer가 LIKE_BUFFER_MAX_SIZE 개 이상이 되거나 LIKE_BUFFER_FLUSH_INTERVAL 초가 지나면
+  background thread가 bulk_create(ignore_conflicts) / DELETE로 저장하고 like_count를 다시 센다.
+- 응답은 buffer를 반영한다. (본인이 누른 좋아요는 바로 보이고, 다른 사용자의 좋아요는 저장된 다음에 보인다.)
+  좋아요 API 응답뿐 아니라 게시물 리스트/피드/상세 조회도 overlay(), pending_like_count()로
+  조회자 본인의 저장하지 않은 요청을 has_liked, like_count에 반영한다.
+  (buffer는 process마다 따로 있어서 다른 process가 받은 요청은 저장된 다음에 보인다.)
+
+장애시 동작
+- 요청은 buffer에 넣기 전에 journal 파일(LIKE_BUFFER_JOURNAL_DIR/{pid}.journal)에 먼저 기록한다.
+  process가 죽으면 다음에 buffer를 만드는 process가 주인 없는 journal을 가져와서 다시 저장한다.
+  (기본은 OS에 넘기는 것까지라 process가 죽어도 남고, LIKE_BUFFER_FSYNC=True 면 서버 전원이 꺼져도 남는다.)
+- 저장이 끝난 다음에 journal을 비우기 때문에 저장 도중 죽으면 같은 요청이 한번 더 저장될 수 있다.
+  좋아요/취소는 여러번 저장해도 결과가 같고 like_count는 다시 세기 때문에 값이 틀어지지 않는다.
+- 저장에 실패하면 buffer에 다시 넣고 다음 flush에서 재시도한다.
+"""
+import atexit
+import os
+import threading
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from core.cache import bump_version
+from core.counters import real_count
+from users.models import User
+from . import trending
+from .models import Post, Like
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+class LikeBuffer(object):
+    """
+    (user_id, post_id) -> 좋아요 여부(True: 좋아요, False: 취소)
+    여러 thread에서 같이 사용해도 되도록 lock을 건다.
+    journal_dir가 None이면 journal을 쓰지 않는다. (benchmark/테스트용)
+    """
+    def __init__(self, max_size=1000, journal_dir=None, fsync=False):
+        self.max_size = max_size
+        self.journal_dir = journal_dir
+        self.fsync = fsync
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._journal = None
+        if journal_dir is not None:
+            os.makedirs(journal_dir, exist_ok=True)
+            self.journal_path = os.path.join(journal_dir, f'{os.getpid()}.journal')
+            self.recover()
+
+    def add(self, user_id, post_id, liked):
+        """요청 추가 -> 이전에 buffer에 있던 값 (없으면 None)"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.write(f'{user_id} {post_id} {int(liked)}\n')
+                self._journal.flush()
+                if self.fsync:
+                    os.fsync(self._journal.fileno())
+            previous = self._pending.get((user_id, post_id))
+            self._pending[(user_id, post_id)] = liked
+            full = len(self._pending) >= self.max_size
+        if full:
+            self._wakeup.set()
+        return previous
+
+    def get(self, user_id, post_id):
+        """아직 저장하지 않은 요청 (없으면 None)"""
+        with self._lock:
+            return self._pending.get((user_id, post_id))
+
+    def get_many(self, user_id, post_ids):
+        """사용자의 아직 저장하지 않은 요청 {post_id: 좋아요 여부}"""
+        with self._lock:
+            if not self._pending:
+                return {}
+            return {
+                post_id: self._pending[(user_id, post_id)] for post_id in post_ids
+                if (user_id, post_id) in self._pending
+            }
+
+    def flush(self):
+        """buffer에 모인 요청 저장 -> 저장한 요청 수"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            try:
+                post_ids = save(pending)
+            except Exception:
+                with self._lock:
+                    # 저장하는 동안 들어온 요청이 더 최신이라 그대로 둔다.
+                    for key, liked in pending.items():
+                        self._pending.setdefault(key, liked)
+                raise
+            with self._lock:
+                self.rewrite_journal()
+            for post_id in post_ids:
+                bump_version(Post, post_id)
+            return len(pending)
+
+    def start(self, interval):
+        """interval 초마다(또는 buffer가 가득 차면) 저장하는 background thread 시작 (None이면 시작하지 않는다.)"""
+        if interval is None or self._worker is not None:
+            return
+        self._worker = threading.Thread(target=self.run, args=(interval,), name='like-buffer', daemon=True)
+        self._worker.start()
+
+    def run(self, interval):
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f'error : {e}')
+            finally:
+                close_old_connections()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def recover(self):
+        """
+        주인(process)이 없는 journal의 요청을 buffer로 가져오기
+        다른 process와 동시에 가져가지 않도록 파일 이름을 '{내 pid}.{원래 이름}'으로 바꾼 다음에 읽는다.
+        """
+        claimed = []
+        for name in sorted(os.listdir(self.journal_dir)):
+            if not name.endswith('.journal') or is_alive(name.split('.')[0]):
+                continue
+            path = os.path.join(self.journal_dir, f'{os.getpid()}.{name}')
+            try:
+                os.rename(os.path.join(self.journal_dir, name), path)
+            except FileNotFoundError:
+                continue
+            claimed.append(path)
+            with open(path) as journal:
+                for line in journal:
+                    try:
+                        user_id, post_id, liked = (int(value) for value in line.split())
+                    except ValueError:
+                        # 기록 도중 죽어서 잘린 마지막 줄
+                        continue
+                    self._pending[(user_id, post_id)] = bool(liked)
+        self.rewrite_journal()
+        for path in claimed:
+            if path != self.journal_path:
+                os.remove(path)
+
+    def rewrite_journal(self):
+        """journal을 아직 저장하지 않은 요청으로 다시 쓰기 (lock 안에서 호출한다.)"""
+        if self.journal_dir is None:
+            return
+        temp_path = f'{self.journal_path}.tmp'
+        with open(temp_path, 'w') as journal:
+            journal.writelines(f'{user_id} {post_id} {int(liked)}\n' for (user_id, post_id), liked in self._pending.items())
+            journal.flush()
+            os.fsync(journal.fileno())
+        if self._journal is not None:
+            self._journal.close()
+        os.replace(temp_path, self.journal_path)
+        self._journal = open(self.journal_path, 'a')
+
+
+def is_alive(pid):
+    if not pid.isdigit():
+        return False
+    if int(pid) == os.getpid():
+        # 같은 pid를 쓰던 이전 process의 journal
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def save(pending):
+    """
+    요청 저장 (좋아요: bulk_create, 취소: 게시물별 DELETE 1번) 후 like_count 다시 세기 -> like_count가 바뀐 게시물 id
+    ORM save()/delete()를 거치지 않기 때문에 like_count, 인기 게시물 구간 counter(apps.trending)는 signal 대신 여기서 바꾼다.
+    """
+    post_ids = {post_id for _, post_id in pending}
+    user_ids = {user_id for user_id, _ in pending}
+    table = connection.ops.quote_name(Like._meta.db_table)
+    now = timezone.now()
+    with transaction.atomic():
+        # 저장하기 전에 삭제된 게시물/사용자는 뺀다.
+        post_ids = set(Post.objects.filter(pk__in=post_ids).values_list('pk', flat=True))
+        user_ids = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+        # 이미 저장된 좋아요 (바뀌지 않는 요청은 건너뛰고, 취소한 좋아요의 created_at으로 구간 counter를 줄인다.)
+        stored = {
+            (user_id, post_id): created_at for user_id, post_id, created_at in Like.objects.filter(
+                post_id__in=post_ids, user_id__in=user_ids
+            ).values_list('user_id', 'post_id', 'created_at')
+        }
+        likes = []
+        unlikes = defaultdict(list)
+        activity = Counter()
+        for (user_id, post_id), liked in pending.items():
+            if post_id not in post_ids or user_id not in user_ids or liked == ((user_id, post_id) in stored):
+                continue
+            if liked:
+                likes.append(Like(user_id=user_id, post_id=post_id))
+                activity[(post_id, trending.bucket_of(now), 'like_count')] += 1
+            else:
+                unlikes[post_id].append(user_id)
+                activity[(post_id, trending.bucket_of(stored[(user_id, post_id)]), 'like_count')] -= 1
+
+        Like.objects.bulk_create(likes, batch_size=settings.LIKE_BUFFER_MAX_SIZE, ignore_conflicts=True)
+        with connection.cursor() as cursor:
+            for post_id, users in unlikes.items():
+                placeholders = ', '.join(['%s'] * len(users))
+                cursor.execute(f'DELETE FROM {table} WHERE post_id = %s AND user_id IN ({placeholders})', [post_id, *users])
+        Post.objects.filter(pk__in=post_ids).update(like_count=real_count(Like, 'post'), updated_at=now)
+        trending.record_many(activity)
+    return post_ids
+
+
+def get_buffer():
+    """process에서 같이 사용하는 buffer (처음 사용할때 만들고 background thread를 시작한다.)"""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = LikeBuffer(
+                max_size=settings.LIKE_BUFFER_MAX_SIZE,
+                journal_dir=settings.LIKE_BUFFER_JOURNAL_DIR,
+                fsync=settings.LIKE_BUFFER_FSYNC,
+            )
+            _buffer.start(settings.LIKE_BUFFER_FLUSH_INTERVAL)
+            # 정상 종료시 남은 요청 저장 (저장하지 못해도 journal에 남아있다.)
+            atexit.register(_buffer.flush)
+        return _buffer
+
+
+def like(user_id, post_id, buffer=None):
+    """좋아요 (apps.likes.like와 같은 값을 반환한다.) -> (상태가 바뀌었는지, 좋아요 수)"""
+    return change_like(user_id, post_id, True, buffer)
+
+
+def unlike(user_id, post_id, buffer=None):
+    """좋아요 취소 -> (상태가 바뀌었는지, 좋아요 수)"""
+    return change_like(user_id, post_id, False, buffer)
+
+
+def get_stored(user_id, post_id):
+    """저장된 (like_count, 사용자가 좋아요 했는지) (게시물이 없으면 Post.DoesNotExist)"""
+    row = Post.objects.filter(pk=post_id).annotate(
+        stored=Exists(Like.objects.filter(post=OuterRef('pk'), user_id=user_id))
+    ).values_list('like_count', 'stored').first()
+    if row is None:
+        raise Post.DoesNotExist
+    return row
+
+
+def apply(like_count, stored, liked):
+    """저장된 like_count에 아직 저장하지 않은 본인 요청 반영"""
+    return max(like_count + int(liked) - int(stored), 0)
+
+
+def change_like(user_id, post_id, liked, buffer=None):
+    """
+    buffer에 요청을 넣고 저장된 like_count에 본인 요청을 반영해서 반환한다. (쓰기 없이 읽기 쿼리 1번)
+    게시물이 없으면 Post.DoesNotExist
+    """
+    like_count, stored = get_stored(user_id, post_id)
+    if buffer is None:
+        buffer = get_buffer()
+    previous = buffer.add(user_id, post_id, liked)
+    if previous is None:
+        previous = stored
+    return previous != liked, apply(like_count, stored, liked)
+
+
+def get_pending(user_id, post_ids, buffer=None):
+    """
+    사용자의 아직 저장하지 않은 요청 {post_id: 좋아요 여부}
+    조회할때는 buffer를 새로 만들지 않는다. (이 process에서 받은 요청이 없으면 빈 dict)
+    """
+    if buffer is None:
+        buffer = _buffer
+    if buffer is None or user_id is None:
+        return {}
+    return buffer.get_many(user_id, post_ids)
+
+
+def overlay(user_id, posts, buffer=None):
+    """
+    리스트 조회한 게시물의 has_liked, like_count에 사용자의 아직 저장하지 않은 요청 반영 -> 반영한 요청 (ETag에 사용)
+    has_liked를 같이 읽지 않았을때만 저장된 좋아요를 쿼리 1번으로 확인한다. (반영할 요청이 없으면 쿼리 없음)
+    """
+    pending = get_pending(user_id, [post.pk for post in posts], buffer)
+    if not pending:
+        return {}
+    unknown = [post.pk for post in posts if post.pk in pending and not hasattr(post, 'has_liked')]
+    stored_ids = set(
+        Like.objects.filter(user_id=user_id, post_id__in=unknown).values_list('post_id', flat=True)
+    ) if unknown else set()
+    for post in posts:
+        if post.pk not in pending:
+            continue
+        stored = post.has_liked if hasattr(post, 'has_liked') else post.pk in stored_ids
+        liked = pending[post.pk]
+        post.has_liked = liked
+        # ?fields=로 like_count를 읽지 않았으면 그대로 둔다. (읽으려고 쿼리가 나가지 않게)
+        if 'like_count' not in post.get_deferred_fields():
+            post.like_count = apply(post.like_count, stored, liked)
+    return pending
+
+
+def pending_like_count(user_id, post_id, buffer=None):
+    """상세 조회 like_count에 사용자의 아직 저장하지 않은 요청 반영 (반영할 요청이 없으면 None, 쿼리 없음)"""
+    liked = get_pending(user_id, [post_id], buffer).get(post_id)
+    if liked is None:
+        return None
+    like_count, stored = get_stored(user_id, post_id)
+    return apply(like_count, stored, liked)
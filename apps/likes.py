@@ -0,0 +1,91 @@
+"""
+게시물 좋아요 / 좋아요 취소 (여러번 호출해도 결과가 같다.)
+
+Like에는 (user, post) unique 제약이 있어서 동시에 두번 눌러도 한번만 저장된다.
+- PostgreSQL: INSERT ... ON CONFLICT DO NOTHING(취소는 DELETE)과 like_count 변경을 CTE로 묶어서 쿼리 1번으로 처리한다.
+- 그 외: INSERT OR IGNORE(취소는 DELETE) 후 실제로 row가 바뀐 경우에만 counter를 바꾸고 좋아요 수를 읽는다.
+
+ORM save()/delete()를 거치지 않기 때문에 like_count, 인기 게시물 구간 counter(apps.trending)는 signal 대신 여기서 바꾼다.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+from core.cache import bump_version
+from core.counters import change_counter
+from . import trending
+from .models import Post, Like
+
+POSTGRESQL_SQL = '''
+WITH changed AS ({statement} RETURNING created_at)
+UPDATE {post}
+SET like_count = GREATEST(like_count + %s * (SELECT COUNT(*) FROM changed), 0),
+    updated_at = CASE WHEN EXISTS (SELECT 1 FROM changed) THEN %s ELSE updated_at END
+WHERE id = %s
+RETURNING (SELECT COUNT(*) FROM changed), like_count, (SELECT MAX(created_at) FROM changed)
+'''
+
+
+def like(user_id, post_id):
+    """좋아요 (이미 좋아요 한 상태면 아무것도 바뀌지 않는다.) -> (새로 저장되었는지, 좋아요 수)"""
+    ops = connection.ops
+    table = ops.quote_name(Like._meta.db_table)
+    if connection.vendor == 'postgresql':
+        statement = (
+            f'INSERT INTO {table} (user_id, post_id, created_at) VALUES (%s, %s, %s) '
+            f'ON CONFLICT (user_id, post_id) DO NOTHING'
+        )
+    else:
+        statement = (
+            f'{ops.insert_statement(ignore_conflicts=True)} {table} (user_id, post_id, created_at) '
+            f'VALUES (%s, %s, %s) {ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}'
+        )
+    now = timezone.now()
+    changed, like_count, _ = change_like(
+        statement, [user_id, post_id, ops.adapt_datetimefield_value(now)], user_id, post_id, 1
+    )
+    if changed:
+        trending.record(post_id, 'like_count', 1, now)
+    return changed, like_count
+
+
+def unlike(user_id, post_id):
+    """좋아요 취소 (좋아요 하지 않은 상태면 아무것도 바뀌지 않는다.) -> (삭제되었는지, 좋아요 수)"""
+    table = connection.ops.quote_name(Like._meta.db_table)
+    statement = f'DELETE FROM {table} WHERE user_id = %s AND post_id = %s'
+    changed, like_count, created_at = change_like(statement, [user_id, post_id], user_id, post_id, -1)
+    if changed:
+        trending.record(post_id, 'like_count', -1, created_at)
+    return changed, like_count
+
+
+def change_like(statement, params, user_id, post_id, amount):
+    """
+    좋아요 row 변경 + like_count 변경 -> (row가 바뀌었는지, 좋아요 수, 바뀐 좋아요의 created_at)
+    게시물이 없으면 Post.DoesNotExist (변경은 rollback 된다.)
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            sql = POSTGRESQL_SQL.format(statement=statement, post=connection.ops.quote_name(Post._meta.db_table))
+            now = connection.ops.adapt_datetimefield_value(timezone.now())
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params + [amount, now, post_id])
+                row = cursor.fetchone()
+            if row is None:
+                raise Post.DoesNotExist
+            changed, like_count, created_at = bool(row[0]), row[1], row[2]
+            if changed:
+                bump_version(Post, post_id)
+            return changed, like_count, created_at
+
+        created_at = None
+        if amount < 0:
+            # 취소한 좋아요가 들어있는 인기 게시물 구간을 찾기 위해서 지우기 전에 읽는다.
+            created_at = Like.objects.filter(user_id=user_id, post_id=post_id).values_list('created_at', flat=True).first()
+        with connection.cursor() as cursor:
+            cursor.execute(statement, params)
+            changed = cursor.rowcount > 0
+        if changed and not change_counter(Post, post_id, 'like_count', amount):
+            raise Post.DoesNotExist
+        like_count = Post.objects.filter(pk=post_id).values_list('like_count', flat=True).first()
+        if like_count is None:
+            raise Post.DoesNotExist
+        return changed, like_count, created_at
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.4 on 2026-10-18 07:45
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_post_counters(apps, schema_editor):
+    Post = apps.get_model('apps', 'Post')
+    counters = {
+        'like_count': apps.get_model('apps', 'Like'),
+        'comment_count': apps.get_model('apps', 'Comment'),
+        'photo_count': apps.get_model('apps', 'Photo'),
+    }
+    for field, model in counters.items():
+        rows = model.objects.filter(post=OuterRef('pk')).order_by().values('post')
+        Post.objects.update(**{
+            field: Coalesce(Subquery(rows.annotate(count=Count('pk')).values('count')), 0)
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0003_auto_20210802_2317'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='photo_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_post_counters, migrations.RunPython.noop),
+    ]
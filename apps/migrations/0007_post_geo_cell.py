@@ -0,0 +1,59 @@
+# Generated by Django 3.2.4 on 2026-10-18 07:49
+
+from django.db import migrations, models
+
+# migration을 만들때의 GEO_CELL_PRECISION, core.geo.encode (나중에 바뀌어도 이 migration의 결과는 바뀌지 않게 복사해둔다.)
+GEO_CELL_PRECISION = 8
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode(lat, lng, precision):
+    lat = max(-90.0, min(90.0, float(lat)))
+    lng = (float(lng) + 180.0) % 360.0 - 180.0
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash = []
+    bit, ch, even = 0, 0, True
+    while len(geohash) < precision:
+        value, current = (lng, lng_range) if even else (lat, lat_range)
+        mid = (current[0] + current[1]) / 2
+        if value >= mid:
+            ch |= 1 << (4 - bit)
+            current[0] = mid
+        else:
+            current[1] = mid
+        even = not even
+        if bit < 4:
+            bit += 1
+        else:
+            geohash.append(BASE32[ch])
+            bit, ch = 0, 0
+    return ''.join(geohash)
+
+
+def fill_geo_cell(apps, schema_editor):
+    Post = apps.get_model('apps', 'Post')
+    posts = []
+    for post in Post.objects.only('id', 'lat', 'lng').iterator(chunk_size=1000):
+        post.geo_cell = encode(post.lat, post.lng, GEO_CELL_PRECISION)
+        posts.append(post)
+        if len(posts) >= 1000:
+            Post.objects.bulk_update(posts, ['geo_cell'])
+            posts = []
+    if posts:
+        Post.objects.bulk_update(posts, ['geo_cell'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0006_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='geo_cell',
+            field=models.CharField(blank=True, db_index=True, max_length=12),
+        ),
+        migrations.RunPython(fill_geo_cell, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 3.2.4 on 2026-10-18 07:57
+
+import math
+from collections import Counter
+import django.db.models.deletion
+from django.db import migrations, models
+
+# migration을 만들때의 TILE_CELL_BITS, TILE_MAX_ZOOM, core.geo.tile_index
+# (나중에 바뀌어도 이 migration의 결과는 바뀌지 않게 복사해둔다.)
+TILE_CELL_BITS = 3
+TILE_MAX_ZOOM = 15
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def tile_index(lat, lng, zoom):
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, float(lat)))
+    lng = (float(lng) + 180.0) % 360.0 - 180.0
+    count = 1 << zoom
+    lat_rad = math.radians(lat)
+    x = int((lng + 180.0) / 360.0 * count)
+    y = int((1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * count)
+    return min(max(x, 0), count - 1), min(max(y, 0), count - 1)
+
+
+def fill_post_tile_cells(apps, schema_editor):
+    Post = apps.get_model('apps', 'Post')
+    PostTileCell = apps.get_model('apps', 'PostTileCell')
+    levels = range(TILE_CELL_BITS, TILE_MAX_ZOOM + TILE_CELL_BITS + 1)
+    counts, representatives = Counter(), {}
+    for pk, lat, lng in Post.objects.filter(is_public=True).values_list('id', 'lat', 'lng').iterator():
+        for level in levels:
+            key = (level,) + tile_index(lat, lng, level)
+            counts[key] += 1
+            representatives.setdefault(key, pk)
+    PostTileCell.objects.bulk_create([
+        PostTileCell(level=level, x=x, y=y, count=count, post_id=representatives[(level, x, y)])
+        for (level, x, y), count in counts.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0007_post_geo_cell'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostTileCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.PositiveSmallIntegerField()),
+                ('x', models.PositiveIntegerField()),
+                ('y', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('post', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='apps.post')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='posttilecell',
+            constraint=models.UniqueConstraint(fields=('level', 'x', 'y'), name='post_tile_cell_unique'),
+        ),
+        migrations.RunPython(fill_post_tile_cells, migrations.RunPython.noop),
+    ]
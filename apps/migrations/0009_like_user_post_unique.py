@@ -0,0 +1,35 @@
+# Generated by Django 3.2.4 on 2026-10-18 08:11
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_likes(apps, schema_editor):
+    """unique 제약을 추가하기 전에 중복 좋아요는 처음 것만 남기고 삭제하고 해당 게시물의 like_count를 다시 센다."""
+    Like = apps.get_model('apps', 'Like')
+    Post = apps.get_model('apps', 'Post')
+    duplicates = (
+        Like.objects.order_by().values('user_id', 'post_id')
+        .annotate(first_id=Min('id'), count=Count('id')).filter(count__gt=1)
+    )
+    post_ids = set()
+    for row in list(duplicates):
+        Like.objects.filter(user_id=row['user_id'], post_id=row['post_id']).exclude(id=row['first_id']).delete()
+        post_ids.add(row['post_id'])
+    for post_id in post_ids:
+        Post.objects.filter(pk=post_id).update(like_count=Like.objects.filter(post_id=post_id).count())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0008_post_tile_cell'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_likes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='like',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='like_user_post_unique'),
+        ),
+    ]
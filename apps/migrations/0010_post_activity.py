@@ -0,0 +1,32 @@
+# Generated by Django 3.2.4 on 2026-10-18 08:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0009_like_user_post_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('like_count', models.PositiveIntegerField(default=0)),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='apps.post')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='postactivity',
+            index=models.Index(fields=['bucket'], name='post_activity_bucket_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='postactivity',
+            constraint=models.UniqueConstraint(fields=('post', 'bucket'), name='post_activity_unique'),
+        ),
+    ]
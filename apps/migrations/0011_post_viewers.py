@@ -0,0 +1,26 @@
+# Generated by Django 3.2.4 on 2026-10-18 08:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0010_post_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostViewers',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='apps.post')),
+                ('registers', models.BinaryField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
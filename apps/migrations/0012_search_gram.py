@@ -0,0 +1,50 @@
+# Generated by Django 3.2.4 on 2026-10-18 08:34
+
+from django.db import migrations, models
+
+
+def build_search_index(apps, schema_editor):
+    """이미 있는 게시물/댓글 내용으로 역색인 만들기"""
+    from apps.search import tokenize
+    SearchGram = apps.get_model('apps', 'SearchGram')
+    for kind, model_name in ((1, 'Post'), (2, 'Comment')):
+        model = apps.get_model('apps', model_name)
+        rows = []
+        for pk, content in model.objects.order_by().values_list('pk', 'content').iterator(chunk_size=2000):
+            rows += [
+                SearchGram(kind=kind, object_id=pk, gram=gram, count=min(count, 32767))
+                for gram, count in tokenize(content).items()
+            ]
+            if len(rows) >= 5000:
+                SearchGram.objects.bulk_create(rows)
+                rows = []
+        SearchGram.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0011_post_viewers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, '게시물'), (2, '댓글')])),
+                ('object_id', models.BigIntegerField()),
+                ('gram', models.CharField(max_length=8)),
+                ('count', models.PositiveSmallIntegerField(default=1)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='searchgram',
+            index=models.Index(fields=['kind', 'gram', 'object_id'], name='search_gram_lookup_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='searchgram',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id', 'gram'), name='search_gram_unique'),
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,10 @@
 import os
 from uuid import uuid4
+from django.conf import settings
 from django.utils import timezone
 from django.db import models
+from django.db.models import Q
+from core import geo
 
 
 def get_photo_path(instance, filename):
@@ -13,20 +16,101 @@ def get_photo_path(instance, filename):
     return '/'.join([url, ymd_path, uuid_name + extension])
 
 
+class PostQuerySet(models.QuerySet):
+    def within(self, lat, lng, radius):
+        """
+        (lat, lng) 중심으로 +-radius(도) 범위 안의 게시물
+        geo_cell index로 범위를 덮는 칸들만 먼저 고르고, 그 안에서 정확한 범위를 확인한다.
+        """
+        lat, lng, radius = float(lat), float(lng), float(radius)
+        queryset = self.filter(
+            lat__gte=lat - radius,
+            lat__lte=lat + radius,
+            lng__gte=lng - radius,
+            lng__lte=lng + radius,
+        )
+        precision = geo.choose_precision(radius, settings.GEO_CELL_PRECISION)
+        if precision is None:
+            return queryset
+        cells = geo.covering_cells(lat - radius, lng - radius, lat + radius, lng + radius, precision)
+        if precision == settings.GEO_CELL_PRECISION:
+            cell_filter = Q(geo_cell__in=cells)
+        else:
+            # 저장된 geo_cell보다 큰 칸은 prefix 범위로 찾는다. ('{'는 'z' 다음 문자)
+            cell_filter = Q()
+            for cell in cells:
+                cell_filter |= Q(geo_cell__gte=cell, geo_cell__lt=cell + '{')
+        # 정렬(ORDER BY)이 붙어도 geo_cell index를 타도록 후보 id는 정렬 없는 subquery로 고른다.
+        candidates = Post.objects.order_by().filter(cell_filter).values('pk')
+        return queryset.filter(pk__in=candidates)
+
+    def nearest(self, lat, lng, limit):
+        """
+        (lat, lng)에서 가까운 순서로 limit개의 (게시물 id, 거리(미터)) 목록
+        작은 범위부터 찾아보고 확실하게 가까운 게시물이 limit개가 안되면 범위를 2배씩 넓힌다.
+        """
+        lat, lng = float(lat), float(lng)
+        radius = settings.POST_NEARBY_RADIUS
+        while True:
+            rows = self.order_by().within(lat, lng, radius).values_list('id', 'lat', 'lng')
+            ranked = sorted((geo.distance(lat, lng, row_lat, row_lng), pk) for pk, row_lat, row_lng in rows)
+            # 사각형 안에 완전히 들어가는 원 안쪽의 게시물만 순서가 확실하다.
+            inner = geo.box_inner_radius(lat, radius)
+            confirmed = [row for row in ranked if row[0] <= inner]
+            if len(confirmed) >= limit or radius >= settings.POST_NEARBY_MAX_RADIUS:
+                result = confirmed if len(confirmed) >= limit else ranked
+                return [(pk, meters) for meters, pk in result[:limit]]
+            radius = min(radius * 2, settings.POST_NEARBY_MAX_RADIUS)
+
+
 class Post(models.Model):
     user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='posts')
     content = models.TextField(blank=True)
 
     lat = models.DecimalField(max_digits=10, decimal_places=6, blank=True)
     lng = models.DecimalField(max_digits=10, decimal_places=6, blank=True)
+    # 위치 검색용 geohash (save()에서 lat, lng로 계산)
+    geo_cell = models.CharField(max_length=12, blank=True, db_index=True)
 
     is_public = models.BooleanField(default=True)
 
+    # 집계 값 캐시 (Like/Comment/Photo 생성, 삭제시 apps.signals에서 F()로 증감)
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    photo_count = models.PositiveIntegerField(default=0)
+    # 조회한 사용자 수 추정 값 (PostViewers의 HyperLogLog로 계산해서 apps.viewers에서 저장)
+    view_count = models.PositiveIntegerField(default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # cursor pagination 조회 키 (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='post_created_id_idx'),
+        ]
+
+    objects = PostQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        self.geo_cell = self.get_geo_cell()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and ('lat' in update_fields or 'lng' in update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geo_cell'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # 위치/공개 여부가 바뀌었는지 확인하기 위해서 DB에서 읽은 값을 보관한다. (apps.tiles)
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def get_geo_cell(self):
+        if self.lat in (None, '') or self.lng in (None, ''):
+            return ''
+        return geo.encode(self.lat, self.lng, settings.GEO_CELL_PRECISION)
 
 
 class Comment(models.Model):
@@ -38,6 +122,9 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='comment_created_id_idx'),
+        ]
 
 
 class Photo(models.Model):
@@ -48,6 +135,77 @@ class Photo(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='photo_created_id_idx'),
+        ]
+
+
+class PostTileCell(models.Model):
+    """
+    지도 tile 안의 칸별 공개 게시물 수
+    level은 web mercator zoom level 이고 (x, y)는 그 level에서의 칸 번호이다.
+    게시물 생성/수정/삭제시 apps.tiles에서 증감한다.
+    """
+    level = models.PositiveSmallIntegerField()
+    x = models.PositiveIntegerField()
+    y = models.PositiveIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    # 칸을 대표하는 게시물 (지도에서 cluster를 눌렀을때 보여줄 게시물)
+    post = models.ForeignKey(Post, null=True, on_delete=models.SET_NULL, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['level', 'x', 'y'], name='post_tile_cell_unique'),
+        ]
+
+
+class PostActivity(models.Model):
+    """
+    게시물별 시간 구간(TRENDING_BUCKET_SECONDS) 좋아요/댓글 수 (인기 게시물 점수 계산용 - apps.trending)
+    bucket은 구간 시작 시각이다. 좋아요/댓글 생성, 삭제시 증감하고 TRENDING_WINDOW_SECONDS 보다 오래된 구간은 지운다.
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    bucket = models.DateTimeField()
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'bucket'], name='post_activity_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket'], name='post_activity_bucket_idx'),
+        ]
+
+
+class PostViewers(models.Model):
+    """
+    게시물을 조회한 사용자 HyperLogLog register (zlib 압축, core.sketch.HyperLogLog)
+    조회할때마다 row를 저장하지 않고 process에서 모았다가 apps.viewers에서 합쳐서 저장한다.
+    """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    registers = models.BinaryField()
+
+
+class Feed(models.Model):
+    """
+    사용자별 home timeline
+    게시물이 생성될때 작성자를 팔로우 한 사용자들의 timeline에 미리 넣어둔다. (fan-out-on-write)
+    created_at은 게시물의 created_at을 그대로 복사해서 timeline 정렬/cursor 조회에 사용한다.
+    """
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='feeds')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='feeds')
+
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'], name='feed_user_post_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='feed_user_created_id_idx'),
+        ]
 
 
 class Like(models.Model):
@@ -58,3 +216,32 @@ class Like(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            # 같은 게시물에 한번만 좋아요 (동시에 두번 눌러도 중복으로 저장되지 않는다. - apps.likes)
+            models.UniqueConstraint(fields=['user', 'post'], name='like_user_post_unique'),
+        ]
+
+
+class SearchGram(models.Model):
+    """
+    게시물/댓글 내용 검색 역색인 (apps.search)
+    문서(kind, object_id)의 내용을 n글자씩 자른 gram과 등장 횟수를 저장한다. 게시물/댓글 저장, 삭제시 signal로 다시 만든다.
+    """
+    POST, COMMENT = 1, 2
+    KIND_CHOICE = (
+        (POST, '게시물'),
+        (COMMENT, '댓글'),
+    )
+    kind = models.PositiveSmallIntegerField(choices=KIND_CHOICE)
+    object_id = models.BigIntegerField()
+    gram = models.CharField(max_length=8)
+    count = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id', 'gram'], name='search_gram_unique'),
+        ]
+        indexes = [
+            # gram으로 문서 찾기 (검색)
+            models.Index(fields=['kind', 'gram', 'object_id'], name='search_gram_lookup_idx'),
+        ]
@@ -0,0 +1,170 @@
+"""
+게시물/댓글 내용 검색 (/api/v1/search/)
+
+띄어쓰기 단위로 나누면 조사가 붙는 한글("게시물을", "게시물이")은 같은 단어로 찾을 수 없어서
+내용을 CONTENT_SEARCH_GRAM_SIZE 글자씩 겹치게 자른 n-gram(ex. 2글자: "게시물을" -> 게시, 시물, 물을)으로 역색인(SearchGram)을 만든다.
+
+- 게시물/댓글이 저장/삭제될때 signal로 해당 문서의 gram만 다시 만든다. (rebuild_search_index로 전체를 다시 만들 수 있음)
+- 검색어의 gram을 모두 가진 문서를 (kind, gram) index로 찾고
+  gram별 등장 횟수 x 가중치(검색어 gram 중 적은 문서에 있는 gram일수록 큼)의 합으로 점수를 매긴다.
+- 점수는 정수라서 (점수, id) cursor로 다음 page를 정확하게 이어서 읽는다. (core.pagination.RankedPagination)
+
+검색 방식은 CONTENT_SEARCH_BACKEND로 바꿀 수 있다. (ex. 운영 DB의 전문 검색 기능을 사용하는 backend)
+SearchBackend의 method를 구현하면 signal, view, admin, rebuild_search_index는 그대로 사용한다.
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.utils.module_loading import import_string
+from .models import Post, Comment, SearchGram
+
+# 검색 종류 -> (SearchGram.kind, model)
+KINDS = {
+    'post': (SearchGram.POST, Post),
+    'comment': (SearchGram.COMMENT, Comment),
+}
+
+WORD_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    """NFKC 정규화 + 대소문자 구분 없음 (전각/반각, 조합형 한글을 같은 글자로)"""
+    return unicodedata.normalize('NFKC', text or '').casefold()
+
+
+def tokenize(text, size=None):
+    """내용 -> {gram: 등장 횟수} (단어마다 size 글자씩 겹치게 자른다. size 보다 짧은 단어는 넣지 않는다.)"""
+    size = size or settings.CONTENT_SEARCH_GRAM_SIZE
+    grams = Counter()
+    for word in WORD_RE.findall(normalize(text)):
+        for index in range(len(word) - size + 1):
+            grams[word[index:index + size]] += 1
+    return grams
+
+
+def query_grams(query):
+    """검색어의 gram (중복 없이 앞에서부터 CONTENT_SEARCH_MAX_GRAMS개)"""
+    return list(tokenize(query))[:settings.CONTENT_SEARCH_MAX_GRAMS]
+
+
+class SearchBackend(object):
+    """CONTENT_SEARCH_BACKEND가 구현해야 하는 method (kind: KINDS의 key)"""
+
+    def index(self, kind, pk, text):
+        """문서 내용 저장 (이미 있으면 바꾼다.)"""
+        raise NotImplementedError
+
+    def remove(self, kind, pk):
+        raise NotImplementedError
+
+    def search(self, kind, query, documents=None, after=None, size=20):
+        """
+        [(문서 id, 점수), ...] (점수가 큰 순서, 같으면 id 역순)
+        documents: 검색할 문서 id subquery (ex. 공개 게시물), after: 이전 page 마지막 (점수, id)
+        검색어가 너무 짧으면 ValueError
+        """
+        raise NotImplementedError
+
+    def matches(self, kind, query):
+        """검색어와 맞는 문서 id subquery (순서 없음, admin 검색용) - 검색어가 너무 짧으면 None"""
+        raise NotImplementedError
+
+    def rebuild(self, kind):
+        """kind 문서 전체 다시 저장 -> 문서 수"""
+        raise NotImplementedError
+
+
+class NgramSearchBackend(SearchBackend):
+    """SearchGram table 역색인 (SQLite 포함 모든 DB에서 동작)"""
+
+    def index(self, kind, pk, text):
+        kind_value = KINDS[kind][0]
+        rows = [
+            SearchGram(kind=kind_value, object_id=pk, gram=gram, count=min(count, 32767))
+            for gram, count in tokenize(text).items()
+        ]
+        with transaction.atomic():
+            SearchGram.objects.filter(kind=kind_value, object_id=pk).delete()
+            SearchGram.objects.bulk_create(rows, batch_size=1000)
+
+    def remove(self, kind, pk):
+        SearchGram.objects.filter(kind=KINDS[kind][0], object_id=pk).delete()
+
+    def matching_rows(self, kind, grams):
+        """gram을 모두 가진 문서별로 묶은 row (unique (kind, object_id, gram)이라 맞은 row 수 = 맞은 gram 수)"""
+        return SearchGram.objects.filter(kind=KINDS[kind][0], gram__in=grams).values('object_id').annotate(
+            matched=Count('id')
+        ).filter(matched=len(grams))
+
+    def weights(self, kind, grams):
+        """
+        gram별 가중치 (적은 문서에 있는 gram일수록 크다, 정수) -> 없는 gram이 있으면 None (검색 결과 없음)
+        """
+        rows = SearchGram.objects.filter(kind=KINDS[kind][0], gram__in=grams).values('gram').annotate(
+            documents=Count('id')
+        ).order_by()
+        counts = {row['gram']: row['documents'] for row in rows}
+        if len(counts) != len(grams):
+            return None
+        most = max(counts.values())
+        return {gram: int(round(100 * math.log2(1 + most / count))) for gram, count in counts.items()}
+
+    def search(self, kind, query, documents=None, after=None, size=20):
+        grams = query_grams(query)
+        if not grams:
+            raise ValueError('검색어가 너무 짧습니다.')
+        weights = self.weights(kind, grams)
+        if weights is None:
+            return []
+        weight = Case(
+            *[When(gram=gram, then=Value(value)) for gram, value in weights.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        rows = self.matching_rows(kind, grams).annotate(score=Sum(F('count') * weight))
+        if documents is not None:
+            rows = rows.filter(object_id__in=documents)
+        if after is not None:
+            score, pk = after
+            rows = rows.filter(Q(score__lt=score) | Q(score=score, object_id__lt=pk))
+        rows = rows.order_by('-score', '-object_id').values_list('object_id', 'score')
+        return list(rows[:size])
+
+    def matches(self, kind, query):
+        grams = query_grams(query)
+        if not grams:
+            return None
+        return self.matching_rows(kind, grams).values('object_id')
+
+    def rebuild(self, kind):
+        kind_value, model = KINDS[kind]
+        count = 0
+        with transaction.atomic():
+            SearchGram.objects.filter(kind=kind_value).delete()
+            rows = []
+            for pk, content in model.objects.order_by().values_list('pk', 'content').iterator(chunk_size=2000):
+                rows += [
+                    SearchGram(kind=kind_value, object_id=pk, gram=gram, count=min(gram_count, 32767))
+                    for gram, gram_count in tokenize(content).items()
+                ]
+                count += 1
+                if len(rows) >= 5000:
+                    SearchGram.objects.bulk_create(rows)
+                    rows = []
+            SearchGram.objects.bulk_create(rows)
+        return count
+
+
+def get_backend():
+    return import_string(settings.CONTENT_SEARCH_BACKEND)()
+
+
+def visible_documents(kind):
+    """검색 결과에 보여줄 문서 id subquery (공개 게시물, 공개 게시물의 댓글)"""
+    if kind == 'post':
+        return Post.objects.filter(is_public=True).values('pk')
+    return Comment.objects.filter(post__is_public=True).values('pk')
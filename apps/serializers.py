@@ -1,9 +1,17 @@
+from django.db.models import Exists, OuterRef
 from rest_framework import serializers
-from users.serializers import UserSerializer
+from core.serializers import EagerLoadingMixin, FastDecimalField, ReferenceExpansionMixin, SparseFieldsMixin
+from users.models import User
+from users.serializers import UserSerializer, USER_READ_FIELDS
 from .models import Post, Comment, Photo, Like
 
 
-class PostSerializer(serializers.Serializer):
+def user_read_fields(prefix):
+    """관계를 타고 들어간 user의 column 이름 만들기 (ex. user__nickname)"""
+    return tuple(f'{prefix}__{field}' for field in USER_READ_FIELDS)
+
+
+class PostSerializer(SparseFieldsMixin, serializers.Serializer):
     """
     (참고)
     seiralizer에서는 TextField가 없기때문에 CharField로 적어준다.
@@ -12,8 +20,8 @@ class PostSerializer(serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     user = UserSerializer(read_only=True)
     content = serializers.CharField(max_length=255)
-    lat = serializers.DecimalField(max_digits=10, decimal_places=6)
-    lng = serializers.DecimalField(max_digits=10, decimal_places=6)
+    lat = FastDecimalField(max_digits=10, decimal_places=6)
+    lng = FastDecimalField(max_digits=10, decimal_places=6)
     is_public = serializers.BooleanField(default=True)
 
     def create(self, validated_data):
@@ -42,16 +50,51 @@ class PostSerializer(serializers.Serializer):
         instance.lng = validated_data.get('lng', instance.lng)
         instance.is_public = validated_data.get('is_public', instance.is_public)
 
-        instance.save()
+        # counter(좋아요/댓글/사진/조회자 수)는 F()로 따로 증감하기 때문에 수정한 column만 저장한다.
+        instance.save(update_fields=['content', 'lat', 'lng', 'is_public', 'updated_at'])
         return instance
 
 
-class CommentSerializer(serializers.Serializer):
+class PostListSerializer(EagerLoadingMixin, PostSerializer):
+    """
+    게시물 리스트 조회 전용 serializer
+    작성자는 select_related로 함께 가져오고 좋아요/댓글/사진 수는 row에 저장된 counter를 읽기 때문에
+    page 크기와 상관없이 (count + page) 쿼리만 실행된다.
+    """
+    like_count = serializers.IntegerField(read_only=True)
+    comment_count = serializers.IntegerField(read_only=True)
+    photo_count = serializers.IntegerField(read_only=True)
+    has_liked = serializers.BooleanField(read_only=True, default=False)
+
+    select_related_fields = ('user',)
+    only_fields = (
+        'id', 'content', 'lat', 'lng', 'is_public', 'like_count', 'comment_count', 'photo_count', 'created_at',
+        'updated_at',
+    ) + user_read_fields('user')
+
+    @classmethod
+    def get_viewer_annotations(cls, viewer, fields=None, ref='pk'):
+        """내가 좋아요 한 게시물인지 (Like의 (user, post) unique index)"""
+        if viewer is None or not viewer.is_authenticated or not cls.is_selected('has_liked', fields):
+            return {}
+        return {'has_liked': Exists(Like.objects.filter(post=OuterRef(ref), user=viewer.pk))}
+
+
+class PostReferenceSerializer(EagerLoadingMixin, PostSerializer):
+    """included에 담기는 게시물 (작성자는 id만)"""
+    user = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    only_fields = ('id', 'user', 'content', 'lat', 'lng', 'is_public', 'updated_at')
+
+
+class CommentSerializer(EagerLoadingMixin, SparseFieldsMixin, serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     user = UserSerializer(read_only=True)
     post = PostSerializer(read_only=True)
     content = serializers.CharField(max_length=255)
 
+    select_related_fields = ('user', 'post__user')
+
     def create(self, validated_data):
         return Comment.objects.create(**validated_data)
 
@@ -73,11 +116,13 @@ class CommentSerializer(serializers.Serializer):
         return instance
 
 
-class PhotoSerializer(serializers.Serializer):
+class PhotoSerializer(EagerLoadingMixin, SparseFieldsMixin, serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     post = PostSerializer(read_only=True)
     image = serializers.ImageField()
 
+    select_related_fields = ('post__user',)
+
     def create(self, validated_data):
         return Photo.objects.create(**validated_data)
 
@@ -88,10 +133,39 @@ class PhotoSerializer(serializers.Serializer):
         return instance
 
 
-class LikeSerializer(serializers.Serializer):
+class CommentListSerializer(ReferenceExpansionMixin, EagerLoadingMixin, SparseFieldsMixin, serializers.Serializer):
+    """댓글 리스트 조회 전용 serializer (작성자/게시물은 id, ?expand=post,user 로 included에 담는다.)"""
     id = serializers.IntegerField(read_only=True)
-    post = PostSerializer(read_only=True)
-    user = UserSerializer(read_only=True)
+    user = serializers.PrimaryKeyRelatedField(read_only=True)
+    post = serializers.PrimaryKeyRelatedField(read_only=True)
+    content = serializers.CharField(read_only=True)
+
+    only_fields = ('id', 'user', 'post', 'content', 'created_at', 'updated_at')
+    references = (
+        ('post', Post, PostReferenceSerializer),
+        ('user', User, UserSerializer),
+    )
+
+
+class PhotoListSerializer(ReferenceExpansionMixin, EagerLoadingMixin, SparseFieldsMixin, serializers.Serializer):
+    """사진 리스트 조회 전용 serializer (게시물은 id, ?expand=post,user 로 included에 담는다.)"""
+    id = serializers.IntegerField(read_only=True)
+    post = serializers.PrimaryKeyRelatedField(read_only=True)
+    image = serializers.ImageField(read_only=True)
+
+    only_fields = ('id', 'post', 'image', 'created_at', 'updated_at')
+    references = (
+        ('post', Post, PostReferenceSerializer),
+        ('user', User, UserSerializer),
+    )
+    # 사진에는 작성자가 없어서 게시물 작성자를 담는다.
+    reference_through = {'user': 'post'}
+
+
+class LikeSerializer(SparseFieldsMixin, serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    post = serializers.PrimaryKeyRelatedField(read_only=True)
+    user = serializers.PrimaryKeyRelatedField(read_only=True)
 
     def create(self, validated_data):
         return Like.objects.create(**validated_data)
@@ -0,0 +1,155 @@
+import threading
+from django.core.signals import request_finished
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from core.cache import bump_version
+from core.counters import change_counter
+from users.models import Follow
+from . import search, tiles, trending, viewers
+from .feed import pull_posts, remove_author_posts
+from .models import Post, Comment, Photo, Like
+
+# 관계 model -> Post에 저장되는 counter field
+POST_COUNTER_FIELDS = {
+    Like: 'like_count',
+    Comment: 'comment_count',
+    Photo: 'photo_count',
+}
+
+# 삭제 중인 게시물 id (thread별, 삭제가 중간에 실패하면 남을 수 있어서 repair_counters로 맞춘다.)
+_deleting = threading.local()
+
+
+def deleting_posts():
+    if not hasattr(_deleting, 'posts'):
+        _deleting.posts = set()
+    return _deleting.posts
+
+
+@receiver(pre_delete, sender=Post)
+def mark_post_deleting(sender, instance, **kwargs):
+    """
+    게시물을 지우면 좋아요/댓글/사진이 CASCADE로 먼저 지워지고 row마다 post_delete가 호출된다.
+    지워질 게시물의 counter, 인기 게시물 구간 counter를 row마다 고치지 않게 표시해둔다. (게시물 post_delete에서 해제)
+    """
+    deleting_posts().add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unmark_post_deleting(sender, instance, **kwargs):
+    deleting_posts().discard(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Photo)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Photo)
+def invalidate_detail_cache(sender, instance, **kwargs):
+    """수정/삭제시 상세 조회 cache 무효화"""
+    bump_version(sender, instance.pk)
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Photo)
+def increase_post_counter(sender, instance, created, **kwargs):
+    if created:
+        change_counter(Post, instance.post_id, POST_COUNTER_FIELDS[sender], 1)
+
+
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Photo)
+def decrease_post_counter(sender, instance, **kwargs):
+    """게시물/사용자 삭제로 인한 CASCADE 삭제에서도 호출된다. (같이 지워지는 게시물은 건너뛴다.)"""
+    if instance.post_id not in deleting_posts():
+        change_counter(Post, instance.post_id, POST_COUNTER_FIELDS[sender], -1)
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=Comment)
+def add_post_activity(sender, instance, created, **kwargs):
+    """인기 게시물 점수용 구간 counter 증가"""
+    if created:
+        trending.record(instance.post_id, POST_COUNTER_FIELDS[sender], 1, instance.created_at)
+
+
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Comment)
+def remove_post_activity(sender, instance, **kwargs):
+    if instance.post_id not in deleting_posts():
+        trending.record(instance.post_id, POST_COUNTER_FIELDS[sender], -1, instance.created_at)
+
+
+@receiver(post_save, sender=Follow)
+def pull_following_posts(sender, instance, created, **kwargs):
+    """팔로우 하면 상대방의 최근 게시물을 timeline에 넣어준다."""
+    if created:
+        pull_posts(instance.follower_id, [instance.following_id])
+
+
+@receiver(post_delete, sender=Follow)
+def remove_following_posts(sender, instance, **kwargs):
+    remove_author_posts(instance.follower_id, instance.following_id)
+
+
+def tile_state(values):
+    """지도 tile에 들어가는 상태 (공개 게시물만 집계한다.)"""
+    if not values.get('is_public') or values.get('lat') in (None, '') or values.get('lng') in (None, ''):
+        return None
+    return values['lat'], values['lng']
+
+
+@receiver(post_save, sender=Post)
+def update_post_tiles(sender, instance, created, **kwargs):
+    """게시물 생성, 위치/공개 여부 변경시 지도 tile 칸별 게시물 수 갱신"""
+    current = {'is_public': instance.is_public, 'lat': instance.lat, 'lng': instance.lng}
+    loaded = getattr(instance, '_loaded_values', None)
+    if created:
+        before = None
+    elif loaded is not None and all(field in loaded for field in current):
+        before = tile_state(loaded)
+    else:
+        # 이전 값을 모르면 갱신하지 않는다. (rebuild_post_tiles로 맞출 수 있음)
+        return
+    after = tile_state(current)
+    if before != after:
+        if before is not None:
+            tiles.remove_post(instance.pk, *before)
+        if after is not None:
+            tiles.add_post(instance.pk, *after)
+    instance._loaded_values = dict(loaded or {}, **current)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_tiles(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    state = tile_state(dict(loaded, is_public=instance.is_public, lat=instance.lat, lng=instance.lng))
+    if state is not None:
+        tiles.remove_post(instance.pk, *state)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def index_content(sender, instance, created, **kwargs):
+    """내용 검색 역색인 갱신 (내용이 바뀌지 않은 게시물 저장은 건너뛴다.)"""
+    loaded = getattr(instance, '_loaded_values', None)
+    if not created and loaded is not None and loaded.get('content') == instance.content:
+        return
+    search.get_backend().index(sender.__name__.lower(), instance.pk, instance.content)
+    if loaded is not None:
+        loaded['content'] = instance.content
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def remove_content_index(sender, instance, **kwargs):
+    search.get_backend().remove(sender.__name__.lower(), instance.pk)
+
+
+@receiver(request_finished)
+def flush_post_views(sender, **kwargs):
+    """응답을 보낸 다음 모아둔 게시물 조회 기록 저장 (POST_VIEW_FLUSH_INTERVAL이 지났거나 많이 모였을때만)"""
+    viewers.flush_if_due()
@@ -0,0 +1,93 @@
+from collections import Counter
+from functools import reduce
+from operator import or_
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from core import geo
+from .models import Post, PostTileCell
+
+
+def cell_levels():
+    """저장하는 칸의 level 범위 (tile zoom 0 ~ TILE_MAX_ZOOM을 나눈 칸)"""
+    return settings.TILE_CELL_BITS, settings.TILE_MAX_ZOOM + settings.TILE_CELL_BITS
+
+
+def cell_filter(keys):
+    return reduce(or_, (Q(level=level, x=x, y=y) for level, x, y in keys))
+
+
+def add_post(post_id, lat, lng):
+    """게시물이 들어가는 모든 level의 칸 게시물 수 +1 (쿼리 3번)"""
+    keys = geo.tile_cells(lat, lng, *cell_levels())
+    PostTileCell.objects.bulk_create(
+        [PostTileCell(level=level, x=x, y=y) for level, x, y in keys], ignore_conflicts=True
+    )
+    cells = PostTileCell.objects.filter(cell_filter(keys))
+    cells.update(count=F('count') + 1)
+    cells.filter(post__isnull=True).update(post_id=post_id)
+
+
+def remove_post(post_id, lat, lng):
+    """게시물이 들어가는 모든 level의 칸 게시물 수 -1 / 대표 게시물이었으면 다른 게시물로 바꾸기"""
+    keys = geo.tile_cells(lat, lng, *cell_levels())
+    cells = PostTileCell.objects.filter(cell_filter(keys))
+    cells.update(count=F('count') - 1)
+    cells.filter(count__lte=0).delete()
+
+    # 게시물 삭제시에는 SET_NULL로 이미 비어있다.
+    # 작은 칸부터 바꿔서 큰 칸은 바로 아래 level 칸들의 대표 게시물 중에서 고른다.
+    for cell in cells.filter(Q(post_id=post_id) | Q(post__isnull=True)).order_by('-level'):
+        cell.post_id = representative(cell, post_id)
+        cell.save(update_fields=['post'])
+
+
+def representative(cell, removed_id):
+    """
+    칸의 새 대표 게시물 id (없으면 None)
+    가장 작은 칸은 geo_cell index로 칸 범위 안의 공개 게시물을 찾고,
+    큰 칸은 안에 들어가는 4개의 작은 칸((level, x, y) unique index)의 대표 게시물을 사용한다.
+    """
+    if cell.level < cell_levels()[1]:
+        return PostTileCell.objects.filter(
+            level=cell.level + 1,
+            x__in=(cell.x * 2, cell.x * 2 + 1),
+            y__in=(cell.y * 2, cell.y * 2 + 1),
+            post__isnull=False,
+        ).exclude(post_id=removed_id).order_by().values_list('post_id', flat=True).first()
+    min_lat, min_lng, max_lat, max_lng = geo.tile_bounds(cell.x, cell.y, cell.level)
+    radius = max(max_lat - min_lat, max_lng - min_lng) / 2
+    posts = Post.objects.filter(is_public=True).within((min_lat + max_lat) / 2, (min_lng + max_lng) / 2, radius)
+    return posts.filter(
+        lat__gte=min_lat, lat__lt=max_lat, lng__gte=min_lng, lng__lt=max_lng,
+    ).exclude(pk=removed_id).order_by().values_list('pk', flat=True).first()
+
+
+def tile_cells(zoom, x, y):
+    """
+    zoom level tile (x, y) 안의 칸 목록
+    한 tile은 2^TILE_CELL_BITS x 2^TILE_CELL_BITS 칸으로 나뉜다.
+    """
+    size = 1 << settings.TILE_CELL_BITS
+    return PostTileCell.objects.filter(
+        level=zoom + settings.TILE_CELL_BITS,
+        x__gte=x * size, x__lt=(x + 1) * size,
+        y__gte=y * size, y__lt=(y + 1) * size,
+    ).values('x', 'y', 'count', 'post_id')
+
+
+def rebuild():
+    """공개 게시물 전체를 다시 집계해서 칸별 게시물 수 새로 만들기"""
+    counts, representatives = Counter(), {}
+    rows = Post.objects.filter(is_public=True).order_by().values_list('id', 'lat', 'lng')
+    for pk, lat, lng in rows.iterator(chunk_size=2000):
+        for key in geo.tile_cells(lat, lng, *cell_levels()):
+            counts[key] += 1
+            representatives.setdefault(key, pk)
+    with transaction.atomic():
+        PostTileCell.objects.all().delete()
+        PostTileCell.objects.bulk_create([
+            PostTileCell(level=level, x=x, y=y, count=count, post_id=representatives[(level, x, y)])
+            for (level, x, y), count in counts.items()
+        ], batch_size=1000)
+    return len(counts)
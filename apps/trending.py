@@ -0,0 +1,120 @@
+"""
+인기 게시물 (/api/v1/post/trending/)
+
+좋아요/댓글이 생기거나 지워질때 게시물별 시간 구간 counter(PostActivity)를 증감하고,
+최근 TRENDING_WINDOW_SECONDS 동안의 구간 counter에 오래될수록 줄어드는 가중치를 곱해서 점수를 만든다.
+
+    score = Σ (좋아요 수 * TRENDING_LIKE_WEIGHT + 댓글 수 * TRENDING_COMMENT_WEIGHT) * 0.5 ^ (구간 나이 / TRENDING_HALF_LIFE_SECONDS)
+
+Like/Comment 전체를 세지 않고 window 안의 구간 row(활동이 있었던 게시물 수 x 구간 수)만 읽는다.
+계산한 상위 TRENDING_SIZE 개 (게시물 id, 점수)는 cache에 저장하고 TRENDING_REFRESH_INTERVAL 초가 지나면 다시 계산한다.
+(refresh_trending 명령을 주기적으로 실행하면 요청 처리 중에는 계산하지 않는다.)
+"""
+import datetime
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, ExpressionWrapper, F, FloatField, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from .models import Like, Comment, PostActivity
+
+CACHE_KEY = 'trending:posts'
+
+
+def bucket_of(value):
+    """value가 들어가는 구간의 시작 시각"""
+    size = settings.TRENDING_BUCKET_SECONDS
+    return datetime.datetime.fromtimestamp(int(value.timestamp()) // size * size, tz=datetime.timezone.utc)
+
+
+def window_start(now=None):
+    """점수에 포함되는 가장 오래된 구간의 시작 시각"""
+    now = now or timezone.now()
+    return bucket_of(now - datetime.timedelta(seconds=settings.TRENDING_WINDOW_SECONDS - settings.TRENDING_BUCKET_SECONDS))
+
+
+def record(post_id, field, amount, created_at=None):
+    """좋아요/댓글(created_at) 1개 반영 (field: 'like_count' 또는 'comment_count')"""
+    record_many({(post_id, bucket_of(created_at or timezone.now()), field): amount})
+
+
+def record_many(changes):
+    """
+    {(post_id, bucket, field): 증감 값} 반영
+    증가는 구간 row가 없으면 만들고, 감소는 구간 row가 있을때만 줄인다. (window 밖의 구간은 무시한다.)
+    """
+    start = window_start()
+    changes = {key: amount for key, amount in changes.items() if amount and key[1] >= start}
+    new_rows = {(post_id, bucket) for (post_id, bucket, _), amount in changes.items() if amount > 0}
+    if new_rows:
+        PostActivity.objects.bulk_create(
+            [PostActivity(post_id=post_id, bucket=bucket) for post_id, bucket in new_rows], ignore_conflicts=True
+        )
+    for (post_id, bucket, field), amount in changes.items():
+        PostActivity.objects.filter(post_id=post_id, bucket=bucket).update(**{field: Greatest(F(field) + amount, 0)})
+
+
+def scores(now=None, size=None):
+    """window 안의 구간 counter로 계산한 상위 size개 [(게시물 id, 점수), ...] (공개 게시물만)"""
+    now = now or timezone.now()
+    seconds = settings.TRENDING_BUCKET_SECONDS
+    current = bucket_of(now)
+    buckets = [current - datetime.timedelta(seconds=seconds * age) for age in range(settings.TRENDING_WINDOW_SECONDS // seconds)]
+    decay = Case(
+        *[When(bucket=bucket, then=Value(0.5 ** (age * seconds / settings.TRENDING_HALF_LIFE_SECONDS)))
+          for age, bucket in enumerate(buckets)],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    activity = ExpressionWrapper(
+        F('like_count') * Value(settings.TRENDING_LIKE_WEIGHT) + F('comment_count') * Value(settings.TRENDING_COMMENT_WEIGHT),
+        output_field=FloatField(),
+    )
+    rows = PostActivity.objects.filter(bucket__gte=buckets[-1], post__is_public=True).values('post_id').annotate(
+        score=Sum(ExpressionWrapper(activity * decay, output_field=FloatField()))
+    ).filter(score__gt=0).order_by('-score', '-post_id')
+    return list(rows.values_list('post_id', 'score')[:size or settings.TRENDING_SIZE])
+
+
+def refresh(now=None):
+    """오래된 구간을 지우고 점수를 다시 계산해서 cache에 저장하기"""
+    now = now or timezone.now()
+    PostActivity.objects.filter(bucket__lt=window_start(now)).delete()
+    entry = {'refreshed_at': now, 'posts': scores(now)}
+    cache.set(CACHE_KEY, entry, None)
+    return entry
+
+
+def get_trending():
+    """
+    cache 된 {'refreshed_at', 'posts': [(게시물 id, 점수), ...]}
+    TRENDING_REFRESH_INTERVAL 초가 지났으면 lock을 잡은 요청 1개만 다시 계산하고 나머지는 이전 값을 쓴다.
+    """
+    entry = cache.get(CACHE_KEY)
+    if entry is None:
+        return refresh()
+    expires_at = entry['refreshed_at'] + datetime.timedelta(seconds=settings.TRENDING_REFRESH_INTERVAL)
+    if expires_at <= timezone.now() and cache.add(f'{CACHE_KEY}:lock', 1, settings.TRENDING_REFRESH_INTERVAL):
+        entry = refresh()
+    return entry
+
+
+def rebuild(now=None):
+    """window 안의 좋아요/댓글을 다시 집계해서 구간 counter 새로 만들기"""
+    now = now or timezone.now()
+    start = window_start(now)
+    counts = Counter()
+    for model, field in ((Like, 'like_count'), (Comment, 'comment_count')):
+        rows = model.objects.filter(created_at__gte=start).order_by().values_list('post_id', 'created_at')
+        for post_id, created_at in rows.iterator(chunk_size=2000):
+            counts[(post_id, bucket_of(created_at), field)] += 1
+    rows = {}
+    for (post_id, bucket, field), count in counts.items():
+        row = rows.setdefault((post_id, bucket), PostActivity(post_id=post_id, bucket=bucket))
+        setattr(row, field, count)
+    with transaction.atomic():
+        PostActivity.objects.all().delete()
+        PostActivity.objects.bulk_create(rows.values(), batch_size=1000)
+    return len(rows)
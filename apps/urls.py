@@ -7,6 +7,11 @@ urlpatterns = [
     # 후행 슬래시 주의
     path('post/', views.posts_view),
     path('post/search/', views.post_search),
+    path('search/', views.content_search),
+    path('post/nearby/', views.post_nearby),
+    path('post/trending/', views.post_trending),
+    path('post/tiles/<int:z>/<int:x>/<int:y>/', views.post_tile),
+    path('feed/', views.feed_view),
     path('post/<int:pk>/', views.post_view),
     path('post/favs/', views.posts_fav),
     path('post/favs/<int:pk>/', views.post_fav),
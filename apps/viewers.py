@@ -0,0 +1,141 @@
+"""
+게시물 조회자 수 (Post.view_count)
+
+조회할때마다 row를 저장하지 않고 process 안에 게시물별 HyperLogLog(core.sketch)를 모았다가
+POST_VIEW_FLUSH_INTERVAL 초가 지나거나 게시물이 POST_VIEW_MAX_PENDING 개가 되면 한번에 저장한다.
+저장할때 DB에 있는 register와 합치고(register별 최대값) 추정 값을 Post.view_count에 저장한다.
+여러 process에서 같은 사용자를 모아도 합치면 한번만 센다.
+
+추정 값이라 journal은 쓰지 않는다. (저장하지 않은 조회 기록은 process가 종료되면 사라진다.)
+저장은 조회 요청 안에서 하지 않고 응답을 보낸 다음(request_finished signal)에 한다.
+view_count는 updated_at(Last-Modified)을 바꾸지 않고 상세 조회 cache도 무효화하지 않는다.
+(조회가 많은 게시물일수록 cache가 자주 깨지기 때문에)
+대신 상세 조회 cache에는 view_count를 넣지 않고, 저장할때 같이 써두는 view_count:{pk} cache 값을 응답할때 채운다.
+(get_view_count, ETag에는 view_count가 포함되어 저장된 다음 요청부터 바뀐 값이 보인다.)
+"""
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from core.sketch import HyperLogLog
+from .models import Post, PostViewers
+
+_pending = {}
+_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def viewer_key(request):
+    """조회한 사용자 (로그인 하지 않았으면 IP + User-Agent)"""
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'anon:{request.META.get("REMOTE_ADDR", "")}:{request.META.get("HTTP_USER_AGENT", "")}'
+
+
+def view_count_key(post_id):
+    return f'view_count:{post_id}'
+
+
+def cache_view_count(post_id, view_count):
+    """DB에서 읽은 view_count를 cache에 넣어두기 (save()가 먼저 써둔 값을 덮어쓰지 않도록 add로 저장한다.)"""
+    cache.add(view_count_key(post_id), view_count, settings.DETAIL_CACHE_HOT_TIMEOUT)
+
+
+def get_view_count(post_id):
+    """상세 조회에 응답할 view_count (cache에 없으면 Post row에서 읽어서 저장한다. 게시물이 없으면 Post.DoesNotExist)"""
+    view_count = cache.get(view_count_key(post_id))
+    if view_count is None:
+        view_count = Post.objects.filter(pk=post_id).values_list('view_count', flat=True).get()
+        cache_view_count(post_id, view_count)
+    return view_count
+
+
+def record(post_id, viewer):
+    """조회 기록 (있는 게시물만 기록한다. 저장은 flush_if_due)"""
+    with _lock:
+        viewers = _pending.get(post_id)
+        if viewers is None:
+            viewers = _pending[post_id] = HyperLogLog(settings.POST_VIEW_PRECISION)
+        viewers.add(viewer)
+
+
+def is_due():
+    with _lock:
+        if not _pending:
+            return False
+        return len(_pending) >= settings.POST_VIEW_MAX_PENDING or \
+            time.monotonic() - _flushed_at >= settings.POST_VIEW_FLUSH_INTERVAL
+
+
+def flush_if_due():
+    """저장할 때가 되었으면 모아둔 기록 저장 (apps.signals에서 응답을 보낸 다음에 호출한다.)"""
+    if not is_due():
+        return 0
+    try:
+        return flush()
+    except Exception as e:
+        # 실패하면 다음에 다시 저장한다.
+        print(f'error : {e}')
+        return 0
+
+
+def flush():
+    """모아둔 조회 기록 저장 -> 저장한 게시물 수"""
+    global _pending, _flushed_at
+    with _lock:
+        pending, _pending = _pending, {}
+        _flushed_at = time.monotonic()
+    if not pending:
+        return 0
+    try:
+        save(pending)
+    except Exception:
+        with _lock:
+            for post_id, viewers in pending.items():
+                current = _pending.setdefault(post_id, viewers)
+                if current is not viewers:
+                    current.merge(viewers)
+        raise
+    return len(pending)
+
+
+def clear():
+    """저장하지 않은 조회 기록 버리기 (테스트용)"""
+    global _pending, _flushed_at
+    with _lock:
+        _pending = {}
+        _flushed_at = time.monotonic()
+
+
+def save(pending):
+    """
+    게시물별 HyperLogLog를 DB의 register와 합쳐서 저장하고 view_count 갱신
+    (쿼리: 게시물 확인 1번 + register row 생성/잠금/저장 3번 + view_count가 바뀐 게시물 update 1번)
+    updated_at은 바꾸지 않는다. (bulk_update는 auto_now를 적용하지 않는다.)
+    바뀐 view_count는 commit 한 다음에 view_count:{pk} cache 값에도 저장한다. (get_view_count)
+    """
+    precision = settings.POST_VIEW_PRECISION
+    with transaction.atomic():
+        view_counts = dict(Post.objects.filter(pk__in=list(pending)).values_list('pk', 'view_count'))
+        if not view_counts:
+            return
+        PostViewers.objects.bulk_create(
+            [PostViewers(post_id=pk, registers=HyperLogLog(precision).to_bytes()) for pk in view_counts],
+            ignore_conflicts=True,
+        )
+        rows = list(PostViewers.objects.select_for_update().filter(post_id__in=list(view_counts)))
+        changed_posts = []
+        for row in rows:
+            viewers = HyperLogLog.from_bytes(row.registers, precision)
+            viewers.merge(pending[row.post_id])
+            row.registers = viewers.to_bytes()
+            count = viewers.count()
+            if count != view_counts[row.post_id]:
+                changed_posts.append(Post(pk=row.post_id, view_count=count))
+        PostViewers.objects.bulk_update(rows, ['registers'])
+        if changed_posts:
+            Post.objects.bulk_update(changed_posts, ['view_count'])
+    cache.set_many(
+        {view_count_key(post.pk): post.view_count for post in changed_posts}, settings.DETAIL_CACHE_HOT_TIMEOUT
+    )
@@ -1,19 +1,109 @@
 import json
+import math
+from django.conf import settings
+from django.db import transaction
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from core import cache as detail_cache
+from core import conditional
+from core import geo
 from core.error import error_controlloer
-from .models import Post, Comment, Photo, Like
-from .serializers import PostSerializer, CommentSerializer, PhotoSerializer, LikeSerializer
+from core.pagination import KeysetPagination, RankedPagination, InvalidCursor
+from users.models import User
+from .models import Post, Comment, Photo, Like, Feed
+from core.serializers import InvalidQueryParam
+from .serializers import (
+    PostSerializer, PostListSerializer, CommentSerializer, CommentListSerializer, PhotoSerializer,
+    PhotoListSerializer,
+)
+from . import like_buffer, likes, search, tiles, trending, viewers
+from .feed import fan_out_post, pull_fan_out_skipped_posts
 from .permissions import IsOwner, PhotoOwner
 
 
-class OwnPagination(PageNumberPagination):
+def post_detail_validators(pk):
+    """게시물 상세 조회 ETag, Last-Modified (게시물 + 작성자 updated_at, 같이 읽은 view_count는 cache에 넣어둔다.)"""
+    updated_at, user_updated_at, view_count = Post.objects.filter(pk=pk).values_list(
+        'updated_at', 'user__updated_at', 'view_count'
+    ).get()
+    viewers.cache_view_count(pk, view_count)
+    return conditional.object_validators(Post, pk, (updated_at, user_updated_at))
+
+
+def post_detail_data(pk):
+    """게시물 상세 조회 응답과 응답에 사용한 object 목록 (core.cache)"""
+    post = Post.objects.select_related('user').get(pk=pk)
+    data = PostSerializer(post).data
+    data['like_count'] = post.like_count
+    # view_count는 저장될때 cache를 무효화하지 않기 때문에 따로 넣어두고 응답할때 읽는다. (post_detail_extra)
+    viewers.cache_view_count(post.pk, post.view_count)
+    return data, [(Post, post.pk, post.updated_at), (User, post.user_id, post.user.updated_at)]
+
+
+def post_detail_extra(request, pk, fields=None):
+    """
+    게시물 상세 조회에서 cache와 별도로 읽는 값
+    - view_count: 조회자 수 (apps.viewers)
+    - like_count: 좋아요 buffer 사용시 조회자 본인의 아직 저장하지 않은 좋아요 반영
+    """
+    values = {}
+    if fields is None or 'view_count' in fields:
+        values['view_count'] = viewers.get_view_count(pk)
+    if settings.LIKE_BUFFER_ENABLED and (fields is None or 'like_count' in fields):
+        like_count = like_buffer.pending_like_count(request.user.pk, pk)
+        if like_count is not None:
+            values['like_count'] = like_count
+    return values
+
+
+def pending_likes(request, posts):
+    """
+    리스트 조회한 게시물에 조회자 본인의 아직 저장하지 않은 좋아요 반영 (좋아요 buffer 사용시)
+    -> 반영한 요청 (page ETag에 포함한다.)
+    """
+    if not settings.LIKE_BUFFER_ENABLED:
+        return ()
+    return tuple(sorted(like_buffer.overlay(request.user.pk, posts).items()))
+
+
+def comment_detail_validators(pk):
+    fields = ('updated_at', 'user__updated_at', 'post__updated_at', 'post__user__updated_at')
+    return conditional.query_validators(Comment.objects, pk, fields)
+
+
+def comment_detail_data(pk):
+    comment = Comment.objects.select_related('user', 'post__user').get(pk=pk)
+    dependencies = [
+        (Comment, comment.pk, comment.updated_at),
+        (User, comment.user_id, comment.user.updated_at),
+        (Post, comment.post_id, comment.post.updated_at),
+        (User, comment.post.user_id, comment.post.user.updated_at),
+    ]
+    return CommentSerializer(comment).data, dependencies
+
+
+def photo_detail_validators(pk):
+    fields = ('updated_at', 'post__updated_at', 'post__user__updated_at')
+    return conditional.query_validators(Photo.objects, pk, fields)
+
+
+def photo_detail_data(pk):
+    photo = Photo.objects.select_related('post__user').get(pk=pk)
+    dependencies = [
+        (Photo, photo.pk, photo.updated_at),
+        (Post, photo.post_id, photo.post.updated_at),
+        (User, photo.post.user_id, photo.post.user.updated_at),
+    ]
+    return PhotoSerializer(photo).data, dependencies
+
+
+class OwnPagination(KeysetPagination):
     """
     pagination custom 하기
+    (?cursor= 를 보내면 page 번호 대신 cursor 방식으로 동작한다. - core.pagination 참고)
     """
     # page_size 조정하기
     page_size = 20
@@ -56,7 +146,11 @@ post_get_response_schema_dict = {
                         'content': openapi.Schema('게시물 내용', type=openapi.TYPE_STRING),
                         'lat': openapi.Schema('위도', type=openapi.TYPE_STRING),
                         'lng': openapi.Schema('경도', type=openapi.TYPE_STRING),
-                        'is_public': openapi.Schema('게시물 활성화', type=openapi.TYPE_BOOLEAN)
+                        'is_public': openapi.Schema('게시물 활성화', type=openapi.TYPE_BOOLEAN),
+                        'like_count': openapi.Schema('게시물 좋아요 갯수', type=openapi.TYPE_INTEGER),
+                        'comment_count': openapi.Schema('게시물 댓글 갯수', type=openapi.TYPE_INTEGER),
+                        'photo_count': openapi.Schema('게시물 사진 갯수', type=openapi.TYPE_INTEGER),
+                        'has_liked': openapi.Schema('내가 좋아요 한 게시물인지 (로그인 안했으면 false)', type=openapi.TYPE_BOOLEAN)
                     }
                 )
             ),
@@ -147,19 +241,32 @@ def posts_view(request):
             # paginator = PageNumberPagination()
             # paginator.page_size = 10
             paginator = OwnPagination()
+            # ?fields=id,lat,lng 처럼 필요한 field만 요청하면 나머지 column/JOIN은 읽지 않는다.
+            fields = PostListSerializer.get_sparse_fields(request)
 
-            posts = Post.objects.all()
+            # 작성자 JOIN, 좋아요/댓글/사진 수 집계, 내가 좋아요 했는지를 한번에 가져오기 (N+1 방지)
+            posts = PostListSerializer.setup_queryset(Post.objects.all(), fields, request.user)
             # paginate에 request를 파싱하는건 paginator가 page query argument를 찾아낼 수 있기 때문이다.
             result = paginator.paginate_queryset(posts, request)
+            pending = pending_likes(request, result)
+            # client가 가지고 있는 page와 같으면 serialize 하지 않고 304로 응답한다.
+            # has_liked는 사용자마다 다르기 때문에 ETag에 사용자를 포함한다.
+            etag, last_modified = conditional.page_validators(
+                result, (paginator.get_page_state(), fields, request.user.pk, pending), related=('user',)
+            )
+            response = conditional.not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
 
             # context에 request를 담아주는 이유는 현재 serializer를 누가 보고 있는지 알아내기 위해 request를 serializer로 보내준다.
-            serializer = PostSerializer(result, many=True, context={'request': request})
+            serializer = PostListSerializer(result, many=True, fields=fields, context={'request': request})
             # django에서의 response와는 다르다. (django는 http response)
             # rest framework의 response는 api등 많은것들을 할 수 있다.
             # Response()는 pagination을 사용하려면 바꿔야한다.
             # paginator의 응답(response)를 return 해줘야한다.
             # return Response(serializer)
-            return paginator.get_paginated_response(serializer.data)
+            response = paginator.get_paginated_response(serializer.data)
+            return conditional.with_validators(response, etag, last_modified)
         elif request.method == 'POST':
             # print(request.data)  # dict 형태로 나태내어진다.
             if not request.user.is_authenticated:
@@ -168,7 +275,10 @@ def posts_view(request):
             serializer = PostSerializer(data=request.data)
             if serializer.is_valid():
                 # serializer.create()  # 직접 create()를 호출하면 안된다.
-                post = serializer.save(user=request.user)  # 대신 save()를 호출해야한다.
+                with transaction.atomic():
+                    post = serializer.save(user=request.user)  # 대신 save()를 호출해야한다.
+                    # 팔로워들의 timeline에 게시물 넣기
+                    fan_out_post(post)
                 post_serializer = PostSerializer(post).data
                 # 본인이 생성한 data를 response data에 담아서 보내주면 생성한 값들을 볼 수 있다.
                 return Response(data=post_serializer, status=status.HTTP_201_CREATED)
@@ -176,6 +286,12 @@ def posts_view(request):
                 # serializer.errors를 response하게 되면 어떤 에러가 났는지 증상을 명확하게 알 수 있다.
                 response_message = {'000': serializer.errors}
                 return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except InvalidCursor:
+        response_message = {'002': 'cursor 값이 유효하지 않습니다.'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except InvalidQueryParam as e:
+        response_message = {'002': f'{e.param} 값이 유효하지 않습니다. ({", ".join(e.values)})'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         print(f'error : {e}')
         response_message = {'999': '서버 에러'}
@@ -207,7 +323,8 @@ specific_post_get_schema = {
             'lat': openapi.Schema('위도', type=openapi.TYPE_STRING),
             'lng': openapi.Schema('경도', type=openapi.TYPE_STRING),
             'is_public': openapi.Schema('게시물 활성화', type=openapi.TYPE_BOOLEAN),
-            'like_count': openapi.Schema('게시물 좋아요 갯수', type=openapi.TYPE_INTEGER)
+            'like_count': openapi.Schema('게시물 좋아요 갯수', type=openapi.TYPE_INTEGER),
+            'view_count': openapi.Schema('게시물 조회자 수 (추정 값, 주기적으로 반영)', type=openapi.TYPE_INTEGER),
         }
     ),
     403: openapi.Schema(
@@ -393,14 +510,20 @@ def post_view(request, pk):
     post_view()안에서 전역 변수로 선언 해놓고 각 HTTP_METHOD마다 pk를 가져가서 사용하는게 더 가독성이 좋다.
     """
     try:
-        post = Post.objects.get(pk=pk)
         if request.method == "GET":
-            serializer = PostSerializer(post).data
-            serializer.update({
-                'like_count': Like.objects.filter(post_id=post.id).count()
-            })
-            return Response(serializer, status=status.HTTP_200_OK)
-        elif request.method == "PUT":
+            # 상세 조회는 cache를 먼저 확인하고 없으면 DB에서 읽어서 cache에 저장한다.
+            # (If-None-Match / If-Modified-Since가 같으면 304)
+            fields = PostSerializer.get_sparse_fields(request, extra_fields=('like_count', 'view_count'))
+            response = detail_cache.detail_response(
+                request, Post, pk, lambda: post_detail_data(pk), lambda: post_detail_validators(pk), fields,
+                lambda: post_detail_extra(request, pk, fields)
+            )
+            # 없는 게시물(404)은 위에서 Post.DoesNotExist로 빠진다.
+            # 조회자 수는 모았다가 응답을 보낸 다음에 한번에 저장한다. (바로 반영되지 않는다.)
+            viewers.record(pk, viewers.viewer_key(request))
+            return response
+        post = Post.objects.get(pk=pk)
+        if request.method == "PUT":
             if post.user != request.user:
                 response_message = {'007': '사용자가 일치하지 않습니다.'}
                 return Response(data=response_message, status=status.HTTP_403_FORBIDDEN)
@@ -422,12 +545,20 @@ def post_view(request, pk):
     except Post.DoesNotExist:
         response_message = {'004': '찾고자 하는 게시물이 없습니다.'}
         return Response(data=response_message, status=status.HTTP_404_NOT_FOUND)
+    except InvalidQueryParam as e:
+        response_message = {'002': f'{e.param} 값이 유효하지 않습니다. ({", ".join(e.values)})'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         print(f'error : {e}')
         response_message = {'999': '서버 에러'}
         return Response(data=response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def like_backend():
+    """좋아요 저장 방식 (LIKE_BUFFER_ENABLED 면 buffer에 모았다가 한번에 저장한다.)"""
+    return like_buffer if settings.LIKE_BUFFER_ENABLED else likes
+
+
 post_fav_get_response_schema_dict = {
     200: openapi.Schema(
         'response_data',
@@ -513,23 +644,21 @@ def posts_fav(request):
                 response_message = {'000': '필수 파라미터 post_id가 없습니다.'}
                 return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
 
-            serializer = LikeSerializer(data=request.data)
-            post = Post.objects.get(id=post_id)
-            like = Like.objects.filter(post=post, user=request.user).first()
-            if not like:
-                if serializer.is_valid():
-                    # like = serializer.save(post=post, user=request.user)
-                    serializer.save(post=post, user=request.user)
-                    # like_serializer = LikeSerializer(like).data
-                    response_message = {'success': f'게시물({post_id}) 좋아요'}
-                    return Response(data=response_message, status=status.HTTP_200_OK)
-                else:
-                    response_message = {'002': serializer.errors}
-                    return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                response_message = {'message': f'게시물({post_id}) 좋아요 취소'}
-                like.delete()
+            # 좋아요를 먼저 시도하고 이미 좋아요 한 상태면 취소한다. (unique 제약이 있어서 중복 저장되지 않는다.)
+            detail_cache.track(Post, int(post_id))
+            liked, _ = like_backend().like(request.user.pk, int(post_id))
+            if liked:
+                response_message = {'success': f'게시물({post_id}) 좋아요'}
                 return Response(data=response_message, status=status.HTTP_200_OK)
+            like_backend().unlike(request.user.pk, int(post_id))
+            response_message = {'message': f'게시물({post_id}) 좋아요 취소'}
+            return Response(data=response_message, status=status.HTTP_200_OK)
+    except (TypeError, ValueError):
+        response_message = {'002': '값이 유효하지 않습니다.'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except Post.DoesNotExist:
+        response_message = {'004': 'post_id가 없습니다.'}
+        return Response(data=response_message, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
         print(f'error : {e}')
         response_message = {'999': '서버 에러'}
@@ -569,30 +698,80 @@ post_fav_list_schema_dict = {
 }
 
 
+post_fav_change_schema_dict = {
+    200: openapi.Schema(
+        'response_data',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'post_id': openapi.Schema('게시물 ID', type=openapi.TYPE_INTEGER),
+            'liked': openapi.Schema('좋아요 상태', type=openapi.TYPE_BOOLEAN),
+            'like_count': openapi.Schema('해당 게시물 좋아요 갯수', type=openapi.TYPE_INTEGER),
+        }
+    ),
+    403: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_403_FORBIDDEN.get_error_code():
+                error_controlloer.APPLY_403_FORBIDDEN.get_error_description()
+        }
+    ),
+    404: post_fav_list_schema_dict[404],
+    500: post_fav_list_schema_dict[500],
+}
+
+
 @swagger_auto_schema(
     method='get',
     responses=post_fav_list_schema_dict
 )
-@api_view(["GET"])
+@swagger_auto_schema(
+    method='put',
+    responses=post_fav_change_schema_dict
+)
+@swagger_auto_schema(
+    method='delete',
+    responses=post_fav_change_schema_dict
+)
+@api_view(["GET", "PUT", "DELETE"])
 def post_fav(request, pk):
     """
-    특정 게시물 좋아요 리스트
+    특정 게시물 좋아요 리스트 / 좋아요 / 좋아요 취소
 
     ---
     ## `/api/v1/post/favs/{id}`
 
         - id: Post ID
+
+    **PUT(좋아요), DELETE(좋아요 취소)는 여러번 요청해도 결과가 같다.**
     """
     try:
+        # 요청이 몰리는 게시물 찾기 (metrics, 상세 조회 cache)
+        detail_cache.track(Post, pk)
         if request.method == 'GET':
-            post_id = Like.objects.filter(post_id=pk)
+            # 좋아요 수는 Post row에 저장된 counter를 읽고, 닉네임은 JOIN 한번으로 가져온다.
+            like_count = Post.objects.filter(pk=pk).values_list('like_count', flat=True).first()
+            user_list = Like.objects.filter(post_id=pk).values_list('user__nickname', flat=True)
             serializer = {
                 'post_id': pk,
-                'like_count': post_id.count(),
-                'user_list': [i.user.nickname for i in post_id],
+                'like_count': like_count or 0,
+                'user_list': list(user_list),
             }
             return Response(data=serializer, status=status.HTTP_200_OK)
-    except Like.DoesNotExist:
+
+        if not request.user.is_authenticated:
+            response_message = {'003': '자격 인증 데이터(JWT)가 조회되지 않습니다.'}
+            return Response(data=response_message, status=status.HTTP_403_FORBIDDEN)
+
+        if request.method == 'PUT':
+            _, like_count = like_backend().like(request.user.pk, pk)
+            liked = True
+        else:
+            _, like_count = like_backend().unlike(request.user.pk, pk)
+            liked = False
+        response_message = {'post_id': pk, 'liked': liked, 'like_count': like_count}
+        return Response(data=response_message, status=status.HTTP_200_OK)
+    except (Like.DoesNotExist, Post.DoesNotExist):
         response_message = {'004': 'post_id가 없습니다.'}
         return Response(data=response_message, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
@@ -638,7 +817,11 @@ post_search_response_schema_dict = {
                         'content': openapi.Schema('게시물 내용', type=openapi.TYPE_STRING),
                         'lat': openapi.Schema('위도', type=openapi.TYPE_STRING),
                         'lng': openapi.Schema('경도', type=openapi.TYPE_STRING),
-                        'is_public': openapi.Schema('게시물 활성화', type=openapi.TYPE_BOOLEAN)
+                        'is_public': openapi.Schema('게시물 활성화', type=openapi.TYPE_BOOLEAN),
+                        'like_count': openapi.Schema('게시물 좋아요 갯수', type=openapi.TYPE_INTEGER),
+                        'comment_count': openapi.Schema('게시물 댓글 갯수', type=openapi.TYPE_INTEGER),
+                        'photo_count': openapi.Schema('게시물 사진 갯수', type=openapi.TYPE_INTEGER),
+                        'has_liked': openapi.Schema('내가 좋아요 한 게시물인지 (로그인 안했으면 false)', type=openapi.TYPE_BOOLEAN)
                     }
                 )
             ),
@@ -676,6 +859,24 @@ post_search_response_schema_dict = {
             type=openapi.TYPE_STRING,
             description='경도'
         ),
+        openapi.Parameter(
+            'radius',
+            openapi.IN_QUERY,
+            type=openapi.TYPE_NUMBER,
+            description='검색 범위 (단위: 도, 기본값 0.005)'
+        ),
+        openapi.Parameter(
+            'fields',
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            description='응답할 field (쉼표로 구분, ex. id,lat,lng)'
+        ),
+        openapi.Parameter(
+            'exclude',
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            description='응답에서 뺄 field (쉼표로 구분)'
+        ),
     ],
     responses=post_search_response_schema_dict
 )
@@ -690,34 +891,552 @@ def post_search(request):
     **아래 파라미터들은 URL query string으로 전달되어야 합니다. (아무것도 입력 안할 시 전체 검색 함)**
 
         - is_public: 게시물 활성화 여부(True/False)
-        - lat: 위도 좌표 (+-0.005의 위치까지의 범위는 인식 가능)
-        - lng: 경도 좌표 (+-0.005의 위치까지의 범위는 인식 가능)
+        - lat: 위도 좌표 (+-radius의 위치까지의 범위는 인식 가능)
+        - lng: 경도 좌표 (+-radius의 위치까지의 범위는 인식 가능)
+        - radius: 검색 범위 (단위: 도, 기본값 0.005, 최대 1.0)
+        - cursor: cursor 방식 pagination 사용 (첫 page는 빈 값, 이후는 응답의 next 사용)
+        - fields / exclude: 응답할/뺄 field (ex. fields=id,lat,lng 이면 게시물 내용, 작성자는 읽지 않는다.)
     """
     try:
         is_public = request.GET.get('is_public', None)
         lat = request.GET.get('lat', None)
         lng = request.GET.get('lng', None)
+        radius = request.GET.get('radius', settings.POST_SEARCH_RADIUS)
         filter_kwargs = {}
         # 여러개 사용할때 이렇게 쓰면 유용할듯하다.
         # 지금은 하나만 예시로 들었다.
         if is_public is not None:
             filter_kwargs['is_public'] = is_public
+        posts = Post.objects.filter(**filter_kwargs)
         if lat is not None and lng is not None:
-            filter_kwargs['lat__gte'] = float(lat) - 0.005  # gte -> 크거나 같음  / -는 왼쪽
-            filter_kwargs['lat__lte'] = float(lat) + 0.005  # lte -> 작거나 같음  / +는 오른쪽
-            filter_kwargs['lng__gte'] = float(lng) - 0.005
-            filter_kwargs['lng__lte'] = float(lng) + 0.005
+            try:
+                lat, lng = geo.parse_point(lat, lng)
+                radius = float(radius)
+            except ValueError:
+                response_message = {'002': '값이 유효하지 않습니다.'}
+                return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+            if not (math.isfinite(radius) and 0 < radius <= settings.POST_SEARCH_MAX_RADIUS):
+                response_message = {'002': f'radius는 0 ~ {settings.POST_SEARCH_MAX_RADIUS} 사이의 값이어야 합니다.'}
+                return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+            # geo_cell index로 후보를 줄인 뒤 정확한 범위(+-radius)를 확인한다.
+            posts = posts.within(lat, lng, radius)
         paginator = OwnPagination()
-        posts = Post.objects.filter(**filter_kwargs)
+        fields = PostListSerializer.get_sparse_fields(request)
+        posts = PostListSerializer.setup_queryset(posts, fields, request.user)
         result = paginator.paginate_queryset(posts, request)
-        serializer = PostSerializer(result, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        pending = pending_likes(request, result)
+        etag, last_modified = conditional.page_validators(
+            result, (paginator.get_page_state(), fields, request.user.pk, pending), related=('user',)
+        )
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        serializer = PostListSerializer(result, many=True, fields=fields)
+        response = paginator.get_paginated_response(serializer.data)
+        return conditional.with_validators(response, etag, last_modified)
+    except InvalidCursor:
+        response_message = {'002': 'cursor 값이 유효하지 않습니다.'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except InvalidQueryParam as e:
+        response_message = {'002': f'{e.param} 값이 유효하지 않습니다. ({", ".join(e.values)})'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        print(f'error : {e}')
+        response_message = {'999': '서버 에러'}
+        return Response(data=response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+content_search_response_schema_dict = {
+    200: openapi.Schema(
+        'response_data',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'next': openapi.Schema('다음 page 주소 (없으면 null)', type=openapi.TYPE_STRING),
+            'results': openapi.Schema(
+                '점수 순서의 게시물/댓글 리스트 (리스트 조회와 같은 형태 + score)',
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Items(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "id": openapi.Schema('게시물/댓글 ID', type=openapi.TYPE_INTEGER),
+                        'content': openapi.Schema('내용', type=openapi.TYPE_STRING),
+                        'score': openapi.Schema('검색 점수', type=openapi.TYPE_INTEGER),
+                    }
+                )
+            ),
+        }
+    ),
+    400: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_400_NO_REQUIRED_PARAMETERS.get_error_code():
+                error_controlloer.APPLY_400_NO_REQUIRED_PARAMETERS.get_error_description(),
+            error_controlloer.APPLY_400_VALUE_NOT_VALID.get_error_code():
+                error_controlloer.APPLY_400_VALUE_NOT_VALID.get_error_description()
+        }
+    ),
+    500: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_500_SERVER_ERROR.get_error_code():
+                error_controlloer.APPLY_500_SERVER_ERROR.get_error_description()
+        }
+    )
+}
+
+
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=[
+        openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='검색어'),
+        openapi.Parameter('type', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='post(기본값) / comment'),
+        openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='이전 응답의 next에 들어있는 cursor'),
+    ],
+    responses=content_search_response_schema_dict
+)
+@api_view(['GET'])
+def content_search(request):
+    """
+    게시물/댓글 내용 검색
+
+    ---
+    ## `/api/v1/search/?q=`
+    ## Query Parameters
+    **검색어의 모든 글자 조합(CONTENT_SEARCH_GRAM_SIZE 글자씩)이 들어있는 공개 게시물/댓글을 점수 순서로 보여준다.**
+
+        - q: 검색어 (CONTENT_SEARCH_GRAM_SIZE 글자 이상인 단어가 있어야 한다.)
+        - type: post(기본값) / comment
+        - cursor: 이전 응답의 next에 들어있는 cursor (없으면 첫 page)
+        - fields / exclude: 응답할/뺄 field
+    """
+    try:
+        query = request.GET.get('q', '')
+        kind = request.GET.get('type', 'post')
+        if not query.strip():
+            response_message = {'000': '필수 파라미터(q) 없음'}
+            return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+        if kind not in search.KINDS:
+            raise InvalidQueryParam('type', [kind])
+        serializer_class = PostListSerializer if kind == 'post' else CommentListSerializer
+        fields = serializer_class.get_sparse_fields(request, extra_fields=('score',))
+
+        backend = search.get_backend()
+        documents = search.visible_documents(kind)
+        paginator = RankedPagination()
+        try:
+            rows = paginator.paginate(
+                lambda after, size: backend.search(kind, query, documents, after, size), request
+            )
+        except InvalidCursor:
+            raise
+        except ValueError:
+            response_message = {'002': f'검색어는 {settings.CONTENT_SEARCH_GRAM_SIZE}글자 이상이어야 합니다.'}
+            return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+
+        model = search.KINDS[kind][1]
+        objects = serializer_class.setup_queryset(model.objects.all(), fields, request.user).in_bulk(
+            [pk for pk, score in rows]
+        )
+        if model is Post:
+            pending_likes(request, list(objects.values()))
+        results = []
+        for pk, score in rows:
+            # 검색한 다음에 삭제된 문서는 뺀다.
+            if pk not in objects:
+                continue
+            data = serializer_class(objects[pk], fields=fields).data
+            if fields is None or 'score' in fields:
+                data['score'] = score
+            results.append(data)
+        return paginator.get_paginated_response(results)
+    except InvalidCursor:
+        response_message = {'002': 'cursor 값이 유효하지 않습니다.'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except InvalidQueryParam as e:
+        response_message = {'002': f'{e.param} 값이 유효하지 않습니다. ({", ".join(e.values)})'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         print(f'error : {e}')
         response_message = {'999': '서버 에러'}
         return Response(data=response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+post_nearby_response_schema_dict = {
+    200: openapi.Schema(
+        'response_data',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'results': openapi.Schema(
+                '가까운 순서의 게시물 리스트 (게시물 리스트 조회와 같은 형태 + distance)',
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Items(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "id": openapi.Schema('게시물 ID', type=openapi.TYPE_INTEGER),
+                        'content': openapi.Schema('게시물 내용', type=openapi.TYPE_STRING),
+                        'lat': openapi.Schema('위도', type=openapi.TYPE_STRING),
+                        'lng': openapi.Schema('경도', type=openapi.TYPE_STRING),
+                        'distance': openapi.Schema('거리(미터)', type=openapi.TYPE_NUMBER),
+                    }
+                )
+            ),
+        }
+    ),
+    400: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_400_VALUE_NOT_VALID.get_error_code():
+                error_controlloer.APPLY_400_VALUE_NOT_VALID.get_error_description()
+        }
+    ),
+    500: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_500_SERVER_ERROR.get_error_code():
+                error_controlloer.APPLY_500_SERVER_ERROR.get_error_description()
+        }
+    )
+}
+
+
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=[
+        openapi.Parameter('lat', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='위도'),
+        openapi.Parameter('lng', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='경도'),
+        openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='게시물 수 (기본값 20)'),
+    ],
+    responses=post_nearby_response_schema_dict
+)
+@api_view(['GET'])
+def post_nearby(request):
+    """
+    가까운 게시물 찾기
+
+    ---
+    ## `/api/v1/post/nearby/`
+    ## Query Parameters
+    **공개된 게시물 중 (lat, lng)에서 가까운 순서로 limit개를 보여준다.**
+
+        - lat: 위도 좌표
+        - lng: 경도 좌표
+        - limit: 게시물 수 (기본값 20, 최대 100)
+    """
+    try:
+        try:
+            lat, lng = geo.parse_point(request.GET['lat'], request.GET['lng'])
+            limit = int(request.GET.get('limit', 20))
+        except KeyError:
+            response_message = {'000': '필수 파라미터(lat, lng) 없음'}
+            return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            response_message = {'002': '값이 유효하지 않습니다.'}
+            return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, 100))
+        fields = PostListSerializer.get_sparse_fields(request, extra_fields=('distance',))
+
+        nearest = Post.objects.filter(is_public=True).nearest(lat, lng, limit)
+        posts = PostListSerializer.setup_queryset(Post.objects.filter(is_public=True), fields, request.user).in_bulk(
+            [pk for pk, meters in nearest]
+        )
+        pending_likes(request, list(posts.values()))
+        results = []
+        for pk, meters in nearest:
+            # 거리를 계산한 다음에 삭제/비공개된 게시물은 뺀다.
+            if pk not in posts:
+                continue
+            data = PostListSerializer(posts[pk], fields=fields).data
+            if fields is None or 'distance' in fields:
+                data['distance'] = round(meters, 1)
+            results.append(data)
+        return Response(data={'results': results}, status=status.HTTP_200_OK)
+    except InvalidQueryParam as e:
+        response_message = {'002': f'{e.param} 값이 유효하지 않습니다. ({", ".join(e.values)})'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        print(f'error : {e}')
+        response_message = {'999': '서버 에러'}
+        return Response(data=response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+post_trending_response_schema_dict = {
+    200: openapi.Schema(
+        'response_data',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'refreshed_at': openapi.Schema('점수 계산 시각', type=openapi.TYPE_STRING),
+            'results': openapi.Schema(
+                '점수 순서의 게시물 리스트 (게시물 리스트 조회와 같은 형태 + score)',
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Items(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "id": openapi.Schema('게시물 ID', type=openapi.TYPE_INTEGER),
+                        'content': openapi.Schema('게시물 내용', type=openapi.TYPE_STRING),
+                        'like_count': openapi.Schema('좋아요 수', type=openapi.TYPE_INTEGER),
+                        'comment_count': openapi.Schema('댓글 수', type=openapi.TYPE_INTEGER),
+                        'score': openapi.Schema('인기 점수', type=openapi.TYPE_NUMBER),
+                    }
+                )
+            ),
+        }
+    ),
+    400: post_nearby_response_schema_dict[400],
+    500: post_nearby_response_schema_dict[500],
+}
+
+
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=[
+        openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='게시물 수 (기본값 20)'),
+    ],
+    responses=post_trending_response_schema_dict
+)
+@api_view(['GET'])
+def post_trending(request):
+    """
+    인기 게시물
+
+    ---
+    ## `/api/v1/post/trending/`
+    ## Query Parameters
+    **최근 좋아요/댓글이 많은 공개 게시물 순서로 limit개를 보여준다. (최근 활동일수록 점수가 높다.)**
+    **점수는 주기적으로 다시 계산하기 때문에 방금 누른 좋아요는 바로 반영되지 않을 수 있다.**
+
+        - limit: 게시물 수 (기본값 20, 최대 TRENDING_SIZE)
+        - fields / exclude: 응답할/뺄 field
+    """
+    try:
+        try:
+            limit = int(request.GET.get('limit', 20))
+        except ValueError:
+            response_message = {'002': '값이 유효하지 않습니다.'}
+            return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.TRENDING_SIZE))
+        fields = PostListSerializer.get_sparse_fields(request, extra_fields=('score',))
+
+        entry = trending.get_trending()
+        ranked = entry['posts'][:limit]
+        posts = PostListSerializer.setup_queryset(Post.objects.filter(is_public=True), fields, request.user).in_bulk(
+            [pk for pk, score in ranked]
+        )
+        pending_likes(request, list(posts.values()))
+        results = []
+        for pk, score in ranked:
+            # 점수를 계산한 다음에 삭제/비공개된 게시물은 뺀다.
+            if pk not in posts:
+                continue
+            data = PostListSerializer(posts[pk], fields=fields).data
+            if fields is None or 'score' in fields:
+                data['score'] = round(score, 3)
+            results.append(data)
+        response_message = {'refreshed_at': entry['refreshed_at'], 'results': results}
+        return Response(data=response_message, status=status.HTTP_200_OK)
+    except InvalidQueryParam as e:
+        response_message = {'002': f'{e.param} 값이 유효하지 않습니다. ({", ".join(e.values)})'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        print(f'error : {e}')
+        response_message = {'999': '서버 에러'}
+        return Response(data=response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+post_tile_response_schema_dict = {
+    200: openapi.Schema(
+        'response_data',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'z': openapi.Schema('zoom level', type=openapi.TYPE_INTEGER),
+            'x': openapi.Schema('tile x', type=openapi.TYPE_INTEGER),
+            'y': openapi.Schema('tile y', type=openapi.TYPE_INTEGER),
+            'cells': openapi.Schema(
+                '게시물이 있는 칸 리스트',
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Items(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'x': openapi.Schema('tile 안에서 칸의 x (0 ~ 7)', type=openapi.TYPE_INTEGER),
+                        'y': openapi.Schema('tile 안에서 칸의 y (0 ~ 7)', type=openapi.TYPE_INTEGER),
+                        'count': openapi.Schema('공개 게시물 수', type=openapi.TYPE_INTEGER),
+                        'post_id': openapi.Schema('대표 게시물 ID', type=openapi.TYPE_INTEGER),
+                    }
+                )
+            ),
+        }
+    ),
+    400: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_400_VALUE_NOT_VALID.get_error_code():
+                error_controlloer.APPLY_400_VALUE_NOT_VALID.get_error_description()
+        }
+    ),
+    500: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_500_SERVER_ERROR.get_error_code():
+                error_controlloer.APPLY_500_SERVER_ERROR.get_error_description()
+        }
+    )
+}
+
+
+@swagger_auto_schema(
+    method='get',
+    responses=post_tile_response_schema_dict
+)
+@api_view(['GET'])
+def post_tile(request, z, x, y):
+    """
+    지도 tile 안의 칸별 게시물 수
+
+    ---
+    ## `/api/v1/post/tiles/{z}/{x}/{y}/`
+    **web mercator tile (z, x, y)를 8 x 8 칸으로 나눠서 칸별 공개 게시물 수와 대표 게시물을 보여준다.**
+    (미리 집계된 값을 읽기 때문에 게시물 수와 상관없이 응답 크기가 작다.)
+
+        - z: zoom level (0 ~ 15)
+        - x, y: tile 번호
+    """
+    try:
+        if z > settings.TILE_MAX_ZOOM or x >= 1 << z or y >= 1 << z:
+            response_message = {'002': '값이 유효하지 않습니다.'}
+            return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+        size = 1 << settings.TILE_CELL_BITS
+        cells = [
+            {'x': cell['x'] - x * size, 'y': cell['y'] - y * size, 'count': cell['count'], 'post_id': cell['post_id']}
+            for cell in tiles.tile_cells(z, x, y)
+        ]
+        return Response(data={'z': z, 'x': x, 'y': y, 'cells': cells}, status=status.HTTP_200_OK)
+    except Exception as e:
+        print(f'error : {e}')
+        response_message = {'999': '서버 에러'}
+        return Response(data=response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_summary='''팔로우 한 사용자들의 게시물 (home timeline)''',
+    manual_parameters=[
+        openapi.Parameter(
+            'authorication',
+            openapi.IN_PATH,
+            type=openapi.TYPE_STRING,
+            description='API 키: 헤더에 Authorization Bearer {API Key} 형태로 전달'
+        ),
+        openapi.Parameter(
+            'cursor',
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            description='cursor 방식 pagination (첫 page는 빈 값)'
+        ),
+    ],
+    responses=post_get_response_schema_dict
+)
+@api_view(['GET'])
+def feed_view(request):
+    """
+    home timeline
+
+    ---
+    ## `/api/v1/feed/`
+    **본인과 팔로우 한 사용자들의 게시물을 최신순으로 보여준다.**
+    게시물 생성시 미리 넣어둔 timeline을 읽기 때문에 팔로우 한 사용자 수와 상관없이 조회 비용이 같다.
+    """
+    try:
+        if not request.user.is_authenticated:
+            response_message = {'003': '자격 인증 데이터(JWT)가 조회되지 않습니다.'}
+            return Response(data=response_message, status=status.HTTP_403_FORBIDDEN)
+        paginator = OwnPagination()
+        # 첫 page를 볼때만 팔로워가 많아 fan-out 되지 않은 사용자의 게시물을 합친다.
+        if not request.GET.get('cursor') and request.GET.get('page', '1') == '1':
+            pull_fan_out_skipped_posts(request.user)
+        fields = PostListSerializer.get_sparse_fields(request)
+        select_related_fields = [f'post__{field}' for field in PostListSerializer.get_select_related_fields(fields)]
+        feeds = Feed.objects.filter(user=request.user).select_related('post', *select_related_fields).only(
+            'id', 'created_at', *[f'post__{field}' for field in PostListSerializer.get_only_fields(fields)]
+        ).annotate(**PostListSerializer.get_viewer_annotations(request.user, fields, 'post_id'))
+        result = paginator.paginate_queryset(feeds, request)
+        posts = []
+        for feed in result:
+            if hasattr(feed, 'has_liked'):
+                feed.post.has_liked = feed.has_liked
+            posts.append(feed.post)
+        pending = pending_likes(request, posts)
+        etag, last_modified = conditional.page_validators(
+            posts, (paginator.get_page_state(), fields, request.user.pk, pending), related=('user',)
+        )
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        serializer = PostListSerializer(posts, many=True, fields=fields)
+        response = paginator.get_paginated_response(serializer.data)
+        return conditional.with_validators(response, etag, last_modified)
+    except InvalidCursor:
+        response_message = {'002': 'cursor 값이 유효하지 않습니다.'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except InvalidQueryParam as e:
+        response_message = {'002': f'{e.param} 값이 유효하지 않습니다. ({", ".join(e.values)})'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        print(f'error : {e}')
+        response_message = {'999': '서버 에러'}
+        return Response(data=response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+included_response_schema = openapi.Schema(
+    'expand 한 관계 (?expand=post,user 일때만)',
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'posts': openapi.Schema(
+            '게시물 리스트 (작성자는 id)',
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Items(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "id": openapi.Schema('Post(게시물) ID', type=openapi.TYPE_INTEGER),
+                    "user": openapi.Schema('작성자(User) ID', type=openapi.TYPE_INTEGER),
+                    "content": openapi.Schema('게시물 내용', type=openapi.TYPE_STRING),
+                    "lat": openapi.Schema('위도', type=openapi.TYPE_STRING),
+                    "lng": openapi.Schema('경도', type=openapi.TYPE_STRING),
+                    "is_public": openapi.Schema('게시물 활성화', type=openapi.TYPE_BOOLEAN)
+                }
+            )
+        ),
+        'users': openapi.Schema(
+            '사용자 리스트',
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Items(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "id": openapi.Schema('사용자 ID', type=openapi.TYPE_INTEGER),
+                    "fullname": openapi.Schema('사용자 이름', type=openapi.TYPE_STRING),
+                    "nickname": openapi.Schema('사용자 닉네임', type=openapi.TYPE_STRING),
+                    "email": openapi.Schema('이메일', type=openapi.TYPE_STRING),
+                    "introduce": openapi.Schema('소개', type=openapi.TYPE_STRING),
+                    "phone": openapi.Schema('휴대폰 번호', type=openapi.TYPE_STRING),
+                    "gender": openapi.Schema('성별(비공개:0, 남자:1, 여자:2)', type=openapi.TYPE_INTEGER),
+                    "is_active": openapi.Schema('계정 활성', type=openapi.TYPE_BOOLEAN),
+                    "is_admin": openapi.Schema('관리자', type=openapi.TYPE_BOOLEAN)
+                }
+            )
+        ),
+    }
+)
+expand_parameter = openapi.Parameter(
+    'expand',
+    openapi.IN_QUERY,
+    type=openapi.TYPE_STRING,
+    description='included에 함께 담을 관계 (post, user 중 쉼표로 구분)'
+)
+
 comments_get_response_schema_dict = {
     200: openapi.Schema(
         'response_data',
@@ -731,54 +1450,19 @@ comments_get_response_schema_dict = {
             ),
             'previous': openapi.Schema('이전 페이지', type=openapi.TYPE_FILE),
             'results': openapi.Schema(
-                '사진을 사용한 게시물',
+                '댓글 리스트',
                 type=openapi.TYPE_ARRAY,
                 items=openapi.Items(
                     type=openapi.TYPE_OBJECT,
                     properties={
                         "id": openapi.Schema('댓글(Comment) ID', type=openapi.TYPE_INTEGER),
-                        "user": openapi.Schema(
-                            type=openapi.TYPE_OBJECT,
-                            properties={
-                                "id": openapi.Schema('사용자 ID', type=openapi.TYPE_INTEGER),
-                                "fullname": openapi.Schema('사용자 이름', type=openapi.TYPE_STRING),
-                                "nickname": openapi.Schema('사용자 닉네임', type=openapi.TYPE_STRING),
-                                "email": openapi.Schema('이메일', type=openapi.TYPE_STRING),
-                                "introduce": openapi.Schema('소개', type=openapi.TYPE_STRING),
-                                "phone": openapi.Schema('휴대폰 번호', type=openapi.TYPE_STRING),
-                                "gender": openapi.Schema('성별(비공개:0, 남자:1, 여자:2)', type=openapi.TYPE_INTEGER),
-                                "is_active": openapi.Schema('계정 활성', type=openapi.TYPE_BOOLEAN),
-                                "is_admin": openapi.Schema('관리자', type=openapi.TYPE_BOOLEAN)
-                            }
-                        ),
-                        "post": openapi.Schema(
-                            type=openapi.TYPE_OBJECT,
-                            properties={
-                                "id": openapi.Schema('Post(게시물) ID', type=openapi.TYPE_INTEGER),
-                                "user": openapi.Schema(
-                                    type=openapi.TYPE_OBJECT,
-                                    properties={
-                                        "id": openapi.Schema('사용자 ID', type=openapi.TYPE_INTEGER),
-                                        "fullname": openapi.Schema('사용자 이름', type=openapi.TYPE_STRING),
-                                        "nickname": openapi.Schema('사용자 닉네임', type=openapi.TYPE_STRING),
-                                        "email": openapi.Schema('이메일', type=openapi.TYPE_STRING),
-                                        "introduce": openapi.Schema('소개', type=openapi.TYPE_STRING),
-                                        "phone": openapi.Schema('휴대폰 번호', type=openapi.TYPE_STRING),
-                                        "gender": openapi.Schema('성별(비공개:0, 남자:1, 여자:2)', type=openapi.TYPE_INTEGER),
-                                        "is_active": openapi.Schema('계정 활성', type=openapi.TYPE_BOOLEAN),
-                                        "is_admin": openapi.Schema('관리자', type=openapi.TYPE_BOOLEAN)
-                                    }
-                                ),
-                                "content": openapi.Schema('게시물 내용', type=openapi.TYPE_STRING),
-                                "lat": openapi.Schema('위도', type=openapi.TYPE_STRING),
-                                "lng": openapi.Schema('경도', type=openapi.TYPE_STRING),
-                                "is_public": openapi.Schema('게시물 활성화', type=openapi.TYPE_BOOLEAN)
-                            }
-                        ),
+                        "user": openapi.Schema('작성자(User) ID', type=openapi.TYPE_INTEGER),
+                        "post": openapi.Schema('Post(게시물) ID', type=openapi.TYPE_INTEGER),
                         "content": openapi.Schema('댓글 내용', type=openapi.TYPE_STRING)
                     }
                 )
             ),
+            'included': included_response_schema,
         }
     ),
     500: openapi.Schema(
@@ -888,7 +1572,10 @@ comments_post_response_schema_dict = {
     operation_description=
     '''
     ## `/api/v1/comment/`
+
+        - expand: 작성자/게시물을 id 대신 included에 담기 (ex. ?expand=post,user)
     ''',
+    manual_parameters=[expand_parameter],
     responses=comments_get_response_schema_dict
 )
 @swagger_auto_schema(
@@ -928,10 +1615,23 @@ def comments_view(request):
     try:
         if request.method == 'GET':
             paginator = OwnPagination()
-            comments = Comment.objects.all()
+            expand = CommentListSerializer.get_expand(request)
+            fields = CommentListSerializer.get_sparse_fields(request)
+            comments = CommentListSerializer.setup_queryset(Comment.objects.all(), fields, expand=expand)
             result = paginator.paginate_queryset(comments, request)
-            serializer = CommentSerializer(result, many=True, context={'request': request})
-            return paginator.get_paginated_response(serializer.data)
+            # 작성자/게시물은 id로 내려주고 expand 한 관계만 page 단위로 한번씩 가져온다.
+            included, objects = CommentListSerializer.get_included(result, expand)
+            etag, last_modified = conditional.page_validators(
+                objects, (paginator.get_page_state(), sorted(expand), fields)
+            )
+            response = conditional.not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+            serializer = CommentListSerializer(result, many=True, fields=fields, context={'request': request})
+            response = paginator.get_paginated_response(serializer.data)
+            if expand:
+                response.data['included'] = included
+            return conditional.with_validators(response, etag, last_modified)
         elif request.method == 'POST':
             # 필수 파라미터 검증
             post_id = request.data.get('post_id')
@@ -946,7 +1646,8 @@ def comments_view(request):
             if post.user == request.user:
                 serializer = CommentSerializer(data=request.data)
                 if serializer.is_valid():
-                    comment = serializer.save(user=request.user, post=post)
+                    with transaction.atomic():
+                        comment = serializer.save(user=request.user, post=post)
                     comment_serializer = CommentSerializer(comment).data
                     return Response(data=comment_serializer, status=status.HTTP_200_OK)
                 else:
@@ -960,6 +1661,12 @@ def comments_view(request):
     except Post.DoesNotExist:
         response_message = {'004': '찾고자 하는 (사용자/게시물)가 없습니다.'}
         return Response(data=response_message, status=status.HTTP_404_NOT_FOUND)
+    except InvalidCursor:
+        response_message = {'002': 'cursor 값이 유효하지 않습니다.'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except InvalidQueryParam as e:
+        response_message = {'002': f'{e.param} 값이 유효하지 않습니다. ({", ".join(e.values)})'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         print(f'error: {e}')
         response_message = {'999': '서버 에러'}
@@ -1198,11 +1905,13 @@ def comment_view(request, pk):
     DELETE: comment 삭제
     """
     try:
-        comment = Comment.objects.get(pk=pk)
         if request.method == 'GET':
-            serializer = CommentSerializer(comment).data
-            return Response(serializer)
-        elif comment.user == request.user:
+            fields = CommentSerializer.get_sparse_fields(request)
+            return detail_cache.detail_response(
+                request, Comment, pk, lambda: comment_detail_data(pk), lambda: comment_detail_validators(pk), fields
+            )
+        comment = Comment.objects.get(pk=pk)
+        if comment.user == request.user:
             if request.method == 'PUT':
                 serializer = CommentSerializer(comment, data=request.data, partial=True)
                 if serializer.is_valid():
@@ -1222,6 +1931,9 @@ def comment_view(request, pk):
     except Comment.DoesNotExist:
         response_message = {'004': '찾고자하는 내용이 없습니다.'}
         return Response(data=response_message, status=status.HTTP_404_NOT_FOUND)
+    except InvalidQueryParam as e:
+        response_message = {'002': f'{e.param} 값이 유효하지 않습니다. ({", ".join(e.values)})'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         print(f'error : {e}')
         response_message = {'999': '서버 에러'}
@@ -1241,39 +1953,18 @@ photos_get_api_schema_dict = {
             ),
             'previous': openapi.Schema('이전 페이지', type=openapi.TYPE_FILE),
             'results': openapi.Schema(
-                '사진을 사용한 게시물',
+                '사진 리스트',
                 type=openapi.TYPE_ARRAY,
                 items=openapi.Items(
                     type=openapi.TYPE_OBJECT,
                     properties={
                         "id": openapi.Schema('Photo(사진) ID', type=openapi.TYPE_INTEGER),
-                        "post": openapi.Schema(
-                            type=openapi.TYPE_OBJECT,
-                            properties={
-                                "id": openapi.Schema('Post(게시물) ID', type=openapi.TYPE_INTEGER),
-                                "user": openapi.Schema(
-                                    type=openapi.TYPE_OBJECT,
-                                    properties={
-                                        "fullname": openapi.Schema('사용자 이름', type=openapi.TYPE_STRING),
-                                        "nickname": openapi.Schema('사용자 닉네임', type=openapi.TYPE_STRING),
-                                        "email": openapi.Schema('이메일', type=openapi.TYPE_STRING),
-                                        "introduce": openapi.Schema('소개', type=openapi.TYPE_STRING),
-                                        "phone": openapi.Schema('휴대폰 번호', type=openapi.TYPE_STRING),
-                                        "gender": openapi.Schema('성별(비공개:0, 남자:1, 여자:2)', type=openapi.TYPE_INTEGER),
-                                        "is_active": openapi.Schema('계정 활성', type=openapi.TYPE_BOOLEAN),
-                                        "is_admin": openapi.Schema('관리자', type=openapi.TYPE_BOOLEAN)
-                                    }
-                                ),
-                                "content": openapi.Schema('게시물 내용', type=openapi.TYPE_STRING),
-                                "lat": openapi.Schema('위도', type=openapi.TYPE_STRING),
-                                "lng": openapi.Schema('경도', type=openapi.TYPE_STRING),
-                                "is_public": openapi.Schema('게시물 활성화', type=openapi.TYPE_BOOLEAN)
-                            }
-                        ),
+                        "post": openapi.Schema('Post(게시물) ID', type=openapi.TYPE_INTEGER),
                         "image": openapi.Schema('사진 경로', type=openapi.TYPE_STRING)
                     }
                 )
             ),
+            'included': included_response_schema,
         }
     ),
     500: openapi.Schema(
@@ -1348,7 +2039,10 @@ photos_post_api_schema_dict = {
     operation_description=
     '''
     ## `api/v1/photo/`
+
+        - expand: 게시물/게시물 작성자를 id 대신 included에 담기 (ex. ?expand=post,user)
     ''',
+    manual_parameters=[expand_parameter],
     responses=photos_get_api_schema_dict
 )
 @swagger_auto_schema(
@@ -1370,10 +2064,22 @@ def photos_view(request):
     try:
         if request.method == 'GET':
             paginator = OwnPagination()
-            photos = Photo.objects.all()
+            expand = PhotoListSerializer.get_expand(request)
+            fields = PhotoListSerializer.get_sparse_fields(request)
+            photos = PhotoListSerializer.setup_queryset(Photo.objects.all(), fields, expand=expand)
             result = paginator.paginate_queryset(photos, request)
-            serializer = PhotoSerializer(result, many=True, context={'request': request})
-            return paginator.get_paginated_response(serializer.data)
+            included, objects = PhotoListSerializer.get_included(result, expand)
+            etag, last_modified = conditional.page_validators(
+                objects, (paginator.get_page_state(), sorted(expand), fields)
+            )
+            response = conditional.not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+            serializer = PhotoListSerializer(result, many=True, fields=fields, context={'request': request})
+            response = paginator.get_paginated_response(serializer.data)
+            if expand:
+                response.data['included'] = included
+            return conditional.with_validators(response, etag, last_modified)
         elif request.method == 'POST':
             post_id = request.data.get('post_id')
             if not post_id:
@@ -1390,7 +2096,8 @@ def photos_view(request):
 
             serializer = PhotoSerializer(data=request.data)
             if serializer.is_valid():
-                photo = serializer.save(post=post)
+                with transaction.atomic():
+                    photo = serializer.save(post=post)
                 # photo_serializer = PhotoSerializer(photo).data
                 response_message = {'message': '사진 저장이 완료되었습니다.'}
                 return Response(data=response_message, status=status.HTTP_200_OK)
@@ -1401,6 +2108,12 @@ def photos_view(request):
     except Post.DoesNotExist:
         response_message = {'004': '찾고자 하는 (사용자/게시물)가 없습니다.'}
         return Response(data=response_message, status=status.HTTP_404_NOT_FOUND)
+    except InvalidCursor:
+        response_message = {'002': 'cursor 값이 유효하지 않습니다.'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except InvalidQueryParam as e:
+        response_message = {'002': f'{e.param} 값이 유효하지 않습니다. ({", ".join(e.values)})'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         print(f'error: {e}')
         response_message = {'999': '서버 에러'}
@@ -1598,11 +2311,13 @@ photo_delete_schema_dict = {
 @permission_classes([PhotoOwner])
 def photo_view(request, pk):
     try:
-        photo = Photo.objects.get(pk=pk)
         if request.method == 'GET':
-            serializer = PhotoSerializer(photo).data
-            return Response(serializer, status=status.HTTP_200_OK)
-        elif photo.post.user == request.user:
+            fields = PhotoSerializer.get_sparse_fields(request)
+            return detail_cache.detail_response(
+                request, Photo, pk, lambda: photo_detail_data(pk), lambda: photo_detail_validators(pk), fields
+            )
+        photo = Photo.objects.get(pk=pk)
+        if photo.post.user == request.user:
             if request.method == 'PUT':
                 serializer = PhotoSerializer(photo, data=request.data, partial=True)
                 if serializer.is_valid():
@@ -1623,6 +2338,9 @@ def photo_view(request, pk):
     except Photo.DoesNotExist:
         response_message = {'004': '찾고자 하는 (사용자/게시물)가 없습니다.'}
         return Response(data=response_message, status=status.HTTP_404_NOT_FOUND)
+    except InvalidQueryParam as e:
+        response_message = {'002': f'{e.param} 값이 유효하지 않습니다. ({", ".join(e.values)})'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         print(f'error: {e}')
         response_message = {'999': '서버 에러'}
@@ -1,13 +1,43 @@
+import hashlib
 import jwt
 from django.conf import settings
 from rest_framework import authentication
 from rest_framework import exceptions
+from core.lru import LRUCache
 from users.models import User
 
+# 검증이 끝난 token -> user pk / user pk -> user column 값
+# (JWT_AUTH_CACHE_TTL 초 동안 token 검증과 User 조회를 생략한다.)
+token_cache = LRUCache(max_size=settings.JWT_AUTH_CACHE_SIZE, ttl=settings.JWT_AUTH_CACHE_TTL)
+user_cache = LRUCache(max_size=settings.JWT_AUTH_CACHE_SIZE, ttl=settings.JWT_AUTH_CACHE_TTL)
+
+# request.user로 읽는 column만 저장한다. (권한 확인, 내정보 응답, 팔로우 수 - password hash 등은 저장하지 않음)
+# 여기 없는 column은 읽을때 DB에서 가져온다. (deferred field)
+USER_CACHE_FIELDS = [
+    'id', 'fullname', 'nickname', 'email', 'introduce', 'phone', 'gender', 'is_active', 'is_admin',
+    'followers_count', 'followings_count', 'updated_at',
+]
+
+
+def invalidate_cached_user(pk):
+    """사용자 정보가 바뀌었을때 cache에서 빼기 (다음 요청에서 DB를 다시 조회한다.)"""
+    user_cache.delete(pk)
+
+
+def get_user(pk):
+    values = user_cache.get(pk)
+    if values is None:
+        user = User.objects.only(*USER_CACHE_FIELDS).get(pk=pk)
+        user_cache.set(pk, [getattr(user, field) for field in USER_CACHE_FIELDS])
+        return user
+    # 요청마다 새 instance를 만들어서 cache 값이 바뀌지 않게 한다.
+    return User.from_db('default', USER_CACHE_FIELDS, values)
+
 
 class JWTAuthentication(authentication.BaseAuthentication):
     """
     token에 대한 정보를 API가 header를 통해서 알아들을 수 있게 하기
+    한번 검증한 token과 사용자 정보는 잠시 cache 해서 요청마다 decode + DB 조회를 하지 않는다.
     """
     def authenticate(self, request):
         try:
@@ -16,9 +46,15 @@ class JWTAuthentication(authentication.BaseAuthentication):
             if token is None:
                 return None
             xjwt, jwt_token = token.split(' ')
-            decoded = jwt.decode(jwt_token, settings.SECRET_KEY, algorithms=['HS256'])
-            pk = decoded.get('pk')
-            user = User.objects.get(pk=pk)
+            digest = hashlib.sha256(jwt_token.encode()).hexdigest()
+            pk = token_cache.get(digest)
+            if pk is None:
+                decoded = jwt.decode(jwt_token, settings.SECRET_KEY, algorithms=['HS256'])
+                pk = decoded.get('pk')
+                token_cache.set(digest, pk)
+            user = get_user(pk)
+            if not user.is_active:
+                raise exceptions.AuthenticationFailed(detail='User inactive')
             return user, None  # 공식문서 참고 해보기 user, None을 쓰는거에 대해서
         except (ValueError, User.DoesNotExist):
             return None
@@ -158,7 +158,19 @@ REST_FRAMEWORK = {
         # 'rest_framework.authentication.BasicAuthentication',
         'config.authentication.JWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-    ]
+    ],
+    # orjson이 설치되어 있으면 사용하는 JSON renderer/parser + MessagePack (core.renderers, core.parsers)
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'core.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 SWAGGER_SETTINGS = {
@@ -170,3 +182,106 @@ SWAGGER_SETTINGS = {
         }
     }
 }
+
+# home timeline (apps.feed)
+# 팔로워 수가 FEED_FAN_OUT_LIMIT 보다 많은 사용자의 게시물은 생성시 timeline에 넣지 않고 조회할때 가져온다.
+FEED_FAN_OUT_LIMIT = 10000
+FEED_FAN_OUT_BATCH_SIZE = 1000
+# 팔로우 했을때 / 조회할때 가져오는 게시물 수
+FEED_PULL_SIZE = 20
+
+# 팔로우 추천 (users.suggestions)
+# 사용자별로 저장하는 후보 수, 팔로우 할때 바로 갱신하는 사용자 수 (넘으면 rebuild_follow_suggestions에서 반영)
+FOLLOW_SUGGESTION_SIZE = 50
+FOLLOW_SUGGESTION_FAN_OUT_LIMIT = 10000
+
+# 회원 정보/내정보 응답에 넣는 최근 팔로워 닉네임 수 (전체는 /api/v1/users/{id}/followers/)
+FOLLOW_PREVIEW_SIZE = 10
+
+# 팔로우 관계 in-memory index (users.graph)
+# 다른 process의 변경 기록 보관 시간(초), 한번에 반영할 최대 변경 수 (넘으면 DB에서 다시 읽는다.)
+FOLLOW_GRAPH_ENABLED = True
+FOLLOW_GRAPH_CHANGE_TIMEOUT = 60 * 60
+FOLLOW_GRAPH_MAX_REPLAY = 10000
+FOLLOW_GRAPH_LOAD_CHUNK_SIZE = 10000
+
+# 닉네임 자동완성 (users.autocomplete)
+# 기본/최대 사용자 수, client가 응답을 저장하는 시간(초, Cache-Control max-age)
+NICKNAME_AUTOCOMPLETE_LIMIT = 10
+NICKNAME_AUTOCOMPLETE_MAX_LIMIT = 20
+NICKNAME_AUTOCOMPLETE_MAX_AGE = 30
+
+# 게시물/댓글 내용 검색 (apps.search)
+# 역색인 gram 글자 수, 검색어에서 사용하는 최대 gram 수, 검색 구현 (SearchBackend)
+CONTENT_SEARCH_GRAM_SIZE = 2
+CONTENT_SEARCH_MAX_GRAMS = 32
+CONTENT_SEARCH_BACKEND = 'apps.search.NgramSearchBackend'
+
+# JWT 인증 cache (config.authentication)
+# 사용자 정보(is_active 등) 변경은 다른 process에서도 최대 JWT_AUTH_CACHE_TTL 초 안에 반영된다.
+JWT_AUTH_CACHE_SIZE = 1024
+JWT_AUTH_CACHE_TTL = 30
+
+# 게시물 위치 검색 (core.geo)
+# Post.geo_cell에 저장하는 geohash 자리 수 (8자리 = 약 38m x 19m 칸)
+GEO_CELL_PRECISION = 8
+# post_search radius 기본값, 최대값 (단위: 도)
+POST_SEARCH_RADIUS = 0.005
+POST_SEARCH_MAX_RADIUS = 1.0
+# 가까운 게시물 찾기 시작 범위, 최대 범위 (단위: 도)
+POST_NEARBY_RADIUS = 0.005
+POST_NEARBY_MAX_RADIUS = 2.0
+
+# 지도 tile (apps.tiles)
+# tile 하나를 2^TILE_CELL_BITS x 2^TILE_CELL_BITS 칸으로 나눠서 칸별 게시물 수를 보여준다.
+TILE_MAX_ZOOM = 15
+TILE_CELL_BITS = 3
+
+# 좋아요 write-behind buffer (apps.like_buffer)
+# 켜면 좋아요/취소를 process buffer에 모았다가 MAX_SIZE 개가 되거나 FLUSH_INTERVAL 초마다 한번에 저장한다.
+LIKE_BUFFER_ENABLED = False
+LIKE_BUFFER_MAX_SIZE = 1000
+LIKE_BUFFER_FLUSH_INTERVAL = 1.0
+# 저장하지 못한 요청을 기록해두는 곳 (process가 죽어도 다음 process가 이어서 저장한다.)
+LIKE_BUFFER_JOURNAL_DIR = os.path.join(BASE_DIR, 'like_journal')
+LIKE_BUFFER_FSYNC = False
+
+# 게시물 조회자 수 (apps.viewers)
+# HyperLogLog register 크기 2^POST_VIEW_PRECISION bytes (12: 4KB, 오차 약 1.6%)
+# 조회 기록은 POST_VIEW_FLUSH_INTERVAL 초마다 또는 게시물이 POST_VIEW_MAX_PENDING 개 모이면 응답을 보낸 다음 저장한다.
+POST_VIEW_PRECISION = 12
+POST_VIEW_FLUSH_INTERVAL = 10
+POST_VIEW_MAX_PENDING = 1000
+
+# 인기 게시물 (apps.trending)
+# 좋아요/댓글 수를 TRENDING_BUCKET_SECONDS 구간별로 세고, 최근 TRENDING_WINDOW_SECONDS 동안의 구간에
+# TRENDING_HALF_LIFE_SECONDS 마다 절반이 되는 가중치를 곱해서 점수를 만든다.
+TRENDING_BUCKET_SECONDS = 3600
+TRENDING_WINDOW_SECONDS = 24 * 3600
+TRENDING_HALF_LIFE_SECONDS = 6 * 3600
+TRENDING_LIKE_WEIGHT = 1.0
+TRENDING_COMMENT_WEIGHT = 2.0
+# cache에 저장하는 상위 게시물 수, 다시 계산하는 주기(초)
+TRENDING_SIZE = 100
+TRENDING_REFRESH_INTERVAL = 60
+
+# 내 데이터 내보내기 (users.export) - DB에서 한번에 읽어오는 row 수
+EXPORT_CHUNK_SIZE = 2000
+
+# cache (core.cache 상세 조회 cache 등)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+DETAIL_CACHE_TIMEOUT = 300
+# 요청이 몰리는 object (core.sketch / core.cache)
+# 최근 요청 수가 HOT_OBJECTS_THRESHOLD 이상이면 상세 조회 cache를 DETAIL_CACHE_HOT_TIMEOUT 동안 저장한다.
+# 요청 수는 HOT_OBJECTS_DECAY_INTERVAL 초마다 절반으로 줄어든다. (sketch 크기: WIDTH x DEPTH x 8 bytes)
+DETAIL_CACHE_HOT_TIMEOUT = 3600
+HOT_OBJECTS_WIDTH = 2048
+HOT_OBJECTS_DEPTH = 4
+HOT_OBJECTS_SIZE = 100
+HOT_OBJECTS_THRESHOLD = 100
+HOT_OBJECTS_DECAY_INTERVAL = 60
+HOT_OBJECTS_PUBLISH_INTERVAL = 10
@@ -3,3 +3,24 @@ from .base import *
 DEBUG = False
 
 ALLOWED_HOSTS = ['127.0.0.1']
+
+# 여러 process가 같이 사용하는 cache backend (ex. django.core.cache.backends.memcached.PyMemcacheCache)
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# 팔로우 관계 in-memory index는 cache에 남긴 변경 순서 번호로 다른 process의 팔로우/취소를 가져온다. (users.graph)
+# process마다 따로 저장하는 cache로는 다른 process의 변경을 볼 수 없어서 같이 사용하는 cache가 필요하다.
+FOLLOW_GRAPH_ENABLED = os.environ.get('FOLLOW_GRAPH_ENABLED', 'True') == 'True'
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+if FOLLOW_GRAPH_ENABLED and CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        'FOLLOW_GRAPH_ENABLED requires a shared cache backend. '
+        'Set the CACHE_BACKEND environment variable (or FOLLOW_GRAPH_ENABLED=False).'
+    )
@@ -11,6 +11,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', include('apps.urls')),
     path('api/v1/users/', include('users.urls')),
+    path('api/v1/', include('core.urls')),
 ]
 
 schema_view = get_schema_view(
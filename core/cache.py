@@ -0,0 +1,198 @@
+"""
+상세 조회 응답(serialize 된 값) read-through cache
+
+- cache key: detail:{model}:{pk}
+- 각 object는 version 값을 가지고 있고 저장/삭제/counter 변경시 version을 올린다. (bump_version)
+- cache에 저장할때 응답을 만드는데 사용한 object들(본인 + 중첩된 user, post 등)의 version을 같이 저장하고,
+  읽을때 version이 하나라도 다르면 새로 만든다.
+
+cache backend는 settings.CACHES를 따른다. (local/test: locmem, prod: 환경변수로 지정)
+
+요청이 몰리는 object(hot object)는 core.sketch로 찾아서 cache에 더 오래(DETAIL_CACHE_HOT_TIMEOUT) 저장한다.
+각 process의 sketch는 HOT_OBJECTS_PUBLISH_INTERVAL 초마다 cache에 올려두고 metrics에서 합쳐서 보여준다.
+"""
+import os
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+from . import conditional
+from .serializers import pick_fields
+from .sketch import HeavyHitters
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+_hot_objects = None
+_hot_objects_lock = threading.Lock()
+_published_at = 0
+HOT_WORKERS_KEY = 'hot_objects:workers'
+
+
+def object_key(model, pk):
+    return f'{model._meta.label_lower}:{pk}'
+
+
+def version_key(key):
+    return f'version:{key}'
+
+
+def bump_version(model, pk):
+    """object가 바뀌었을때 version 올리기 (이 object를 사용한 cache 값은 모두 무효가 된다.)"""
+    key = version_key(object_key(model, pk))
+    try:
+        cache.incr(key)
+    except ValueError:
+        # version이 없으면(만료/삭제) 이전에 쓰던 값과 겹치지 않는 값으로 새로 시작한다.
+        cache.set(key, time.time_ns(), None)
+
+
+def count(name, label):
+    with _stats_lock:
+        _stats[f'{label}.{name}'] += 1
+
+
+def get_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def new_hot_objects():
+    return HeavyHitters(
+        width=settings.HOT_OBJECTS_WIDTH,
+        depth=settings.HOT_OBJECTS_DEPTH,
+        size=settings.HOT_OBJECTS_SIZE,
+        decay_interval=settings.HOT_OBJECTS_DECAY_INTERVAL,
+    )
+
+
+def get_hot_objects():
+    """현재 process의 object별 최근 요청 수 sketch"""
+    global _hot_objects
+    with _hot_objects_lock:
+        if _hot_objects is None:
+            _hot_objects = new_hot_objects()
+        return _hot_objects
+
+
+def track(model, pk):
+    """object 요청 수 기록 -> hot object 인지"""
+    hot_objects = get_hot_objects()
+    count = hot_objects.add(object_key(model, pk))
+    publish_hot_objects(hot_objects)
+    return count >= settings.HOT_OBJECTS_THRESHOLD
+
+
+def publish_hot_objects(hot_objects, force=False):
+    """HOT_OBJECTS_PUBLISH_INTERVAL 초마다 현재 process의 sketch를 cache에 올리기 (다른 process에서 합칠 수 있게)"""
+    global _published_at
+    interval = settings.HOT_OBJECTS_PUBLISH_INTERVAL
+    now = time.time()
+    with _hot_objects_lock:
+        if not force and now - _published_at < interval:
+            return
+        _published_at = now
+    key = f'hot_objects:{os.getpid()}'
+    cache.set(key, hot_objects, interval * 3)
+    # 최근에 올린 process 목록 (동시에 고쳐서 빠지더라도 다음 publish에서 다시 들어간다.)
+    workers = {name: at for name, at in cache.get(HOT_WORKERS_KEY, {}).items() if now - at < interval * 3}
+    workers[key] = now
+    cache.set(HOT_WORKERS_KEY, workers, interval * 3)
+
+
+def get_hot_stats(size=None):
+    """모든 process의 sketch를 합친 최근 요청 상위 object [{'key', 'count'}, ...]"""
+    own = get_hot_objects()
+    publish_hot_objects(own, force=True)
+    merged = new_hot_objects()
+    for hot_objects in cache.get_many(list(cache.get(HOT_WORKERS_KEY, {}))).values():
+        merged.merge(hot_objects)
+    return [{'key': key, 'count': count} for key, count in merged.top(size)]
+
+
+def get_entry(model, pk):
+    """cache에 저장된 값 중 version이 모두 같은 값 (없으면 None)"""
+    entry = cache.get(f'detail:{object_key(model, pk)}')
+    if entry is not None:
+        versions = cache.get_many(list(entry['versions']))
+        if all(versions.get(name, 0) == version for name, version in entry['versions'].items()):
+            count('hits', model._meta.label_lower)
+            return entry
+    count('misses', model._meta.label_lower)
+    return None
+
+
+def get_own_version(model, pk):
+    return cache.get(version_key(object_key(model, pk)), 0)
+
+
+def build_entry(model, pk, build, own_version, hot=False):
+    """
+    build()로 응답을 만들어서 cache에 저장하기
+    build()는 (응답 데이터, 응답에 사용한 object 목록[(model, pk, updated_at), ...])을 반환해야 한다.
+    (첫번째는 본인, updated_at 목록으로 ETag/Last-Modified를 만든다.)
+    own_version은 만들기 전에 읽어둔 본인 version이다. (만드는 도중에 수정되면 다음 조회에서 다시 만든다.)
+    hot object는 DETAIL_CACHE_HOT_TIMEOUT 동안 저장한다. (version이 바뀌면 그 전에라도 다시 만든다.)
+    """
+    key = object_key(model, pk)
+    data, dependencies = build()
+    names = {version_key(object_key(dep_model, dep_pk)) for dep_model, dep_pk, _ in dependencies}
+    names.discard(version_key(key))
+    versions = cache.get_many(list(names))
+    versions[version_key(key)] = own_version
+    names.add(version_key(key))
+    etag, last_modified = conditional.object_validators(model, pk, [updated_at for *_, updated_at in dependencies])
+    entry = {
+        'data': data,
+        'etag': etag,
+        'last_modified': last_modified,
+        'versions': {name: versions.get(name, 0) for name in names},
+    }
+    timeout = settings.DETAIL_CACHE_HOT_TIMEOUT if hot else settings.DETAIL_CACHE_TIMEOUT
+    cache.set(f'detail:{key}', entry, timeout)
+    return entry
+
+
+def detail_response(request, model, pk, build, validators, fields=None, extra=None):
+    """
+    상세 조회 응답 (cache + 조건부 GET)
+    - cache에 있으면 저장된 ETag/Last-Modified로 304 여부를 확인한다. (DB 조회 없음)
+    - cache에 없고 client가 조건(If-None-Match 등)을 보냈으면 validators()(updated_at만 읽는 가벼운 쿼리)로
+      먼저 304 여부를 확인하고 아닐때만 build()로 응답을 만든다.
+    - fields(?fields=)가 있으면 cache에 저장된 전체 응답에서 고른 field만 내려준다. (ETag도 field 목록별로 다르다.)
+    - extra()는 cache에 저장하지 않고 응답할때마다 읽는 값 {field: 값}, 저장된 응답을 덮어쓰고 ETag에 포함한다.
+      (ex. 조회자 수, 조회자 본인의 아직 저장하지 않은 좋아요)
+      validators()/build()를 호출한 다음에 읽기 때문에 두 함수에서 extra()가 읽을 값을 미리 cache에 넣어둘 수 있다.
+    """
+    values = None
+
+    def get_etag(etag):
+        nonlocal values
+        if values is None:
+            values = extra() if extra is not None else {}
+            if fields is not None:
+                values = pick_fields(values, fields)
+        if values:
+            return conditional.make_etag(etag, fields, sorted(values.items()))
+        return etag if fields is None else conditional.make_etag(etag, fields)
+
+    hot = track(model, pk)
+    entry = get_entry(model, pk)
+    if entry is None:
+        own_version = get_own_version(model, pk)
+        if conditional.has_conditions(request):
+            etag, last_modified = validators()
+            response = conditional.not_modified(request, get_etag(etag), last_modified)
+            if response is not None:
+                return response
+        entry = build_entry(model, pk, build, own_version, hot)
+    else:
+        response = conditional.not_modified(request, get_etag(entry['etag']), entry['last_modified'])
+        if response is not None:
+            return response
+    etag = get_etag(entry['etag'])
+    response = Response(dict(pick_fields(entry['data'], fields), **values), status=status.HTTP_200_OK)
+    return conditional.with_validators(response, etag, entry['last_modified'])
@@ -0,0 +1,76 @@
+"""
+조건부 GET (ETag / Last-Modified / 304 Not Modified)
+
+응답에 들어가는 object들의 updated_at으로 ETag, Last-Modified를 만든다.
+client가 If-None-Match / If-Modified-Since를 보냈고 값이 같으면
+serializer를 거치지 않고 304(본문 없음)로 응답한다.
+"""
+import hashlib
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+def timestamp(value):
+    return int(value.timestamp()) if value is not None else None
+
+
+def has_conditions(request):
+    return 'HTTP_IF_NONE_MATCH' in request.META or 'HTTP_IF_MODIFIED_SINCE' in request.META
+
+
+def not_modified(request, etag, last_modified):
+    """client가 가지고 있는 값과 같으면 304 응답, 아니면 None"""
+    return get_conditional_response(request, etag=etag, last_modified=timestamp(last_modified))
+
+
+def with_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(timestamp(last_modified))
+    return response
+
+
+def object_validators(model, pk, versions):
+    """상세 조회 ETag, Last-Modified (응답에 들어가는 object들의 updated_at 목록으로 만든다.)"""
+    versions = tuple(versions)
+    return make_etag(model._meta.label_lower, pk, versions), max(versions)
+
+
+def query_validators(queryset, pk, fields):
+    """
+    object_validators()와 같은 값을 updated_at만 읽는 가벼운 쿼리 1번으로 만든다. (없으면 DoesNotExist)
+    fields는 build()가 반환하는 object 목록과 같은 순서여야 한다.
+    """
+    values = queryset.filter(pk=pk).values_list(*fields).get()
+    return object_validators(queryset.model, pk, values)
+
+
+def related_rows(row, path):
+    """
+    'post.user' 같은 경로로 중첩된 object 가져오기
+    (select_related로 이미 읽어온 object만 사용하고, 읽지 않은 관계는 None)
+    """
+    for name in path.split('.'):
+        if not row._meta.get_field(name).is_cached(row):
+            return None
+        row = getattr(row, name)
+    return row
+
+
+def page_validators(rows, page_state, related=()):
+    """
+    리스트 page의 ETag, Last-Modified
+    page의 row(+ 중첩된 object)들의 (id, updated_at)과 page 정보(전체 수, 다음 page 등)로 만든다.
+    (이미 읽어온 row만 사용하기 때문에 추가 쿼리가 없다.)
+    """
+    objects = []
+    for row in rows:
+        objects.append(row)
+        objects += [obj for obj in (related_rows(row, path) for path in related) if obj is not None]
+    versions = [(type(obj).__name__, obj.pk, obj.updated_at) for obj in objects]
+    last_modified = max((obj.updated_at for obj in objects), default=None)
+    return make_etag(page_state, versions), last_modified
@@ -0,0 +1,33 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.utils import timezone
+from django.db.models.functions import Coalesce, Greatest
+from .cache import bump_version
+
+
+def touch(model, values):
+    """update() 값에 updated_at 추가 (model에 updated_at이 있을때, update()는 auto_now를 바꾸지 않는다.)"""
+    if any(model_field.name == 'updated_at' for model_field in model._meta.fields):
+        values['updated_at'] = timezone.now()
+    return values
+
+
+def change_counter(model, pk, field, amount):
+    """
+    row에 저장된 집계 값(counter) 증감
+    F()를 사용해서 DB에서 바로 계산하기 때문에 동시에 여러 요청이 들어와도 값이 틀어지지 않는다.
+    (0 밑으로는 내려가지 않게 한다.)
+    counter도 응답에 포함되기 때문에 updated_at을 같이 바꿔서 조건부 GET(ETag/Last-Modified)에 반영되게 한다.
+    """
+    if pk is None:
+        return 0
+    values = touch(model, {field: Greatest(F(field) + amount, 0)})
+    updated = model.objects.filter(pk=pk).update(**values)
+    # counter가 포함된 상세 조회 cache 무효화
+    bump_version(model, pk)
+    return updated
+
+
+def real_count(model, relation):
+    """실제 row 수를 세는 subquery (owner.objects.update(field=real_count(...))로 counter를 다시 계산할때 사용)"""
+    rows = model.objects.filter(**{relation: OuterRef('pk')}).order_by().values(relation)
+    return Coalesce(Subquery(rows.annotate(count=Count('pk')).values('count')), 0)
@@ -0,0 +1,148 @@
+"""
+geohash 격자(cell) 계산
+
+지도를 격자로 나누고 각 칸에 문자열(geohash)을 붙인다.
+같은 prefix를 가진 geohash는 같은 큰 칸 안에 있기 때문에
+좌표 범위 검색을 "칸 목록 검색(index 사용) + 정확한 범위 확인"으로 바꿀 수 있다.
+"""
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def parse_point(lat, lng):
+    """요청으로 받은 좌표 -> (위도, 경도) (숫자가 아니거나 nan/inf, 범위(+-90, +-180)를 벗어나면 ValueError)"""
+    lat, lng = float(lat), float(lng)
+    if not (math.isfinite(lat) and math.isfinite(lng) and -90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+        raise ValueError(f'invalid point: {lat}, {lng}')
+    return lat, lng
+
+
+def clamp_lat(lat):
+    return max(-90.0, min(90.0, float(lat)))
+
+
+def wrap_lng(lng):
+    return (float(lng) + 180.0) % 360.0 - 180.0
+
+
+def cell_size(precision):
+    """precision 자리 geohash 한 칸의 (위도 높이, 경도 너비)"""
+    bits = precision * 5
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def encode(lat, lng, precision):
+    lat, lng = clamp_lat(lat), wrap_lng(lng)
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash = []
+    bit, ch, even = 0, 0, True
+    while len(geohash) < precision:
+        value, current = (lng, lng_range) if even else (lat, lat_range)
+        mid = (current[0] + current[1]) / 2
+        if value >= mid:
+            ch |= 1 << (4 - bit)
+            current[0] = mid
+        else:
+            current[1] = mid
+        even = not even
+        if bit < 4:
+            bit += 1
+        else:
+            geohash.append(BASE32[ch])
+            bit, ch = 0, 0
+    return ''.join(geohash)
+
+
+def _cell_indexes(min_value, max_value, size, origin, count):
+    start = int(math.floor((min_value - origin) / size))
+    end = int(math.floor((max_value - origin) / size))
+    return start, min(end, start + count - 1)
+
+
+def covering_cells(min_lat, min_lng, max_lat, max_lng, precision):
+    """
+    (min_lat, min_lng) ~ (max_lat, max_lng) 범위를 덮는 precision 자리 geohash 목록
+    경도 180도를 넘어가는 범위도 처리한다.
+    """
+    height, width = cell_size(precision)
+    lat_count, lng_count = int(round(180.0 / height)), int(round(360.0 / width))
+    min_lat, max_lat = clamp_lat(min_lat), clamp_lat(max_lat)
+    lat_start, lat_end = _cell_indexes(min_lat, max_lat, height, -90.0, lat_count)
+    lng_start, lng_end = _cell_indexes(float(min_lng), float(max_lng), width, -180.0, lng_count)
+
+    cells = set()
+    for lat_index in range(lat_start, min(lat_end, lat_count - 1) + 1):
+        for lng_index in range(lng_start, lng_end + 1):
+            # 각 칸의 중심 좌표로 geohash를 구한다.
+            lat = -90.0 + (lat_index + 0.5) * height
+            lng = -180.0 + ((lng_index % lng_count) + 0.5) * width
+            cells.add(encode(lat, lng, precision))
+    return cells
+
+
+def count_covering_cells(lat_span, lng_span, precision):
+    height, width = cell_size(precision)
+    return (int(lat_span / height) + 2) * (int(lng_span / width) + 2)
+
+
+def choose_precision(radius, max_precision, max_cells=16):
+    """
+    중심에서 +-radius 범위를 max_cells 개 이하의 칸으로 덮을 수 있는 가장 작은 칸의 precision
+    (범위가 너무 커서 1자리로도 덮을 수 없으면 None)
+    """
+    for precision in range(max_precision, 0, -1):
+        if count_covering_cells(radius * 2, radius * 2, precision) <= max_cells:
+            return precision
+    return None
+
+
+EARTH_RADIUS = 6371008.8  # 미터
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS / 180.0
+
+
+def distance(lat1, lng1, lat2, lng2):
+    """두 좌표 사이의 거리 (미터, haversine)"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (float(lat1), float(lng1), float(lat2), float(lng2)))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def box_inner_radius(lat, radius):
+    """
+    중심에서 +-radius(도) 사각형 안에 완전히 들어가는 원의 반지름 (미터)
+    이 거리 안에 있는 좌표는 사각형 밖의 어떤 좌표보다 가깝다.
+    """
+    edge_lat = min(90.0, abs(float(lat)) + radius)
+    return radius * METERS_PER_DEGREE * math.cos(math.radians(edge_lat))
+
+
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def tile_index(lat, lng, zoom):
+    """web mercator 지도 tile 번호 (x, y)"""
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, float(lat)))
+    lng = wrap_lng(lng)
+    count = 1 << zoom
+    lat_rad = math.radians(lat)
+    x = int((lng + 180.0) / 360.0 * count)
+    y = int((1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * count)
+    return min(max(x, 0), count - 1), min(max(y, 0), count - 1)
+
+
+def tile_bounds(x, y, zoom):
+    """tile이 덮는 범위 (min_lat, min_lng, max_lat, max_lng)"""
+    count = 1 << zoom
+
+    def lat_of(tile_y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / count))))
+
+    return lat_of(y + 1), x / count * 360.0 - 180.0, lat_of(y), (x + 1) / count * 360.0 - 180.0
+
+
+def tile_cells(lat, lng, min_level, max_level):
+    """좌표가 들어가는 level별 칸 번호 목록 [(level, x, y), ...]"""
+    return [(level,) + tile_index(lat, lng, level) for level in range(min_level, max_level + 1)]
@@ -0,0 +1,71 @@
+import random
+import time
+from array import array
+from django.core.management.base import BaseCommand
+from users.graph import FollowGraph, compact
+
+
+class Command(BaseCommand):
+    help = '팔로우 관계 in-memory index(users.graph) 메모리 사용량, 확인 속도 benchmark (DB 사용 안함)'
+
+    def add_arguments(self, parser):
+        """
+        ./manage.py bench_follow_graph --edges 10000000 --users 1000000
+        (사용자마다 평균 edges / users 명을 팔로우 한다.)
+        """
+        parser.add_argument('--edges', default=10000000, type=int, help='팔로우 관계 수')
+        parser.add_argument('--users', default=1000000, type=int, help='사용자 수')
+        parser.add_argument('--checks', default=100000, type=int, help='팔로우 확인 횟수')
+
+    def handle(self, *args, **options):
+        num_users, num_edges = options['users'], options['edges']
+        random.seed(0)
+        start = time.perf_counter()
+        graph = self.build(num_users, num_edges)
+        build_time = time.perf_counter() - start
+
+        edges = graph.edge_count()
+        size = graph.nbytes()
+        self.stdout.write(f'사용자 {num_users}명, 팔로우 {edges}개 (만드는데 {build_time:.1f}초)')
+        self.stdout.write(self.style.SUCCESS(f'index 크기 : {size / 2 ** 20:.0f}MB ({size / edges:.1f} bytes/edge)'))
+
+        user_ids = list(graph.followings)
+        pairs = [(random.choice(user_ids), random.randrange(1, num_users + 1)) for _ in range(options['checks'])]
+        start = time.perf_counter()
+        for follower_id, following_id in pairs:
+            graph.follows(follower_id, following_id)
+        self.stdout.write(f'팔로우 확인     : {len(pairs) / (time.perf_counter() - start):.0f} 번/s')
+
+        page = 20
+        viewers = [follower_id for follower_id, _ in pairs[:len(pairs) // page]]
+        start = time.perf_counter()
+        for viewer_id in viewers:
+            graph.follows_many(viewer_id, random.sample(user_ids, page))
+        self.stdout.write(f'follows_many({page}) : {len(viewers) / (time.perf_counter() - start):.0f} page/s')
+
+        start = time.perf_counter()
+        for user_id, other_id in pairs[:len(pairs) // page]:
+            graph.mutual_followings(user_id, other_id)
+        self.stdout.write(f'공통 팔로잉     : {len(pairs) // page / (time.perf_counter() - start):.0f} 번/s')
+
+    @staticmethod
+    def build(num_users, num_edges):
+        """사용자(1 ~ num_users)마다 임의의 사용자를 팔로우 하는 index (두 방향 모두 정렬된 배열)"""
+        graph = FollowGraph('i')
+        degree, extra = divmod(num_edges, num_users)
+        for follower_id in range(1, num_users + 1):
+            count = min(degree + (follower_id <= extra), num_users - 1)
+            followings = sorted(random.sample(range(1, num_users + 1), count + 1))
+            if follower_id in followings:
+                followings.remove(follower_id)
+            graph.followings[follower_id] = array('i', followings[:count])
+        # follower_id 순서로 붙이면 followers 배열도 정렬된다.
+        followers = graph.followers
+        for follower_id, followings in graph.followings.items():
+            for following_id in followings:
+                values = followers.get(following_id)
+                if values is None:
+                    values = followers[following_id] = array('i')
+                values.append(follower_id)
+        compact(followers, 'i')
+        return graph
@@ -0,0 +1,92 @@
+import random
+import tempfile
+import time
+from django.core.management.base import BaseCommand
+from users.models import User
+from apps import likes, like_buffer
+from apps.models import Post, Like
+
+BENCH_EMAIL = 'bench_likes_{}@bench.com'
+
+
+class Command(BaseCommand):
+    help = '좋아요 저장 benchmark (요청마다 저장 vs write-behind buffer)'
+
+    def add_arguments(self, parser):
+        """
+        ./manage.py bench_likes --requests 20000 --users 1000 --posts 10
+        (적은 게시물에 좋아요가 몰리는 상황)
+        """
+        parser.add_argument('--requests', default=20000, type=int, help='좋아요/취소 요청 수')
+        parser.add_argument('--users', default=1000, type=int, help='benchmark 사용자 수')
+        parser.add_argument('--posts', default=10, type=int, help='benchmark 게시물 수')
+        parser.add_argument('--buffer-size', default=1000, type=int, help='buffer 크기 (이만큼 모이면 저장)')
+        parser.add_argument('--clean', action='store_true', help='benchmark 데이터 삭제')
+
+    def handle(self, *args, **options):
+        if options['clean']:
+            User.objects.filter(email__startswith='bench_likes_').delete()
+            self.stdout.write(self.style.SUCCESS('benchmark data clean success!'))
+            return
+
+        user_ids, post_ids = self.seed(options['users'], options['posts'])
+        random.seed(0)
+        # 좋아요 80%, 취소 20%
+        requests = [
+            (random.choice(user_ids), random.choice(post_ids), random.random() < 0.8)
+            for _ in range(options['requests'])
+        ]
+
+        self.reset(post_ids)
+        start = time.perf_counter()
+        for user_id, post_id, liked in requests:
+            (likes.like if liked else likes.unlike)(user_id, post_id)
+        sync_time = time.perf_counter() - start
+        sync_state = self.state(post_ids)
+
+        self.reset(post_ids)
+        with tempfile.TemporaryDirectory() as journal_dir:
+            buffer = like_buffer.LikeBuffer(max_size=options['buffer_size'], journal_dir=journal_dir)
+            start = time.perf_counter()
+            for user_id, post_id, liked in requests:
+                like_buffer.change_like(user_id, post_id, liked, buffer)
+                if len(buffer) >= buffer.max_size:
+                    buffer.flush()
+            request_time = time.perf_counter() - start
+            buffer.flush()
+            buffer_time = time.perf_counter() - start
+        if self.state(post_ids) != sync_state:
+            self.stdout.write(self.style.ERROR('저장 결과가 다릅니다!'))
+
+        count = len(requests)
+        self.stdout.write(f'요청 {count}번, 사용자 {len(user_ids)}명, 게시물 {len(post_ids)}개')
+        self.stdout.write(f'요청마다 저장 : {count / sync_time:.0f} req/s')
+        self.stdout.write(f'buffer       : {count / buffer_time:.0f} req/s (요청 처리만 {count / request_time:.0f} req/s)')
+        self.stdout.write(self.style.SUCCESS(f'{sync_time / buffer_time:.1f}배'))
+
+    @staticmethod
+    def seed(num_users, num_posts):
+        exists = User.objects.filter(email__startswith='bench_likes_').count()
+        users = []
+        for i in range(exists, num_users):
+            user = User(email=BENCH_EMAIL.format(i), nickname=f'bench_likes_{i}')
+            user.set_unusable_password()
+            users.append(user)
+        User.objects.bulk_create(users)
+        user_ids = list(User.objects.filter(email__startswith='bench_likes_').order_by('pk').values_list('pk', flat=True))
+        owner = user_ids[0]
+        for _ in range(num_posts - Post.objects.filter(user_id=owner).count()):
+            Post.objects.create(user_id=owner, content='bench', lat='37.5', lng='127.0')
+        post_ids = list(Post.objects.filter(user_id=owner).order_by('pk').values_list('pk', flat=True))
+        return user_ids[:num_users], post_ids[:num_posts]
+
+    @staticmethod
+    def reset(post_ids):
+        Like.objects.filter(post_id__in=post_ids).delete()
+        Post.objects.filter(pk__in=post_ids).update(like_count=0)
+
+    @staticmethod
+    def state(post_ids):
+        rows = Like.objects.filter(post_id__in=post_ids).values_list('user_id', 'post_id')
+        counts = Post.objects.filter(pk__in=post_ids).order_by('pk').values_list('like_count', flat=True)
+        return set(rows), list(counts)
@@ -0,0 +1,80 @@
+import random
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core import geo
+from users.models import User
+from apps.models import Post
+
+BENCH_EMAIL = 'bench_post_search@bench.com'
+# 한국 주변 좌표 범위
+LAT_RANGE = (33.0, 38.6)
+LNG_RANGE = (124.6, 131.9)
+
+
+class Command(BaseCommand):
+    help = 'post_search 위치 검색 benchmark (lat/lng 범위 검색 vs geo_cell index 검색)'
+
+    def add_arguments(self, parser):
+        """
+        ./manage.py bench_post_search --num 1000000 --queries 200
+        (이미 만들어진 benchmark 게시물이 있으면 부족한 만큼만 추가한다.)
+        """
+        parser.add_argument('--num', default=1000000, type=int, help='benchmark 게시물 수')
+        parser.add_argument('--queries', default=200, type=int, help='검색 횟수')
+        parser.add_argument('--radius', default=settings.POST_SEARCH_RADIUS, type=float, help='검색 범위 (도)')
+        parser.add_argument('--clean', action='store_true', help='benchmark 데이터 삭제')
+
+    def handle(self, *args, **options):
+        if options['clean']:
+            User.objects.filter(email=BENCH_EMAIL).delete()
+            self.stdout.write(self.style.SUCCESS('benchmark data clean success!'))
+            return
+
+        user = User.objects.filter(email=BENCH_EMAIL).first()
+        if user is None:
+            user = User(email=BENCH_EMAIL, nickname='bench')
+            user.set_unusable_password()
+            user.save()
+        self.seed(user, options['num'])
+
+        random.seed(0)
+        radius = options['radius']
+        centers = [(random.uniform(*LAT_RANGE), random.uniform(*LNG_RANGE)) for _ in range(options['queries'])]
+
+        range_time, range_rows = self.run(centers, lambda lat, lng: Post.objects.filter(
+            lat__gte=lat - radius, lat__lte=lat + radius, lng__gte=lng - radius, lng__lte=lng + radius,
+        ))
+        cell_time, cell_rows = self.run(centers, lambda lat, lng: Post.objects.within(lat, lng, radius))
+        if range_rows != cell_rows:
+            self.stdout.write(self.style.ERROR('검색 결과가 다릅니다!'))
+
+        count = Post.objects.filter(user=user).count()
+        self.stdout.write(f'게시물 {count}개, 검색 {len(centers)}번, radius {radius}')
+        self.stdout.write(f'lat/lng 범위 검색 : {range_time * 1000 / len(centers):.2f}ms/query')
+        self.stdout.write(f'geo_cell 검색     : {cell_time * 1000 / len(centers):.2f}ms/query')
+        self.stdout.write(self.style.SUCCESS(f'{range_time / cell_time:.1f}배'))
+
+    def seed(self, user, num):
+        exists = Post.objects.filter(user=user).count()
+        batch = []
+        for _ in range(num - exists):
+            lat = round(random.uniform(*LAT_RANGE), 6)
+            lng = round(random.uniform(*LNG_RANGE), 6)
+            batch.append(Post(
+                user=user, content='bench', lat=lat, lng=lng,
+                geo_cell=geo.encode(lat, lng, settings.GEO_CELL_PRECISION),
+            ))
+            if len(batch) >= 10000:
+                Post.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Post.objects.bulk_create(batch)
+
+    @staticmethod
+    def run(centers, build_queryset):
+        rows = []
+        start = time.perf_counter()
+        for lat, lng in centers:
+            rows.append(sorted(build_queryset(lat, lng).values_list('id', flat=True)))
+        return time.perf_counter() - start, rows
@@ -0,0 +1,97 @@
+import random
+import time
+from io import BytesIO
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.parsers import JSONParser
+from core.renderers import FastJSONRenderer, MessagePackRenderer, orjson, msgpack
+from core.parsers import FastJSONParser, MessagePackParser
+from users.models import User
+from apps.models import Post
+from apps.serializers import PostListSerializer
+
+BENCH_EMAIL = 'bench_renderers@bench.com'
+
+
+class Command(BaseCommand):
+    help = '게시물 리스트 page 응답 renderer/parser benchmark (JSONRenderer vs FastJSONRenderer vs MessagePack)'
+
+    def add_arguments(self, parser):
+        """
+        ./manage.py bench_renderers --pages 20 --repeat 200
+        """
+        parser.add_argument('--pages', default=20, type=int, help='benchmark page 수 (page당 게시물 20개)')
+        parser.add_argument('--repeat', default=200, type=int, help='page당 반복 횟수')
+        parser.add_argument('--clean', action='store_true', help='benchmark 데이터 삭제')
+
+    def handle(self, *args, **options):
+        if options['clean']:
+            User.objects.filter(email=BENCH_EMAIL).delete()
+            self.stdout.write(self.style.SUCCESS('benchmark data clean success!'))
+            return
+
+        user = User.objects.filter(email=BENCH_EMAIL).first()
+        if user is None:
+            user = User(email=BENCH_EMAIL, nickname='bench', fullname='벤치마크', introduce='안녕하세요 ' * 10)
+            user.set_unusable_password()
+            user.save()
+        self.seed(user, options['pages'] * 20)
+
+        posts = PostListSerializer.setup_queryset(Post.objects.filter(user=user))
+        rows = [list(posts[i:i + 20]) for i in range(0, options['pages'] * 20, 20)]
+        repeat = options['repeat']
+        self.stdout.write(f'page {len(rows)}개 x {repeat}번 (orjson: {orjson is not None}, msgpack: {msgpack is not None})')
+
+        start = time.perf_counter()
+        for page_rows in rows:
+            for _ in range(repeat):
+                data = PostListSerializer(page_rows, many=True).data
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f'{"PostListSerializer":20} serialize : {elapsed * 1e6 / (len(rows) * repeat):8.1f}us/page')
+
+        pages = [
+            {'count': 0, 'next': None, 'previous': None, 'results': PostListSerializer(page_rows, many=True).data}
+            for page_rows in rows
+        ]
+
+        results = {}
+        for name, renderer in (
+            ('JSONRenderer', JSONRenderer()),
+            ('FastJSONRenderer', FastJSONRenderer()),
+            ('MessagePackRenderer', MessagePackRenderer()),
+        ):
+            start = time.perf_counter()
+            for page in pages:
+                for _ in range(repeat):
+                    body = renderer.render(page)
+            results[name] = time.perf_counter() - start
+            self.stdout.write(
+                f'{name:20} render    : {results[name] * 1e6 / (len(pages) * repeat):8.1f}us/page, {len(body)} bytes'
+            )
+
+        for name, parser, renderer in (
+            ('JSONParser', JSONParser(), JSONRenderer()),
+            ('FastJSONParser', FastJSONParser(), FastJSONRenderer()),
+            ('MessagePackParser', MessagePackParser(), MessagePackRenderer()),
+        ):
+            bodies = [renderer.render(page) for page in pages]
+            start = time.perf_counter()
+            for body in bodies:
+                for _ in range(repeat):
+                    parser.parse(BytesIO(body))
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f'{name:20} parse     : {elapsed * 1e6 / (len(pages) * repeat):8.1f}us/page')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'FastJSONRenderer {results["JSONRenderer"] / results["FastJSONRenderer"]:.1f}배'
+        ))
+
+    def seed(self, user, num):
+        exists = Post.objects.filter(user=user).count()
+        Post.objects.bulk_create([
+            Post(
+                user=user, content='벤치마크 게시물 내용 ' * 5,
+                lat=round(random.uniform(33.0, 38.6), 6), lng=round(random.uniform(124.6, 131.9), 6),
+            )
+            for _ in range(num - exists)
+        ])
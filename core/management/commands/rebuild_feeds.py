@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from apps.feed import pull_posts
+from apps.models import Post, Feed
+from users.models import User, Follow
+
+
+class Command(BaseCommand):
+    help = '팔로우 관계를 기준으로 사용자별 home timeline을 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        """
+        ./manage.py rebuild_feeds
+        ./manage.py rebuild_feeds --user 1
+        """
+        parser.add_argument(
+            '--user',
+            default=None,
+            type=int,
+            help='특정 사용자의 timeline만 다시 만들기'
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk').values_list('pk', flat=True)
+        if options['user']:
+            users = users.filter(pk=options['user'])
+
+        count = 0
+        for user_id in users.iterator():
+            Feed.objects.filter(user_id=user_id).delete()
+            author_ids = list(Follow.objects.filter(follower_id=user_id).values_list('following_id', flat=True))
+            if Post.objects.filter(user_id=user_id).exists():
+                author_ids.append(user_id)
+            pull_posts(user_id, author_ids)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{count}명의 timeline rebuild success!'))
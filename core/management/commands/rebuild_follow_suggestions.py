@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from users import suggestions
+
+
+class Command(BaseCommand):
+    help = '사용자별 팔로우 추천 후보(친구의 친구)를 다시 계산합니다. (cron 등으로 주기적으로 실행)'
+
+    def add_arguments(self, parser):
+        """
+        ./manage.py rebuild_follow_suggestions
+        ./manage.py rebuild_follow_suggestions --user 1 --user 2
+        """
+        parser.add_argument('--user', action='append', type=int, help='계산할 사용자 ID (없으면 전체)')
+
+    def handle(self, *args, **options):
+        count = suggestions.rebuild(options['user'])
+        self.stdout.write(self.style.SUCCESS(f'사용자 {count}명 follow suggestion rebuild success!'))
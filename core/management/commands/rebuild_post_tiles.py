@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps import tiles
+
+
+class Command(BaseCommand):
+    help = '공개 게시물 전체를 다시 집계해서 지도 tile 칸별 게시물 수를 새로 만듭니다.'
+
+    def handle(self, *args, **options):
+        count = tiles.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{count}개 칸 rebuild success!'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from apps import search
+
+
+class Command(BaseCommand):
+    help = '게시물/댓글 내용 전체로 검색 역색인을 새로 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=sorted(search.KINDS), help='post/comment만 (기본값 전부)')
+
+    def handle(self, *args, **options):
+        backend = search.get_backend()
+        for kind in [options['type']] if options['type'] else sorted(search.KINDS):
+            count = backend.rebuild(kind)
+            self.stdout.write(self.style.SUCCESS(f'{kind} {count}개 rebuild success!'))
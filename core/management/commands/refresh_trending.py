@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from apps import trending
+
+
+class Command(BaseCommand):
+    help = '인기 게시물 점수를 다시 계산해서 cache에 저장합니다. (cron 등으로 TRENDING_REFRESH_INTERVAL 마다 실행)'
+
+    def add_arguments(self, parser):
+        """
+        ./manage.py refresh_trending
+        ./manage.py refresh_trending --rebuild
+        """
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='window 안의 좋아요/댓글을 다시 집계해서 구간 counter를 새로 만든 다음 계산'
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            count = trending.rebuild()
+            self.stdout.write(f'{count}개 구간 rebuild')
+        entry = trending.refresh()
+        self.stdout.write(self.style.SUCCESS(f'인기 게시물 {len(entry["posts"])}개 refresh success!'))
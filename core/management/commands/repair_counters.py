@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from core.cache import bump_version
+from core.counters import real_count, touch
+from users.models import User, Follow
+from apps.models import Post, Comment, Photo, Like
+
+# (counter를 저장하는 model, counter field, 실제로 셀 model, 셀 model의 FK 이름)
+COUNTERS = (
+    (Post, 'like_count', Like, 'post'),
+    (Post, 'comment_count', Comment, 'post'),
+    (Post, 'photo_count', Photo, 'post'),
+    (User, 'followers_count', Follow, 'following'),
+    (User, 'followings_count', Follow, 'follower'),
+)
+
+
+class Command(BaseCommand):
+    help = 'row에 저장된 counter(좋아요/댓글/사진/팔로우 수)를 다시 계산해서 틀어진 값을 바로잡습니다.'
+
+    def add_arguments(self, parser):
+        """
+        ./manage.py repair_counters --batch 1000
+        ./manage.py repair_counters --dry-run
+        """
+        parser.add_argument(
+            '--batch',
+            default=1000,
+            type=int,
+            help='한번에 수정할 row 수'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='수정하지 않고 틀어진 row 수만 출력'
+        )
+
+    def handle(self, *args, **options):
+        batch = options['batch']
+        for owner, field, model, relation in COUNTERS:
+            # 실제 값과 저장된 값이 다른 row만 골라서 수정한다.
+            drifted = owner.objects.annotate(real=real_count(model, relation)).exclude(
+                **{field: F('real')}
+            ).values_list('pk', flat=True)
+            pk_list = list(drifted)
+
+            if not options['dry_run']:
+                for start in range(0, len(pk_list), batch):
+                    pk_batch = pk_list[start:start + batch]
+                    with transaction.atomic():
+                        # 조건부 GET(ETag/Last-Modified)과 상세 조회 cache에도 고친 값이 반영되게 한다.
+                        owner.objects.filter(pk__in=pk_batch).update(
+                            **touch(owner, {field: real_count(model, relation)})
+                        )
+                    for pk in pk_batch:
+                        bump_version(owner, pk)
+
+            self.stdout.write(f'{owner.__name__}.{field}: {len(pk_list)}개 row 불일치')
+
+        self.stdout.write(self.style.SUCCESS('counter repair success!'))
@@ -0,0 +1,166 @@
+"""
+MessagePack 인코딩/디코딩 (순수 python 구현)
+
+msgpack 패키지(requirements.txt)가 설치되어 있지 않을때만 core.renderers에서 대신 사용한다.
+API 응답에 필요한 타입(None, bool, int, float, str, bytes, list, dict)만 지원한다.
+"""
+import struct
+
+
+class PackError(ValueError):
+    pass
+
+
+def packb(value, default=None):
+    """value를 MessagePack bytes로 만들기 (지원하지 않는 타입은 default(value)로 바꿔서 다시 시도한다.)"""
+    out = bytearray()
+    _pack(value, out, default)
+    return bytes(out)
+
+
+def _pack(value, out, default):
+    if value is None:
+        out.append(0xc0)
+    elif value is True:
+        out.append(0xc3)
+    elif value is False:
+        out.append(0xc2)
+    elif isinstance(value, int):
+        _pack_int(value, out)
+    elif isinstance(value, float):
+        out.append(0xcb)
+        out += struct.pack('>d', value)
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        _pack_header(len(data), out, fix=(0xa0, 31), codes=(0xd9, 0xda, 0xdb))
+        out += data
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        _pack_header(len(data), out, fix=None, codes=(0xc4, 0xc5, 0xc6))
+        out += data
+    elif isinstance(value, (list, tuple)):
+        _pack_header(len(value), out, fix=(0x90, 15), codes=(None, 0xdc, 0xdd))
+        for item in value:
+            _pack(item, out, default)
+    elif isinstance(value, dict):
+        _pack_header(len(value), out, fix=(0x80, 15), codes=(None, 0xde, 0xdf))
+        for key, item in value.items():
+            _pack(key, out, default)
+            _pack(item, out, default)
+    elif default is not None:
+        _pack(default(value), out, None)
+    else:
+        raise PackError(f'{type(value).__name__} 타입은 MessagePack으로 만들 수 없습니다.')
+
+
+def _pack_int(value, out):
+    if 0 <= value <= 0x7f:
+        out.append(value)
+    elif -32 <= value < 0:
+        out.append(value & 0xff)
+    elif value >= 0:
+        for code, fmt, limit in ((0xcc, '>B', 0xff), (0xcd, '>H', 0xffff), (0xce, '>I', 0xffffffff),
+                                 (0xcf, '>Q', 0xffffffffffffffff)):
+            if value <= limit:
+                out.append(code)
+                out += struct.pack(fmt, value)
+                return
+        raise PackError('정수 값이 너무 큽니다.')
+    else:
+        for code, fmt, limit in ((0xd0, '>b', 0x80), (0xd1, '>h', 0x8000), (0xd2, '>i', 0x80000000),
+                                 (0xd3, '>q', 0x8000000000000000)):
+            if -value <= limit:
+                out.append(code)
+                out += struct.pack(fmt, value)
+                return
+        raise PackError('정수 값이 너무 작습니다.')
+
+
+def _pack_header(length, out, fix, codes):
+    """str/bin/array/map 길이 header (fix: (fixtype 시작 값, 최대 길이), codes: 8/16/32bit 길이 code)"""
+    if fix is not None and length <= fix[1]:
+        out.append(fix[0] | length)
+    elif codes[0] is not None and length <= 0xff:
+        out.append(codes[0])
+        out.append(length)
+    elif length <= 0xffff:
+        out.append(codes[1])
+        out += struct.pack('>H', length)
+    else:
+        out.append(codes[2])
+        out += struct.pack('>I', length)
+
+
+def unpackb(data):
+    """MessagePack bytes를 python 값으로 바꾸기"""
+    data = bytes(data)
+    try:
+        value, offset = _unpack(data, 0)
+    except (IndexError, TypeError, struct.error, UnicodeDecodeError) as e:
+        raise PackError(f'MessagePack 형식이 아닙니다. ({e})')
+    if offset != len(data):
+        raise PackError('MessagePack 뒤에 남은 값이 있습니다.')
+    return value
+
+
+_FIXED = {
+    0xc0: None,
+    0xc2: False,
+    0xc3: True,
+}
+_NUMBERS = {
+    0xca: '>f', 0xcb: '>d',
+    0xcc: '>B', 0xcd: '>H', 0xce: '>I', 0xcf: '>Q',
+    0xd0: '>b', 0xd1: '>h', 0xd2: '>i', 0xd3: '>q',
+}
+_LENGTHS = {
+    # code: (타입, 길이 format)
+    0xd9: ('str', '>B'), 0xda: ('str', '>H'), 0xdb: ('str', '>I'),
+    0xc4: ('bin', '>B'), 0xc5: ('bin', '>H'), 0xc6: ('bin', '>I'),
+    0xdc: ('array', '>H'), 0xdd: ('array', '>I'),
+    0xde: ('map', '>H'), 0xdf: ('map', '>I'),
+}
+
+
+def _unpack(data, offset):
+    code = data[offset]
+    offset += 1
+    if code <= 0x7f:
+        return code, offset
+    if code >= 0xe0:
+        return code - 0x100, offset
+    if 0x80 <= code <= 0x8f:
+        return _unpack_container('map', code & 0x0f, data, offset)
+    if 0x90 <= code <= 0x9f:
+        return _unpack_container('array', code & 0x0f, data, offset)
+    if 0xa0 <= code <= 0xbf:
+        return _unpack_container('str', code & 0x1f, data, offset)
+    if code in _FIXED:
+        return _FIXED[code], offset
+    if code in _NUMBERS:
+        fmt = _NUMBERS[code]
+        return struct.unpack_from(fmt, data, offset)[0], offset + struct.calcsize(fmt)
+    if code in _LENGTHS:
+        kind, fmt = _LENGTHS[code]
+        length = struct.unpack_from(fmt, data, offset)[0]
+        return _unpack_container(kind, length, data, offset + struct.calcsize(fmt))
+    raise PackError(f'지원하지 않는 MessagePack 타입입니다. (0x{code:02x})')
+
+
+def _unpack_container(kind, length, data, offset):
+    if kind in ('str', 'bin'):
+        if offset + length > len(data):
+            raise IndexError('길이가 맞지 않습니다.')
+        raw = data[offset:offset + length]
+        return (raw.decode('utf-8') if kind == 'str' else raw), offset + length
+    if kind == 'array':
+        items = []
+        for _ in range(length):
+            item, offset = _unpack(data, offset)
+            items.append(item)
+        return items, offset
+    result = {}
+    for _ in range(length):
+        key, offset = _unpack(data, offset)
+        result[key], offset = _unpack(data, offset)
+    return result, offset
@@ -0,0 +1,138 @@
+from collections import OrderedDict
+from django.core import signing
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class InvalidCursor(ValueError):
+    """변조되었거나 형식이 맞지 않는 cursor"""
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    page 번호 방식 + cursor(keyset) 방식을 같이 지원하는 pagination
+
+    - ?page=3 : 기존과 같은 page 번호 방식 (COUNT(*) + OFFSET)
+    - ?cursor= : cursor 방식 (빈 값이면 첫 page)
+      (created_at, id)를 기준으로 이전 page의 마지막 row 다음부터 읽기 때문에
+      page가 깊어져도 느려지지 않고, 중간에 새 row가 추가되어도 결과가 밀리지 않는다.
+      전체 개수(count)는 계산하지 않는다.
+
+    cursor는 서명(signing)된 값이라 client가 내용을 바꾸면 InvalidCursor가 발생한다.
+    cursor_only가 True면 ?cursor가 없어도 cursor 방식(첫 page)으로 읽는다.
+    row는 model object 또는 created_at, id가 들어있는 dict(values())이다.
+    """
+    page_size = 20
+    cursor_query_param = 'cursor'
+    cursor_salt = 'core.pagination.cursor'
+    cursor_ordering = ('-created_at', '-id')
+    cursor_only = False
+
+    use_cursor = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_only or self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view=view)
+
+        self.request = request
+        position = self.decode_cursor(request.query_params.get(self.cursor_query_param, ''))
+
+        queryset = queryset.order_by(*self.cursor_ordering)
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+        # 다음 page가 있는지 확인하기 위해서 한개 더 읽는다.
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.rows = rows[:self.page_size]
+        return self.rows
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_cursor_link()),
+            ('results', data),
+        ]))
+
+    def get_page_state(self):
+        """응답에 들어가는 page 정보 (조건부 GET ETag 계산용)"""
+        if self.use_cursor:
+            return self.get_next_cursor_link(),
+        return self.page.paginator.count, self.get_next_link(), self.get_previous_link()
+
+    def get_next_cursor_link(self):
+        if not self.has_next:
+            return None
+        last = self.rows[-1]
+        if isinstance(last, dict):
+            created_at, pk = last['created_at'], last['id']
+        else:
+            created_at, pk = last.created_at, last.pk
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(created_at, pk))
+
+    def encode_cursor(self, created_at, pk):
+        return signing.dumps([created_at.isoformat(), pk], salt=self.cursor_salt)
+
+    def decode_cursor(self, value):
+        if not value:
+            return None
+        try:
+            created_at, pk = signing.loads(value, salt=self.cursor_salt)
+            created_at = parse_datetime(created_at)
+        except (signing.BadSignature, TypeError, ValueError):
+            raise InvalidCursor(value)
+        if created_at is None or not isinstance(pk, int):
+            raise InvalidCursor(value)
+        return created_at, pk
+
+
+class RankedPagination(object):
+    """
+    점수 순서 결과의 cursor pagination (점수가 같으면 id 역순, ex. 내용 검색)
+
+    paginate(fetch, request)의 fetch(after, size)는 after((점수, id), 첫 page는 None) 다음부터
+    size개의 [(id, 점수), ...]를 반환한다. 다음 page가 있는지 확인하기 위해서 한개 더 읽는다.
+    점수는 cursor에 그대로 들어가서 비교하기 때문에 정수여야 한다.
+    """
+    page_size = 20
+    cursor_query_param = 'cursor'
+    cursor_salt = 'core.pagination.ranked'
+
+    def paginate(self, fetch, request):
+        self.request = request
+        after = self.decode_cursor(request.query_params.get(self.cursor_query_param, ''))
+        rows = fetch(after, self.page_size + 1)
+        self.has_next = len(rows) > self.page_size
+        self.rows = rows[:self.page_size]
+        return self.rows
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        pk, score = self.rows[-1]
+        cursor = signing.dumps([score, pk], salt=self.cursor_salt)
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def decode_cursor(self, value):
+        if not value:
+            return None
+        try:
+            score, pk = signing.loads(value, salt=self.cursor_salt)
+        except (signing.BadSignature, TypeError, ValueError):
+            raise InvalidCursor(value)
+        if not isinstance(score, int) or not isinstance(pk, int):
+            raise InvalidCursor(value)
+        return score, pk
@@ -0,0 +1,35 @@
+"""
+REST_FRAMEWORK 요청 parser (core.renderers와 짝)
+
+- FastJSONParser: orjson이 있으면 orjson으로 요청 본문을 읽는다.
+- MessagePackParser: Content-Type: application/msgpack 요청 본문을 읽는다.
+"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from . import renderers
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = renderers.FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if renderers.orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return renderers.orjson.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+    renderer_class = renderers.MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return renderers.msgpack_loads(stream.read())
+        except Exception as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
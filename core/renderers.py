@@ -0,0 +1,86 @@
+"""
+REST_FRAMEWORK 응답 renderer
+
+- FastJSONRenderer: orjson으로 응답을 만든다. 결과는 DRF JSONRenderer와 같다. (Decimal, datetime, UUID, lazy 문자열 처리 포함)
+- MessagePackRenderer: Accept: application/msgpack (또는 ?format=msgpack) 요청에 MessagePack으로 응답한다.
+
+orjson, msgpack은 requirements.txt에 고정되어 있다.
+설치가 안된 환경(wheel이 없는 플랫폼 등)에서도 동작하도록 json 모듈, core.msgpack_codec(순수 python)으로 대신 처리한다.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+from . import msgpack_codec
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# DRF JSONEncoder가 json 모듈이 모르는 타입(Decimal, Promise, QuerySet 등)을 바꾸는 방법을 그대로 사용한다.
+_encoder = encoders.JSONEncoder(ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+
+
+def default(value):
+    return _encoder.default(value)
+
+
+if orjson is not None:
+    # datetime도 DRF와 같은 형식(UTC는 Z)이 되도록 default로 넘긴다.
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def json_dumps(data):
+    """compact JSON bytes (DRF JSONRenderer 기본 설정과 같은 결과)"""
+    if orjson is not None:
+        ret = orjson.dumps(data, default=default, option=ORJSON_OPTIONS)
+    else:
+        ret = _encoder.encode(data).encode()
+    # DRF와 같이 \u2028, \u2029는 escape 한다. (javascript 문자열에 사용할 수 없는 문자)
+    if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+        ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return ret
+
+
+def msgpack_dumps(data):
+    if msgpack is not None:
+        return msgpack.packb(data, default=default, use_bin_type=True)
+    return msgpack_codec.packb(data, default=default)
+
+
+def msgpack_loads(data):
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False)
+    return msgpack_codec.unpackb(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer와 같은 응답을 더 빠르게 만드는 renderer
+    (indent 요청이나 ensure_ascii 설정처럼 orjson이 지원하지 않는 경우는 JSONRenderer를 그대로 사용한다.)
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        return json_dumps(data)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack 응답 (모바일 client용, JSON보다 작고 parsing이 빠르다.)"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack_dumps(data)
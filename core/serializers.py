@@ -0,0 +1,211 @@
+from decimal import Decimal
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+
+class FastDecimalField(serializers.DecimalField):
+    """
+    DB에서 읽은 Decimal처럼 이미 decimal_places 자리로 저장된 값은 quantize 하지 않고 바로 문자열로 바꾸는 DecimalField
+    (게시물 리스트의 lat/lng 처럼 row마다 반복되는 값의 serialize 비용을 줄인다. 결과는 DecimalField와 같다.)
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        coerce_to_string = getattr(self, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        self.as_string = coerce_to_string and not self.localize
+
+    def to_representation(self, value):
+        if self.as_string and isinstance(value, Decimal):
+            text = str(value)
+            dot = text.find('.')
+            if dot != -1 and len(text) - dot - 1 == self.decimal_places and 'E' not in text:
+                return text
+        return super().to_representation(value)
+
+
+class InvalidQueryParam(ValueError):
+    """query parameter에 지원하지 않는 값이 들어있음"""
+
+    def __init__(self, param, values):
+        self.param = param
+        self.values = sorted(values)
+        super().__init__(f'{param}: {", ".join(self.values)}')
+
+
+class InvalidFields(InvalidQueryParam):
+    """fields/exclude에 없는 field가 들어있음"""
+
+
+class SparseFieldsMixin(object):
+    """
+    응답할 field 고르기 (?fields=id,lat,lng / ?exclude=content)
+
+    - get_sparse_fields(request): query parameter를 확인해서 응답할 field 목록을 반환한다. (없으면 None, 모르는 field는 InvalidFields)
+    - serializer를 만들때 fields=를 넘기면 해당 field만 응답한다.
+    EagerLoadingMixin과 같이 사용하면 setup_queryset(queryset, fields)에서 고르지 않은 field의 column/JOIN도 읽지 않는다.
+    """
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def get_readable_fields(cls):
+        return [name for name, field in cls._declared_fields.items() if not field.write_only]
+
+    @classmethod
+    def get_sparse_fields(cls, request, extra_fields=()):
+        """extra_fields: serializer 밖에서 응답에 추가하는 값 (ex. 상세 조회의 like_count)"""
+        names = cls.get_readable_fields() + list(extra_fields)
+        selected = split_names(request.query_params.get(cls.fields_query_param))
+        excluded = split_names(request.query_params.get(cls.exclude_query_param))
+        if selected is None and excluded is None:
+            return None
+        unknown = (selected or set()) | (excluded or set())
+        unknown -= set(names)
+        if unknown:
+            raise InvalidFields(f'{cls.fields_query_param}/{cls.exclude_query_param}', unknown)
+        return [
+            name for name in names
+            if (selected is None or name in selected) and (excluded is None or name not in excluded)
+        ]
+
+
+def split_names(value):
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def pick_fields(data, fields):
+    """serialize 된 값에서 고른 field만 남기기 (fields가 None이면 그대로)"""
+    if fields is None:
+        return data
+    return {name: value for name, value in data.items() if name in fields}
+
+
+class EagerLoadingMixin(object):
+    """
+    리스트 조회용 serializer가 사용할 queryset 구성 정보를 선언하는 mixin
+
+    - select_related_fields: JOIN으로 한번에 가져올 관계 (row마다 추가 쿼리가 나가는 N+1 방지)
+    - only_fields: 실제로 읽어올 column (password 같은 필요없는 column은 읽지 않는다.)
+    - get_annotations(): 집계해서 함께 가져올 값
+    - get_viewer_annotations(viewer, fields, ref): 요청한 사용자(viewer)에 따라 달라지는 값 (ex. has_liked)
+      page 쿼리에 Exists subquery로 같이 읽기 때문에 row마다(client는 항목마다 API를 한번 더) 조회하지 않는다.
+
+    view에서는 serializer.setup_queryset(queryset)을 거친 queryset을 pagination 하면
+    page 크기와 상관없이 고정된 수의 쿼리로 응답을 만들 수 있다.
+    fields(SparseFieldsMixin)를 넘기면 고르지 않은 serializer field의 JOIN/column은 제외한다.
+    (created_at, updated_at처럼 serializer field가 아닌 column은 pagination, ETag 계산에 필요해서 항상 읽는다.)
+    """
+    select_related_fields = ()
+    only_fields = ()
+
+    @classmethod
+    def get_annotations(cls):
+        return {}
+
+    @classmethod
+    def get_viewer_annotations(cls, viewer, fields=None, ref='pk'):
+        """
+        viewer: request.user (로그인 하지 않았으면 빈 값, serializer field의 default를 응답한다.)
+        ref: row의 pk를 가리키는 경로 (다른 model의 queryset에 붙일때, ex. Feed의 'post_id')
+        """
+        return {}
+
+    @classmethod
+    def is_selected(cls, path, fields):
+        name = path.split('__')[0]
+        return fields is None or name in fields or name not in getattr(cls, '_declared_fields', {})
+
+    @classmethod
+    def get_select_related_fields(cls, fields=None):
+        return tuple(path for path in cls.select_related_fields if cls.is_selected(path, fields))
+
+    @classmethod
+    def get_only_fields(cls, fields=None):
+        return tuple(path for path in cls.only_fields if cls.is_selected(path, fields))
+
+    @classmethod
+    def setup_queryset(cls, queryset, fields=None, viewer=None):
+        select_related_fields = cls.get_select_related_fields(fields)
+        if select_related_fields:
+            queryset = queryset.select_related(*select_related_fields)
+        if cls.only_fields:
+            queryset = queryset.only(*cls.get_only_fields(fields))
+        annotations = dict(cls.get_annotations(), **cls.get_viewer_annotations(viewer, fields))
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset
+
+
+class InvalidExpand(InvalidQueryParam):
+    """expand에 지원하지 않는 관계가 들어있음"""
+
+
+class ReferenceExpansionMixin(object):
+    """
+    리스트 조회에서 foreign key를 id로만 응답하고, 필요한 관계만 따로 한번씩 내려주는 mixin (?expand=post,user)
+
+    - references: expand 할 수 있는 관계 [(이름, model, serializer), ...]
+      row(+ 앞에서 가져온 object)의 {이름}_id 값을 모아서 관계마다 in_bulk 쿼리 1번으로 가져온다.
+      (ex. comment의 post를 먼저 가져오면 user에는 댓글 작성자 + 게시물 작성자가 같이 들어간다.)
+    - 가져온 object는 중복 없이 응답의 included에 {이름}s 로 담긴다.
+    - reference_through: row에 {이름}_id가 없어서 다른 관계를 거쳐야 하는 관계 {이름: 거치는 관계}
+      (ex. 사진 작성자는 게시물의 user_id, 거치는 관계를 expand 하지 않았으면 id만 읽고 included에는 넣지 않는다.)
+    - setup_queryset(queryset, fields, viewer, expand): ?fields=로 관계를 빼도 expand 한 관계의 {이름}_id column은 읽는다.
+      (빠진 column은 row마다 따로 조회하게 되서 N+1이 된다. 응답할 field는 그대로 fields를 따른다.)
+
+    row마다 중첩된 object를 반복해서 내려주지 않기 때문에 응답 크기와 쿼리 수가 row 수가 아닌 관계 수에 비례한다.
+    """
+    expand_query_param = 'expand'
+    references = ()
+    reference_through = {}
+
+    @classmethod
+    def get_expand(cls, request):
+        value = request.query_params.get(cls.expand_query_param, '')
+        expand = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = expand - {name for name, model, serializer_class in cls.references}
+        if unknown:
+            raise InvalidExpand(cls.expand_query_param, unknown)
+        return expand
+
+    @classmethod
+    def get_reference_fields(cls, expand):
+        """expand 한 관계를 가져올때 row에서 읽는 관계 이름 (reference_through면 거치는 관계)"""
+        return {cls.reference_through.get(name, name) for name in expand}
+
+    @classmethod
+    def setup_queryset(cls, queryset, fields=None, viewer=None, expand=()):
+        if fields is not None and expand:
+            fields = list(fields) + sorted(cls.get_reference_fields(expand) - set(fields))
+        return super().setup_queryset(queryset, fields, viewer)
+
+    @classmethod
+    def get_included(cls, rows, expand):
+        """included 응답과 가져온 object 목록(row 포함) 반환"""
+        rows = list(rows)
+        objects = list(rows)
+        included = {}
+        for name, model, serializer_class in cls.references:
+            if name not in expand:
+                continue
+            through = cls.reference_through.get(name)
+            if through is not None and through not in expand:
+                through_model = next(ref_model for ref_name, ref_model, _ in cls.references if ref_name == through)
+                through_ids = {getattr(obj, f'{through}_id', None) for obj in rows}
+                through_ids.discard(None)
+                objects += through_model.objects.filter(pk__in=through_ids).only('pk', f'{name}_id', 'updated_at')
+            ids = {getattr(obj, f'{name}_id', None) for obj in objects}
+            ids.discard(None)
+            found = serializer_class.setup_queryset(model.objects.all()).in_bulk(ids) if ids else {}
+            objects += found.values()
+            included[f'{name}s'] = serializer_class([found[pk] for pk in sorted(found)], many=True).data
+        return included, objects
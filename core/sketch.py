@@ -0,0 +1,222 @@
+"""
+고정된 크기의 메모리로 요청 통계 추정하기 (요청이 많은 key, 서로 다른 사용자 수)
+
+- CountMinSketch: 고정된 크기(depth x width counter)로 key별 요청 수를 추정한다.
+  실제 값보다 작게 나오지 않고, 크게 나오는 오차는 전체 요청 수 * e / width 이하이다. (확률 1 - e^-depth)
+- SpaceSaving: 요청 수 상위 size개 key와 수를 유지한다. (size개 보다 많아지면 가장 작은 key를 새 key로 바꾼다.)
+- HeavyHitters: 위 두 가지를 같이 사용하고 decay_interval 초마다 값을 절반으로 줄여서 "최근" 요청 수를 보여준다.
+- HyperLogLog: 고정된 크기(2^precision bytes)로 서로 다른 값의 수를 추정한다. (오차 약 1.04 / sqrt(2^precision))
+
+hash는 process와 상관없이 같은 값(blake2b)을 사용하기 때문에 같은 크기의 sketch는 여러 process의 값을 합칠 수 있다. (merge)
+"""
+import hashlib
+import math
+import threading
+import time
+import zlib
+from array import array
+
+
+def key_hashes(key):
+    digest = hashlib.blake2b(str(key).encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+class CountMinSketch(object):
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.rows = [array('q', bytes(8 * width)) for _ in range(depth)]
+        self.total = 0
+
+    def indexes(self, key):
+        h1, h2 = key_hashes(key)
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key, count=1):
+        """key 요청 수 증가 -> 증가한 다음의 추정 값"""
+        self.total += count
+        estimate = None
+        for row, index in zip(self.rows, self.indexes(key)):
+            row[index] += count
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+        return estimate
+
+    def estimate(self, key):
+        return min(row[index] for row, index in zip(self.rows, self.indexes(key)))
+
+    def merge(self, other):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError('크기가 다른 sketch는 합칠 수 없습니다.')
+        for row, other_row in zip(self.rows, other.rows):
+            for index, count in enumerate(other_row):
+                if count:
+                    row[index] += count
+        self.total += other.total
+
+    def decay(self):
+        self.rows = [array('q', (count >> 1 for count in row)) for row in self.rows]
+        self.total >>= 1
+
+
+class SpaceSaving(object):
+    """
+    상위 size개 key -> [요청 수, 오차]
+    가장 작은 key를 바꿀때 새 key는 (바뀐 key의 수 + 1)로 시작하고 바뀐 key의 수를 오차로 가진다.
+    """
+    def __init__(self, size=100):
+        self.size = size
+        self.counters = {}
+
+    def add(self, key, count=1):
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += count
+        elif len(self.counters) < self.size:
+            self.counters[key] = [count, 0]
+        else:
+            smallest = min(self.counters, key=lambda name: self.counters[name][0])
+            minimum = self.counters.pop(smallest)[0]
+            self.counters[key] = [minimum + count, minimum]
+
+    def top(self, size=None):
+        """[(key, 요청 수, 오차), ...] (요청 수 순서)"""
+        rows = sorted(self.counters.items(), key=lambda item: (-item[1][0], str(item[0])))
+        return [(key, count, error) for key, (count, error) in rows[:size or self.size]]
+
+    def minimum(self):
+        """가득 차있으면 가장 작은 요청 수 (목록에 없는 key의 요청 수는 이 값 이하이다.)"""
+        if len(self.counters) < self.size:
+            return 0
+        return min(count for count, _ in self.counters.values())
+
+    def merge(self, other):
+        """
+        두 목록 합치기 (한쪽에만 있는 key는 다른 쪽의 최소값만큼 있었을 수 있어서 수와 오차에 더한다.)
+        """
+        own_minimum, other_minimum = self.minimum(), other.minimum()
+        merged = {}
+        for key in set(self.counters) | set(other.counters):
+            count, error = self.counters.get(key, [own_minimum, own_minimum])
+            other_count, other_error = other.counters.get(key, [other_minimum, other_minimum])
+            merged[key] = [count + other_count, error + other_error]
+        rows = sorted(merged.items(), key=lambda item: -item[1][0])[:self.size]
+        self.counters = dict(rows)
+
+    def decay(self):
+        self.counters = {
+            key: [count >> 1, error >> 1] for key, (count, error) in self.counters.items() if count >> 1
+        }
+
+
+class HeavyHitters(object):
+    """
+    최근 요청이 많은 key (CountMinSketch + SpaceSaving)
+    decay_interval 초마다 모든 값을 절반으로 줄인다. (None이면 줄이지 않는다.)
+    여러 thread에서 같이 사용해도 되도록 lock을 건다.
+    """
+    def __init__(self, width=2048, depth=4, size=100, decay_interval=None):
+        self.sketch = CountMinSketch(width, depth)
+        self.top_keys = SpaceSaving(size)
+        self.decay_interval = decay_interval
+        self.decayed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, key, count=1):
+        """key 요청 수 증가 -> 추정 요청 수"""
+        with self._lock:
+            self.decay_if_needed()
+            self.top_keys.add(key, count)
+            return self.sketch.add(key, count)
+
+    def estimate(self, key):
+        with self._lock:
+            return self.sketch.estimate(key)
+
+    def top(self, size=None):
+        """
+        [(key, 추정 요청 수), ...]
+        SpaceSaving, CountMinSketch 둘 다 실제보다 크게 추정하기 때문에 작은 값을 사용한다.
+        """
+        with self._lock:
+            rows = [(key, min(count, self.sketch.estimate(key))) for key, count, _ in self.top_keys.top()]
+        rows.sort(key=lambda row: -row[1])
+        return rows[:size]
+
+    def merge(self, other):
+        with self._lock:
+            self.sketch.merge(other.sketch)
+            self.top_keys.merge(other.top_keys)
+
+    def decay_if_needed(self):
+        if self.decay_interval is None:
+            return
+        now = time.monotonic()
+        while now - self.decayed_at >= self.decay_interval:
+            self.sketch.decay()
+            self.top_keys.decay()
+            self.decayed_at += self.decay_interval
+            if not self.sketch.total:
+                self.decayed_at = now
+                break
+
+    def __getstate__(self):
+        # 다른 process로 보낼때(cache 저장) lock은 뺀다.
+        with self._lock:
+            state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class HyperLogLog(object):
+    """
+    서로 다른 값의 수 추정
+    register는 값마다 1 byte라서 precision 12면 4KB이다. (저장할때는 zlib으로 압축해서 값이 적으면 훨씬 작다.)
+    merge는 register별 최대값이라 여러 번, 어떤 순서로 합쳐도 결과가 같다. (손실 없음)
+    """
+    def __init__(self, precision=12, registers=None):
+        if not 4 <= precision <= 16:
+            raise ValueError('precision은 4 ~ 16 이어야 합니다.')
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.size)
+        if len(self.registers) != self.size:
+            raise ValueError('register 크기가 precision과 맞지 않습니다.')
+
+    def add(self, value):
+        """값 추가 -> register가 바뀌었는지"""
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'little')
+        index = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def count(self):
+        size = self.size
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(size, 0.7213 / (1 + 1.079 / size))
+        estimate = alpha * size * size / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            # 값이 적을때는 비어있는 register 수로 계산하는게 더 정확하다. (linear counting)
+            estimate = size * math.log(size / zeros)
+        return int(round(estimate))
+
+    def merge(self, other):
+        if self.precision != other.precision:
+            raise ValueError('precision이 다른 HyperLogLog는 합칠 수 없습니다.')
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def to_bytes(self):
+        return zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data, precision=12):
+        return cls(precision, zlib.decompress(data))
@@ -0,0 +1,30 @@
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from . import cache as detail_cache
+
+
+@api_view(['GET'])
+def metrics_view(request):
+    """
+    운영 지표 확인 (관리자만 가능)
+
+    ---
+    ## `/api/v1/metrics/`
+
+        - detail_cache: 상세 조회 cache 적중(hits)/실패(misses) 수 (현재 process 기준)
+        - hot_objects: 최근 요청(상세 조회, 좋아요)이 많은 object 순서 (모든 process 합계, 추정 값)
+    """
+    try:
+        if not request.user.is_authenticated or not request.user.is_admin:
+            response_message = {'007': '관리자만 확인할 수 있습니다.'}
+            return Response(data=response_message, status=status.HTTP_403_FORBIDDEN)
+        metrics = {
+            'detail_cache': detail_cache.get_stats(),
+            'hot_objects': detail_cache.get_hot_stats(20),
+        }
+        return Response(data=metrics, status=status.HTTP_200_OK)
+    except Exception as e:
+        print(f'error : {e}')
+        response_message = {'999': '서버 에러'}
+        return Response(data=response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -1,4 +1,20 @@
+import datetime
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from .tests import Test
+from rest_framework.renderers import JSONRenderer
+from core import cache as detail_cache, geo, msgpack_codec, sketch
+from core.sketch import HyperLogLog
+from apps import like_buffer, likes, search, tiles, trending, viewers
+from apps.feed import fan_out_post
+from apps.models import Post, Comment, Photo, Like, Feed, PostActivity, PostTileCell, SearchGram
+from users.models import User, Follow
 from apps.serializers import PostSerializer
 from django.contrib.auth import authenticate
 
@@ -29,3 +45,844 @@ class PostTest(Test):
             self.assertEqual(True, is_created)
         else:
             print('게시물 생성 실패')
+
+
+class PostListQueryTest(Test):
+    """리스트 조회 API 쿼리 수 확인 (page 크기와 상관없이 고정된 쿼리 수)"""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(25):
+            user = self.user if i % 2 else self.user2
+            post = Post.objects.create(user=user, content=f'테스트 게시물 {i}', lat='37.5', lng='127.0')
+            Like.objects.create(user=self.user, post=post)
+            Comment.objects.create(user=self.user2, post=post, content='테스트 댓글')
+            Photo.objects.create(post=post, image='photo_image/test.jpg')
+
+    def test_posts_view_query_count(self):
+        """게시물 리스트 조회 쿼리 수"""
+        print('게시물 리스트 조회 쿼리 수')
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/post/')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(20, len(response.data['results']))
+        self.assertEqual(1, response.data['results'][0]['like_count'])
+        self.assertEqual(1, response.data['results'][0]['comment_count'])
+        self.assertEqual(1, response.data['results'][0]['photo_count'])
+
+    def test_posts_view_has_liked(self):
+        """로그인 했으면 좋아요 여부를 page 쿼리에 같이 읽는다 (쿼리 수는 그대로)"""
+        print('게시물 리스트 좋아요 여부')
+        for user, liked in ((self.user, True), (self.user2, False)):
+            header = self.auth_header(user)
+            self.client.get('/api/v1/users/me/', **header)
+            with self.assertNumQueries(2):
+                response = self.client.get('/api/v1/post/', **header)
+            self.assertEqual({liked}, {post['has_liked'] for post in response.data['results']})
+        response = self.client.get('/api/v1/post/search/', {'fields': 'id'}, **self.auth_header(self.user))
+        self.assertNotIn('has_liked', response.data['results'][0])
+
+    def test_posts_view_cursor(self):
+        """게시물 리스트 cursor 방식 조회 (중간에 게시물이 추가되어도 밀리지 않음)"""
+        print('게시물 리스트 cursor 조회')
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/post/', {'cursor': ''})
+        self.assertNotIn('count', response.data)
+        first_ids = [post['id'] for post in response.data['results']]
+
+        Post.objects.create(user=self.user, content='새 게시물', lat='37.5', lng='127.0')
+        response = self.client.get(response.data['next'])
+        second_ids = [post['id'] for post in response.data['results']]
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(25, len(set(first_ids + second_ids)))
+
+    def test_posts_view_invalid_cursor(self):
+        """변조된 cursor"""
+        print('변조된 cursor')
+        response = self.client.get('/api/v1/post/', {'cursor': 'WyIyMDIxIiwgMV0:1abc:xyz'})
+        self.assertEqual(400, response.status_code)
+
+    def test_post_search_query_count(self):
+        """게시물 검색 쿼리 수"""
+        print('게시물 검색 쿼리 수')
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/post/search/', {'lat': '37.5', 'lng': '127.0'})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(20, len(response.data['results']))
+
+    def test_comments_view_query_count(self):
+        """댓글 리스트 조회 쿼리 수"""
+        print('댓글 리스트 조회 쿼리 수')
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/comment/')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(20, len(response.data['results']))
+
+    def test_photos_view_query_count(self):
+        """사진 리스트 조회 쿼리 수"""
+        print('사진 리스트 조회 쿼리 수')
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/photo/')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(20, len(response.data['results']))
+
+    def test_comments_view_expand(self):
+        """댓글 리스트 expand (관계마다 쿼리 1번, 중복 없이 included에 담김)"""
+        print('댓글 리스트 expand')
+        response = self.client.get('/api/v1/comment/')
+        self.assertEqual(self.user2.pk, response.data['results'][0]['user'])
+        self.assertNotIn('included', response.data)
+
+        with self.assertNumQueries(4):  # count + page + 게시물 + 사용자
+            response = self.client.get('/api/v1/comment/', {'expand': 'post,user'})
+        included = response.data['included']
+        self.assertEqual(20, len(included['posts']))
+        self.assertEqual({self.user.pk, self.user2.pk}, {user['id'] for user in included['users']})
+
+        response = self.client.get('/api/v1/comment/', {'expand': 'password'})
+        self.assertEqual(400, response.status_code)
+
+    def test_expand_with_fields(self):
+        """fields에서 관계를 빼도 expand 한 관계의 id column은 page 쿼리에서 같이 읽는다 (N+1 없음)"""
+        print('리스트 expand + fields')
+        with self.assertNumQueries(3):  # count + page + 게시물
+            response = self.client.get('/api/v1/comment/', {'expand': 'post', 'fields': 'id'})
+        self.assertEqual(['id'], list(response.data['results'][0]))
+        self.assertEqual(20, len(response.data['included']['posts']))
+
+        with self.assertNumQueries(4):  # count + page + 게시물 작성자 id + 사용자
+            response = self.client.get('/api/v1/photo/', {'expand': 'user', 'fields': 'id'})
+        self.assertEqual(['id'], list(response.data['results'][0]))
+        self.assertEqual({self.user.pk, self.user2.pk}, {user['id'] for user in response.data['included']['users']})
+
+    def test_photos_view_expand(self):
+        """사진 리스트 expand=user는 게시물 작성자 (게시물을 expand 하지 않아도 쿼리 1번으로 거쳐서 찾는다)"""
+        print('사진 리스트 expand')
+        authors = {self.user.pk, self.user2.pk}
+        with self.assertNumQueries(4):  # count + page + 게시물 작성자 id + 사용자
+            response = self.client.get('/api/v1/photo/', {'expand': 'user'})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(['users'], list(response.data['included']))
+        self.assertEqual(authors, {user['id'] for user in response.data['included']['users']})
+
+        with self.assertNumQueries(4):  # count + page + 게시물 + 사용자
+            response = self.client.get('/api/v1/photo/', {'expand': 'post,user'})
+        included = response.data['included']
+        self.assertEqual(20, len(included['posts']))
+        self.assertEqual(authors, {user['id'] for user in included['users']})
+
+
+class SparseFieldsTest(Test):
+    """?fields= / ?exclude= 로 응답 field와 읽는 column 줄이기"""
+
+    def setUp(self):
+        super().setUp()
+        self.post = Post.objects.create(user=self.user, content='테스트 게시물', lat='37.5', lng='127.0')
+
+    def test_post_list_fields(self):
+        """고른 field만 응답하고 게시물 내용, 작성자는 읽지 않는다"""
+        print('게시물 리스트 fields')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/post/', {'fields': 'id,lat,lng'})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'id', 'lat', 'lng'}, set(response.data['results'][0]))
+        page_sql = queries.captured_queries[-1]['sql']
+        self.assertNotIn('content', page_sql)
+        self.assertNotIn('JOIN', page_sql)
+
+        response = self.client.get('/api/v1/post/', {'exclude': 'user,content'})
+        self.assertNotIn('user', response.data['results'][0])
+        self.assertIn('like_count', response.data['results'][0])
+
+    def test_unknown_fields(self):
+        """모르는 field는 400"""
+        print('모르는 field')
+        self.assertEqual(400, self.client.get('/api/v1/post/', {'fields': 'id,password'}).status_code)
+        self.assertEqual(400, self.client.get(f'/api/v1/post/{self.post.pk}/', {'exclude': 'foo'}).status_code)
+
+    def test_post_detail_fields(self):
+        """상세 조회도 cache에 저장된 응답에서 고른 field만 내려준다"""
+        print('게시물 상세 조회 fields')
+        url = f'/api/v1/post/{self.post.pk}/'
+        full = self.client.get(url)
+        response = self.client.get(url, {'fields': 'id,like_count'})
+        self.assertEqual({'id': self.post.pk, 'like_count': 0}, response.data)
+        self.assertNotEqual(full['ETag'], response['ETag'])
+
+
+class RendererTest(Test):
+    """JSON / MessagePack 응답 renderer, parser"""
+
+    def setUp(self):
+        super().setUp()
+        self.post = Post.objects.create(user=self.user, content='테스트 게시물 \u2028', lat='37.5', lng='127.0')
+
+    def test_json_same_as_drf(self):
+        """FastJSONRenderer 결과는 DRF JSONRenderer와 같다"""
+        print('JSON renderer 결과 비교')
+        response = self.client.get('/api/v1/post/')
+        self.assertEqual(JSONRenderer().render(response.data), response.content)
+        self.assertEqual('37.500000', response.json()['results'][0]['lat'])
+
+    def test_msgpack(self):
+        """Accept: application/msgpack 응답과 MessagePack 요청 본문"""
+        print('MessagePack 응답/요청')
+        response = self.client.get('/api/v1/post/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual('application/msgpack', response['Content-Type'])
+        self.assertEqual(self.post.content, msgpack_codec.unpackb(response.content)['results'][0]['content'])
+
+        body = msgpack_codec.packb({'content': '메시지팩 게시물', 'lat': '37.1', 'lng': '127.1'})
+        response = self.client.post(
+            '/api/v1/post/', body, content_type='application/msgpack', **self.auth_header(self.user)
+        )
+        self.assertEqual(201, response.status_code)
+
+    def test_msgpack_codec(self):
+        """순수 python MessagePack 구현 round trip"""
+        print('MessagePack codec')
+        value = {'a': [None, True, False, 0, -1, -33, 255, 70000, -70000, 2 ** 40, 1.5, 'x' * 40, b'bin'], '한글': {}}
+        self.assertEqual(value, msgpack_codec.unpackb(msgpack_codec.packb(value)))
+
+
+class PostCounterTest(Test):
+    """게시물 counter(좋아요/댓글/사진 수) 유지"""
+
+    def setUp(self):
+        super().setUp()
+        self.post = Post.objects.create(user=self.user, content='테스트 게시물', lat='37.5', lng='127.0')
+
+    def test_counter_increase_and_cascade(self):
+        """생성시 증가, CASCADE 삭제시 감소"""
+        print('게시물 counter 증감')
+        Like.objects.create(user=self.user2, post=self.post)
+        Comment.objects.create(user=self.user2, post=self.post, content='테스트 댓글')
+        Photo.objects.create(post=self.post, image='photo_image/test.jpg')
+        self.post.refresh_from_db()
+        self.assertEqual((1, 1, 1), (self.post.like_count, self.post.comment_count, self.post.photo_count))
+
+        self.user2.delete()
+        self.post.refresh_from_db()
+        self.assertEqual((0, 0, 1), (self.post.like_count, self.post.comment_count, self.post.photo_count))
+
+    def test_post_view_like_count(self):
+        """게시물 조회시 좋아요 수는 Like를 세지 않고 row에서 읽는다"""
+        print('게시물 조회 좋아요 수')
+        Like.objects.create(user=self.user2, post=self.post)
+        with self.assertNumQueries(1):  # 게시물 + 작성자 JOIN
+            response = self.client.get(f'/api/v1/post/{self.post.pk}/')
+        self.assertEqual(1, response.data['like_count'])
+
+    def test_repair_counters(self):
+        """틀어진 counter 복구"""
+        print('counter 복구')
+        Like.objects.create(user=self.user2, post=self.post)
+        Post.objects.filter(pk=self.post.pk).update(like_count=10)
+        updated_at = Post.objects.get(pk=self.post.pk).updated_at
+        version = detail_cache.get_own_version(Post, self.post.pk)
+        call_command('repair_counters', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(1, self.post.like_count)
+        # 조건부 GET, 상세 조회 cache에도 반영
+        self.assertGreater(self.post.updated_at, updated_at)
+        self.assertNotEqual(version, detail_cache.get_own_version(Post, self.post.pk))
+
+    def test_update_keeps_counters(self):
+        """게시물 수정은 읽은 다음에 바뀐 counter를 덮어쓰지 않는다"""
+        print('게시물 수정 counter 유지')
+        post = Post.objects.get(pk=self.post.pk)
+        Like.objects.create(user=self.user2, post=self.post)
+        serializer = PostSerializer(post, data={'content': '수정한 게시물'}, partial=True)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        self.post.refresh_from_db()
+        self.assertEqual(('수정한 게시물', 1), (self.post.content, self.post.like_count))
+
+    def test_post_delete_skips_child_counters(self):
+        """게시물 삭제시 CASCADE로 지워지는 좋아요마다 게시물 counter를 고치지 않는다"""
+        print('게시물 삭제 counter 건너뛰기')
+        users = [self.user2] + [User.objects.create(email=f'like{i}@test.com', nickname=f'like{i}') for i in range(4)]
+        for user in users:
+            Like.objects.create(user=user, post=self.post)
+        with CaptureQueriesContext(connection) as context:
+            self.post.delete()
+        counter_updates = ('UPDATE "apps_post" ', 'UPDATE "apps_postactivity"')
+        updates = [query['sql'] for query in context.captured_queries if query['sql'].startswith(counter_updates)]
+        self.assertEqual([], updates)
+        self.assertFalse(Like.objects.exists())
+
+        # 게시물이 남아있는 좋아요 삭제는 그대로 감소
+        post = Post.objects.create(user=self.user, content='테스트 게시물', lat='37.5', lng='127.0')
+        Like.objects.create(user=self.user2, post=post)
+        self.user2.delete()
+        post.refresh_from_db()
+        self.assertEqual(0, post.like_count)
+
+
+class LikeToggleTest(Test):
+    """좋아요 PUT/DELETE (여러번 요청해도 결과가 같다)"""
+
+    def setUp(self):
+        super().setUp()
+        self.post = Post.objects.create(user=self.user, content='테스트 게시물', lat='37.5', lng='127.0')
+        self.url = f'/api/v1/post/favs/{self.post.pk}/'
+
+    def test_put_delete_idempotent(self):
+        """PUT 두번은 좋아요 1개, DELETE 두번은 0개"""
+        print('좋아요 PUT/DELETE 멱등성')
+        for _ in range(2):
+            response = self.client.put(self.url, **self.auth_header(self.user2))
+            self.assertEqual(200, response.status_code)
+            self.assertEqual({'post_id': self.post.pk, 'liked': True, 'like_count': 1}, response.data)
+        self.assertEqual(1, Like.objects.filter(post=self.post, user=self.user2).count())
+
+        for _ in range(2):
+            response = self.client.delete(self.url, **self.auth_header(self.user2))
+            self.assertEqual({'post_id': self.post.pk, 'liked': False, 'like_count': 0}, response.data)
+        self.post.refresh_from_db()
+        self.assertEqual(0, self.post.like_count)
+        self.assertFalse(Like.objects.filter(post=self.post).exists())
+
+    def test_put_errors(self):
+        """인증 없음 403, 없는 게시물 404 (좋아요가 저장되지 않는다)"""
+        print('좋아요 PUT 에러')
+        self.assertEqual(403, self.client.put(self.url).status_code)
+        response = self.client.put(f'/api/v1/post/favs/{self.post.pk + 100}/', **self.auth_header(self.user2))
+        self.assertEqual(404, response.status_code)
+        self.assertFalse(Like.objects.exists())
+
+    def test_posts_fav_toggle(self):
+        """POST 좋아요 토글"""
+        print('좋아요 POST 토글')
+        data = {'post_id': self.post.pk}
+        response = self.client.post('/api/v1/post/favs/', data, **self.auth_header(self.user2))
+        self.assertIn('success', response.data)
+        response = self.client.post('/api/v1/post/favs/', data, **self.auth_header(self.user2))
+        self.assertIn('message', response.data)
+        self.post.refresh_from_db()
+        self.assertEqual(0, self.post.like_count)
+
+
+class LikeBufferTest(Test):
+    """좋아요 write-behind buffer"""
+
+    def setUp(self):
+        super().setUp()
+        self.post = Post.objects.create(user=self.user, content='테스트 게시물', lat='37.5', lng='127.0')
+        self.journal_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.journal_dir.cleanup)
+
+    def test_coalesce_and_flush(self):
+        """같은 (user, post) 요청은 마지막 요청만 저장된다"""
+        print('좋아요 buffer 저장')
+        buffer = like_buffer.LikeBuffer(journal_dir=self.journal_dir.name)
+        self.assertEqual((True, 1), like_buffer.like(self.user2.pk, self.post.pk, buffer))
+        self.assertEqual((False, 1), like_buffer.like(self.user2.pk, self.post.pk, buffer))
+        self.assertEqual((True, 0), like_buffer.unlike(self.user2.pk, self.post.pk, buffer))
+        like_buffer.like(self.user2.pk, self.post.pk, buffer)
+        like_buffer.like(self.user.pk, self.post.pk, buffer)
+        self.assertEqual(2, len(buffer))
+        self.assertFalse(Like.objects.exists())
+
+        self.assertEqual(2, buffer.flush())
+        self.post.refresh_from_db()
+        self.assertEqual(2, self.post.like_count)
+        self.assertEqual(0, len(buffer))
+        with self.assertRaises(Post.DoesNotExist):
+            like_buffer.like(self.user2.pk, self.post.pk + 100, buffer)
+
+    def test_journal_recover(self):
+        """저장하지 못하고 죽은 buffer의 요청은 journal에서 다시 가져온다"""
+        print('좋아요 buffer journal 복구')
+        buffer = like_buffer.LikeBuffer(journal_dir=self.journal_dir.name)
+        like_buffer.like(self.user2.pk, self.post.pk, buffer)
+
+        recovered = like_buffer.LikeBuffer(journal_dir=self.journal_dir.name)
+        self.assertTrue(recovered.get(self.user2.pk, self.post.pk))
+        recovered.flush()
+        self.assertTrue(Like.objects.filter(user=self.user2, post=self.post).exists())
+
+    def test_view_read_your_writes(self):
+        """buffer 사용시 PUT 응답에 본인 좋아요가 바로 반영된다"""
+        print('좋아요 buffer 응답')
+        self.addCleanup(setattr, like_buffer, '_buffer', None)
+        with override_settings(LIKE_BUFFER_ENABLED=True, LIKE_BUFFER_FLUSH_INTERVAL=None,
+                               LIKE_BUFFER_JOURNAL_DIR=self.journal_dir.name):
+            response = self.client.put(f'/api/v1/post/favs/{self.post.pk}/', **self.auth_header(self.user2))
+            self.assertEqual({'post_id': self.post.pk, 'liked': True, 'like_count': 1}, response.data)
+            self.assertFalse(Like.objects.exists())
+            like_buffer.get_buffer().flush()
+        self.assertEqual(1, Like.objects.filter(user=self.user2, post=self.post).count())
+
+    def test_list_and_detail_read_your_writes(self):
+        """buffer 사용시 리스트/상세 조회에도 본인의 저장하지 않은 좋아요가 바로 반영된다 (ETag도 바뀐다)"""
+        print('좋아요 buffer 리스트/상세 조회')
+        self.addCleanup(setattr, like_buffer, '_buffer', None)
+        url = f'/api/v1/post/{self.post.pk}/'
+        with override_settings(LIKE_BUFFER_ENABLED=True, LIKE_BUFFER_FLUSH_INTERVAL=None,
+                               LIKE_BUFFER_JOURNAL_DIR=self.journal_dir.name):
+            list_etag = self.client.get('/api/v1/post/', **self.auth_header(self.user2))['ETag']
+            detail_etag = self.client.get(url, **self.auth_header(self.user2))['ETag']
+            self.client.put(f'/api/v1/post/favs/{self.post.pk}/', **self.auth_header(self.user2))
+
+            response = self.client.get('/api/v1/post/', HTTP_IF_NONE_MATCH=list_etag, **self.auth_header(self.user2))
+            self.assertEqual(200, response.status_code)
+            self.assertTrue(response.data['results'][0]['has_liked'])
+            self.assertEqual(1, response.data['results'][0]['like_count'])
+            response = self.client.get('/api/v1/post/', {'fields': 'id,like_count'}, **self.auth_header(self.user2))
+            self.assertEqual(1, response.data['results'][0]['like_count'])
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=detail_etag, **self.auth_header(self.user2))
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(1, response.data['like_count'])
+            # 다른 사용자에게는 저장된 다음에 보인다.
+            self.assertEqual(0, self.client.get(url, **self.auth_header(self.user)).data['like_count'])
+            self.assertFalse(Like.objects.exists())
+            like_buffer.get_buffer().flush()
+
+
+class TrendingTest(Test):
+    """인기 게시물"""
+
+    def setUp(self):
+        super().setUp()
+        self.recent = Post.objects.create(user=self.user, content='최근 좋아요', lat='37.5', lng='127.0')
+        self.old = Post.objects.create(user=self.user, content='예전 좋아요', lat='37.5', lng='127.0')
+
+    def test_activity_counter(self):
+        """좋아요/댓글 생성, 취소시 구간 counter 증감"""
+        print('인기 게시물 구간 counter')
+        likes.like(self.user2.pk, self.recent.pk)
+        Comment.objects.create(user=self.user2, post=self.recent, content='테스트 댓글')
+        activity = PostActivity.objects.get(post=self.recent)
+        self.assertEqual((1, 1), (activity.like_count, activity.comment_count))
+
+        likes.unlike(self.user2.pk, self.recent.pk)
+        activity.refresh_from_db()
+        self.assertEqual(0, activity.like_count)
+
+    def test_trending_view(self):
+        """최근 활동일수록 점수가 높다 (비공개 게시물 제외)"""
+        print('인기 게시물 조회')
+        Like.objects.create(user=self.user2, post=self.recent)
+        past = timezone.now() - datetime.timedelta(hours=12)
+        for _ in range(3):
+            trending.record(self.old.pk, 'like_count', 1, past)
+        private = Post.objects.create(user=self.user, content='비공개', lat='37.5', lng='127.0', is_public=False)
+        Like.objects.create(user=self.user2, post=private)
+
+        response = self.client.get('/api/v1/post/trending/')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([self.recent.pk, self.old.pk], [post['id'] for post in response.data['results']])
+        self.assertEqual(1.0, response.data['results'][0]['score'])
+
+        # 다시 계산하기 전까지는 cache 된 순서를 그대로 쓴다.
+        Comment.objects.create(user=self.user2, post=self.old, content='테스트 댓글')
+        with self.assertNumQueries(1):  # 상위 게시물 조회
+            response = self.client.get('/api/v1/post/trending/?limit=1')
+        self.assertEqual([self.recent.pk], [post['id'] for post in response.data['results']])
+        call_command('refresh_trending', stdout=StringIO())
+        response = self.client.get('/api/v1/post/trending/?limit=1')
+        self.assertEqual([self.old.pk], [post['id'] for post in response.data['results']])
+
+
+class FeedTest(Test):
+    """home timeline"""
+
+    def setUp(self):
+        super().setUp()
+        Follow.objects.create(following=self.user, follower=self.user2)
+
+    def test_fan_out_on_write(self):
+        """게시물 생성시 팔로워 timeline에 들어감"""
+        print('게시물 생성시 팔로워 timeline에 들어감')
+        response = self.client.post(
+            '/api/v1/post/',
+            {'content': '팔로워에게 보이는 게시물', 'lat': '37.5', 'lng': '127.0'},
+            **self.auth_header(self.user)
+        )
+        self.assertEqual(201, response.status_code)
+        self.assertTrue(Feed.objects.filter(user=self.user2, post_id=response.data['id']).exists())
+
+        response = self.client.get('/api/v1/feed/', **self.auth_header(self.user2))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('팔로워에게 보이는 게시물', response.data['results'][0]['content'])
+
+    @override_settings(FEED_FAN_OUT_LIMIT=0)
+    def test_fan_out_on_read(self):
+        """팔로워가 많은 사용자의 게시물은 조회시 가져옴"""
+        print('팔로워가 많은 사용자의 게시물은 조회시 가져옴')
+        self.user.refresh_from_db()  # 팔로워 수 다시 읽기
+        post = Post.objects.create(user=self.user, content='인기 사용자 게시물', lat='37.5', lng='127.0')
+        fan_out_post(post)
+        self.assertFalse(Feed.objects.filter(user=self.user2, post=post).exists())
+
+        response = self.client.get('/api/v1/feed/', {'cursor': ''}, **self.auth_header(self.user2))
+        self.assertEqual([post.pk], [row['id'] for row in response.data['results']])
+
+    def test_unfollow_removes_posts(self):
+        """언팔로우시 timeline에서 빠짐"""
+        print('언팔로우시 timeline에서 빠짐')
+        post = Post.objects.create(user=self.user, content='테스트 게시물', lat='37.5', lng='127.0')
+        fan_out_post(post)
+        Follow.objects.filter(following=self.user, follower=self.user2).delete()
+        self.assertFalse(Feed.objects.filter(user=self.user2).exists())
+
+
+class PostSearchTest(Test):
+    """게시물 위치 검색 (geo_cell index)"""
+
+    def setUp(self):
+        super().setUp()
+        self.near = Post.objects.create(user=self.user, content='가까운 게시물', lat='37.500100', lng='127.000100')
+        self.far = Post.objects.create(user=self.user, content='먼 게시물', lat='37.520000', lng='127.000000')
+
+    def test_geo_cell_saved(self):
+        """저장시 geo_cell 계산"""
+        print('게시물 저장시 geo_cell 계산')
+        self.assertEqual(geo.encode(37.5001, 127.0001, 8), self.near.geo_cell)
+
+    def test_post_search_radius(self):
+        """radius 범위 검색"""
+        print('게시물 radius 범위 검색')
+        response = self.client.get('/api/v1/post/search/', {'lat': '37.5', 'lng': '127.0'})
+        self.assertEqual([self.near.pk], [post['id'] for post in response.data['results']])
+
+        response = self.client.get('/api/v1/post/search/', {'lat': '37.5', 'lng': '127.0', 'radius': '0.05'})
+        self.assertEqual({self.near.pk, self.far.pk}, {post['id'] for post in response.data['results']})
+
+        response = self.client.get('/api/v1/post/search/', {'lat': '37.5', 'lng': '127.0', 'radius': '10'})
+        self.assertEqual(400, response.status_code)
+
+    def test_post_search_invalid_point(self):
+        """nan/inf, 범위를 벗어난 좌표와 radius는 400"""
+        print('게시물 검색 잘못된 좌표')
+        for params in (
+            {'lat': 'nan', 'lng': '127.0'},
+            {'lat': 'inf', 'lng': '127.0'},
+            {'lat': '91', 'lng': '127.0'},
+            {'lat': '37.5', 'lng': '-180.5'},
+            {'lat': '37.5', 'lng': '127.0', 'radius': 'nan'},
+            {'lat': '37.5', 'lng': '127.0', 'radius': '-0.1'},
+        ):
+            response = self.client.get('/api/v1/post/search/', params)
+            self.assertEqual(400, response.status_code, params)
+            self.assertIn('002', response.data)
+
+    def test_post_nearby(self):
+        """가까운 게시물 순서 (범위를 넓혀서 찾기)"""
+        print('가까운 게시물 찾기')
+        Post.objects.create(user=self.user, content='비공개 게시물', lat='37.500000', lng='127.000000', is_public=False)
+        response = self.client.get('/api/v1/post/nearby/', {'lat': '37.5', 'lng': '127.0', 'limit': 2})
+        self.assertEqual([self.near.pk, self.far.pk], [post['id'] for post in response.data['results']])
+        self.assertLess(response.data['results'][0]['distance'], response.data['results'][1]['distance'])
+
+    def test_post_nearby_invalid_point(self):
+        """nan/inf, 범위를 벗어난 좌표는 400"""
+        print('가까운 게시물 잘못된 좌표')
+        for lat, lng in (('nan', '127.0'), ('37.5', 'inf'), ('-90.1', '127.0'), ('37.5', '181')):
+            response = self.client.get('/api/v1/post/nearby/', {'lat': lat, 'lng': lng})
+            self.assertEqual(400, response.status_code)
+            self.assertIn('002', response.data)
+
+    def test_post_nearby_skips_missing(self):
+        """거리 계산 후 삭제/비공개된 게시물은 빠진다"""
+        print('가까운 게시물 중간에 삭제')
+        nearest = Post.objects.filter(is_public=True).nearest(37.5, 127.0, 2)
+        Post.objects.filter(pk=self.near.pk).update(is_public=False)
+        with mock.patch.object(type(Post.objects.all()), 'nearest', return_value=nearest):
+            response = self.client.get('/api/v1/post/nearby/', {'lat': '37.5', 'lng': '127.0', 'limit': 2})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([self.far.pk], [post['id'] for post in response.data['results']])
+
+
+class PostTileTest(Test):
+    """지도 tile 칸별 게시물 수"""
+
+    def setUp(self):
+        super().setUp()
+        self.first = Post.objects.create(user=self.user, content='첫번째 게시물', lat='37.500000', lng='127.000000')
+        self.second = Post.objects.create(user=self.user, content='두번째 게시물', lat='37.500100', lng='127.000100')
+
+    def test_world_tile(self):
+        """zoom 0 tile 하나로 전체 게시물 수 확인"""
+        print('지도 zoom 0 tile')
+        response = self.client.get('/api/v1/post/tiles/0/0/0/')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, len(response.data['cells']))
+        self.assertEqual(2, response.data['cells'][0]['count'])
+        self.assertEqual(self.first.pk, response.data['cells'][0]['post_id'])
+
+    def test_tile_updated_on_change(self):
+        """게시물 비공개/삭제시 칸 갱신"""
+        print('게시물 변경시 지도 tile 갱신')
+        self.first.delete()
+        cell = tiles.tile_cells(0, 0, 0)[0]
+        self.assertEqual((1, self.second.pk), (cell['count'], cell['post_id']))
+
+        post = Post.objects.get(pk=self.second.pk)
+        post.is_public = False
+        post.save()
+        self.assertEqual(0, len(tiles.tile_cells(0, 0, 0)))
+
+    def test_representative_uses_index(self):
+        """대표 게시물 교체는 가장 작은 칸에서만 게시물을 geo_cell index로 찾는다 (lat/lng 전체 scan 없음)"""
+        print('지도 tile 대표 게시물 교체')
+        with CaptureQueriesContext(connection) as context:
+            self.first.delete()
+        post_queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "apps_post" ' in query['sql']
+        ]
+        self.assertEqual(1, len(post_queries))
+        self.assertIn('geo_cell', post_queries[0])
+        for level in range(*tiles.cell_levels()):
+            self.assertEqual(
+                {self.second.pk}, set(PostTileCell.objects.filter(level=level).values_list('post_id', flat=True))
+            )
+
+
+class DetailCacheTest(Test):
+    """상세 조회 cache"""
+
+    def setUp(self):
+        super().setUp()
+        self.post = Post.objects.create(user=self.user, content='테스트 게시물', lat='37.5', lng='127.0')
+
+    def test_post_view_cache(self):
+        """두번째 조회는 DB를 읽지 않고, 수정/좋아요/작성자 변경시 새로 만든다"""
+        print('게시물 상세 조회 cache')
+        url = f'/api/v1/post/{self.post.pk}/'
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        Like.objects.create(user=self.user2, post=self.post)
+        self.assertEqual(1, self.client.get(url).data['like_count'])
+
+        self.user.nickname = 'changed'
+        self.user.save()
+        self.assertEqual('changed', self.client.get(url).data['user']['nickname'])
+
+        self.post.delete()
+        self.assertEqual(404, self.client.get(url).status_code)
+
+
+class HotObjectTest(Test):
+    """요청이 몰리는 object 찾기 (Count-Min Sketch + Space-Saving)"""
+
+    def test_sketch_merge(self):
+        """추정 값은 실제보다 작지 않고, 나눠서 센 sketch를 합치면 상위 key가 같다"""
+        print('heavy hitter sketch')
+        stream = [f'post:{i % 7}' for i in range(300)] + ['post:hot'] * 500 + [f'post:{i}' for i in range(1000)]
+        whole = sketch.HeavyHitters(width=256, depth=4, size=10)
+        first, second = sketch.HeavyHitters(width=256, depth=4, size=10), sketch.HeavyHitters(width=256, depth=4, size=10)
+        for index, key in enumerate(stream):
+            whole.add(key)
+            (first if index % 2 else second).add(key)
+        first.merge(second)
+        self.assertEqual('post:hot', whole.top(1)[0][0])
+        self.assertEqual('post:hot', first.top(1)[0][0])
+        self.assertGreaterEqual(whole.estimate('post:3'), stream.count('post:3'))
+        self.assertEqual(whole.sketch.rows, first.sketch.rows)
+
+    def test_metrics_hot_objects(self):
+        """상세 조회가 많은 게시물이 metrics 상위에 나온다"""
+        print('hot object metrics')
+        self.addCleanup(setattr, detail_cache, '_hot_objects', None)
+        detail_cache._hot_objects = None
+        posts = [Post.objects.create(user=self.user, content='테스트 게시물', lat='37.5', lng='127.0') for _ in range(2)]
+        for _ in range(3):
+            self.client.get(f'/api/v1/post/{posts[1].pk}/')
+        self.client.put(f'/api/v1/post/favs/{posts[0].pk}/', **self.auth_header(self.user2))
+
+        self.assertEqual(403, self.client.get('/api/v1/metrics/', **self.auth_header(self.user2)).status_code)
+        self.user.is_admin = True
+        self.user.save()
+        response = self.client.get('/api/v1/metrics/', **self.auth_header(self.user))
+        self.assertEqual(
+            [{'key': f'apps.post:{posts[1].pk}', 'count': 3}, {'key': f'apps.post:{posts[0].pk}', 'count': 1}],
+            response.data['hot_objects'],
+        )
+
+
+class PostViewCountTest(Test):
+    """게시물 조회자 수 (HyperLogLog)"""
+
+    def test_hyperloglog(self):
+        """추정 오차, 합치기"""
+        print('HyperLogLog')
+        first, second = HyperLogLog(12), HyperLogLog(12)
+        for i in range(20000):
+            (first if i % 2 else second).add(f'user:{i}')
+            first.add(f'user:{i % 100}')
+        first.merge(second)
+        self.assertLess(abs(first.count() - 20000) / 20000, 0.05)
+        self.assertEqual(first.registers, HyperLogLog.from_bytes(first.to_bytes()).registers)
+
+    def test_view_count(self):
+        """같은 사용자는 한번만 세고 저장한 다음에 상세 조회에 반영된다"""
+        print('게시물 조회자 수')
+        post = Post.objects.create(user=self.user, content='테스트 게시물', lat='37.5', lng='127.0')
+        url = f'/api/v1/post/{post.pk}/'
+        for _ in range(3):
+            self.client.get(url, **self.auth_header(self.user2))
+        self.client.get(url, **self.auth_header(self.user))
+        self.assertEqual(0, self.client.get(url).data['view_count'])
+
+        self.assertEqual(1, viewers.flush())
+        post.refresh_from_db()
+        self.assertEqual(3, post.view_count)
+        # 다른 process에서 모은 기록을 합쳐도 같은 사용자는 다시 세지 않는다.
+        viewers.record(post.pk, f'user:{self.user2.pk}')
+        viewers.flush()
+        post.refresh_from_db()
+        self.assertEqual(3, post.view_count)
+        # 상세 조회 cache를 다시 만들지 않아도 저장된 다음 요청부터 반영된다.
+        with self.assertNumQueries(0):
+            self.assertEqual(3, self.client.get(url).data['view_count'])
+
+    def test_view_count_keeps_validators(self):
+        """조회자 수 저장은 updated_at, 상세 조회 cache를 바꾸지 않고 ETag에만 반영된다"""
+        print('게시물 조회자 수 저장과 조건부 GET')
+        post = Post.objects.create(user=self.user, content='테스트 게시물', lat='37.5', lng='127.0')
+        url = f'/api/v1/post/{post.pk}/'
+        etag = self.client.get(url)['ETag']
+        updated_at = Post.objects.get(pk=post.pk).updated_at
+        version = detail_cache.get_own_version(Post, post.pk)
+        viewers.flush()
+        post.refresh_from_db()
+        self.assertEqual((1, updated_at), (post.view_count, post.updated_at))
+        self.assertEqual(version, detail_cache.get_own_version(Post, post.pk))
+        with self.assertNumQueries(0):  # cache에 저장된 응답 + 저장할때 써둔 view_count
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, response.data['view_count'])
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(304, response.status_code)
+
+    def test_view_count_flush_after_response(self):
+        """없는 게시물은 기록하지 않고, 저장은 응답을 보낸 다음(request_finished)에 한다"""
+        print('게시물 조회자 수 저장 시점')
+        post = Post.objects.create(user=self.user, content='테스트 게시물', lat='37.5', lng='127.0')
+        self.assertEqual(404, self.client.get(f'/api/v1/post/{post.pk + 1}/').status_code)
+        self.assertEqual(0, viewers.flush())
+
+        with override_settings(POST_VIEW_FLUSH_INTERVAL=0):
+            with mock.patch.object(viewers, 'flush', wraps=viewers.flush) as flush:
+                response = self.client.get(f'/api/v1/post/{post.pk}/')
+                # test client는 응답을 닫을때 request_finished를 보낸다.
+                self.assertEqual(1, flush.call_count)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(0, response.data['view_count'])
+        post.refresh_from_db()
+        self.assertEqual(1, post.view_count)
+        viewers.record(post.pk, 'user:0')
+        self.assertEqual(0, viewers.flush_if_due())
+
+
+class ConditionalGetTest(Test):
+    """조건부 GET (ETag / Last-Modified / 304)"""
+
+    def setUp(self):
+        super().setUp()
+        self.post = Post.objects.create(user=self.user, content='테스트 게시물', lat='37.5', lng='127.0')
+
+    def test_post_list_not_modified(self):
+        """같은 page를 다시 요청하면 304, 좋아요가 추가되면 ETag가 바뀐다"""
+        print('게시물 리스트 조건부 GET')
+        response = self.client.get('/api/v1/post/')
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get('/api/v1/post/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b'', response.content)
+
+        Like.objects.create(user=self.user2, post=self.post)
+        response = self.client.get('/api/v1/post/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+
+    def test_post_detail_not_modified(self):
+        """상세 조회는 cache 여부와 상관없이 같은 ETag로 304 응답"""
+        print('게시물 상세 조회 조건부 GET')
+        url = f'/api/v1/post/{self.post.pk}/'
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):  # cache에 저장된 ETag 사용
+            self.assertEqual(304, self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code)
+
+        self.client.get(url)
+        self.assertEqual(304, self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code)
+
+        # cache가 비어 있으면 updated_at만 읽어서 확인한다.
+        from django.core.cache import cache
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(304, self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code)
+
+        self.user.nickname = 'changed'
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('changed', response.data['user']['nickname'])
+
+
+class ContentSearchTest(Test):
+    """게시물/댓글 내용 검색 (n-gram 역색인)"""
+
+    def setUp(self):
+        super().setUp()
+        self.posts = [
+            Post.objects.create(user=self.user, content=content, lat='37.5', lng='127.0')
+            for content in ('오늘 한강 산책', '한강에서 자전거, 한강 야경', '서울숲 산책', '한강 라면', 'Hello 한강!')
+        ]
+
+    def test_tokenize(self):
+        """2글자씩 겹치게 자르고 대소문자/전각 구분 없음"""
+        print('내용 검색 gram')
+        self.assertEqual({'한강': 1, '강에': 1, '에서': 1}, search.tokenize('한강에서 !'))
+        self.assertEqual(search.tokenize('Ｈｅｌｌｏ'), search.tokenize('hello'))
+
+    def test_search_pages(self):
+        """검색어 gram을 모두 가진 공개 게시물을 점수 순서로, cursor로 이어서 읽기"""
+        print('내용 검색 pagination')
+        self.posts[3].is_public = False
+        self.posts[3].save()
+        with self.assertNumQueries(3):  # 가중치 + 검색 + 게시물
+            response = self.client.get('/api/v1/search/', {'q': '한강', 'fields': 'id,content'})
+        self.assertEqual(200, response.status_code)
+        ids = [row['id'] for row in response.data['results']]
+        self.assertEqual(self.posts[1].pk, ids[0])
+        self.assertEqual({self.posts[0].pk, self.posts[1].pk, self.posts[4].pk}, set(ids))
+
+        response = self.client.get('/api/v1/search/', {'q': '한강 산책'})
+        self.assertEqual([self.posts[0].pk], [row['id'] for row in response.data['results']])
+        self.assertEqual(400, self.client.get('/api/v1/search/', {'q': '한'}).status_code)
+        self.assertEqual(400, self.client.get('/api/v1/search/', {'q': '한강', 'cursor': 'x'}).status_code)
+
+        # 점수가 같은 게시물이 많아도 cursor로 빠짐없이 이어서 읽는다.
+        for i in range(25):
+            Post.objects.create(user=self.user2, content=f'한강 {i}', lat='37.5', lng='127.0')
+        response = self.client.get('/api/v1/search/', {'q': '한강'})
+        ids = [row['id'] for row in response.data['results']]
+        response = self.client.get(response.data['next'])
+        ids += [row['id'] for row in response.data['results']]
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(28, len(set(ids)))
+
+    def test_incremental_index(self):
+        """게시물 수정/삭제, 댓글 저장시 역색인 갱신"""
+        print('내용 검색 역색인 갱신')
+        post = self.posts[2]
+        post.content = '서울숲 자전거'
+        post.save()
+        self.assertFalse(SearchGram.objects.filter(object_id=post.pk, kind=SearchGram.POST, gram='산책').exists())
+        comment = Comment.objects.create(user=self.user2, post=post, content='자전거 타기 좋아요')
+        response = self.client.get('/api/v1/search/', {'q': '자전거', 'type': 'comment'})
+        self.assertEqual([comment.pk], [row['id'] for row in response.data['results']])
+
+        post.delete()
+        self.assertFalse(SearchGram.objects.filter(kind=SearchGram.POST, object_id=post.pk).exists())
+        self.assertFalse(SearchGram.objects.filter(kind=SearchGram.COMMENT, object_id=comment.pk).exists())
+        self.assertEqual(5 - 1, search.get_backend().rebuild('post'))
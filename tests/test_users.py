@@ -1,6 +1,13 @@
+import csv
+import json
+from django.db import connection
+from django.utils import timezone
 from django.contrib.auth import authenticate
+from config import authentication
 from users.serializers import UserSerializer
-from users.models import User
+from users import autocomplete, graph, suggestions
+from users.models import User, Follow, FollowSuggestion
+from apps.models import Post, Comment, Like
 from .tests import Test
 
 
@@ -76,6 +83,17 @@ class UsersTest(Test):
         else:
             print('가입 실패')
 
+    def test_update_keeps_follow_counters(self):
+        """회원정보 수정은 읽은 다음에 바뀐 팔로우 수를 덮어쓰지 않는다"""
+        print('회원정보 수정 팔로우 수 유지')
+        user = User.objects.get(pk=self.user.pk)
+        Follow.objects.create(follower=self.user2, following=self.user)
+        serializer = UserSerializer(user, data={'introduce': '수정한 소개'}, partial=True)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        self.user.refresh_from_db()
+        self.assertEqual(('수정한 소개', 1), (self.user.introduce, self.user.followers_count))
+
     def test_withdrawal(self):
         """회원탈퇴 성공"""
         print('회원탈퇴 성공')
@@ -129,3 +147,274 @@ class UsersTest(Test):
         print('사용자 계정 비활성화 일때')
         self.request.user.is_active = False
         self.assertEqual(False, self.request.user.is_active)
+
+    def test_user_search_query_count(self):
+        """사용자 검색 쿼리 수"""
+        print('사용자 검색 쿼리 수')
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/users/search/', {'nickname': 'test'})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, len(response.data['results']))
+
+    def test_user_search_is_following(self):
+        """로그인 했으면 팔로우 여부를 page 쿼리에 같이 읽는다"""
+        print('사용자 검색 팔로우 여부')
+        Follow.objects.create(following=self.user2, follower=self.user)
+        header = self.auth_header(self.user)
+        self.client.get('/api/v1/users/me/', **header)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/users/search/', {'nickname': 'test'}, **header)
+        rows = {row['id']: row['is_following'] for row in response.data['results']}
+        self.assertEqual({self.user.pk: False, self.user2.pk: True}, rows)
+
+        response = self.client.get('/api/v1/users/search/', {'nickname': 'test'})
+        self.assertEqual([False, False], [row['is_following'] for row in response.data['results']])
+
+    def test_follow_counter(self):
+        """팔로우 수 counter 증감"""
+        print('팔로우 수 counter 증감')
+        follow = Follow.objects.create(following=self.user, follower=self.user2)
+        self.user.refresh_from_db()
+        self.user2.refresh_from_db()
+        self.assertEqual(1, self.user.following_count())
+        self.assertEqual(1, self.user2.followings_count)
+
+        follow.delete()
+        self.user.refresh_from_db()
+        self.assertEqual(0, self.user.following_count())
+
+    def test_jwt_user_cache(self):
+        """JWT 인증시 사용자 정보 cache (비활성화하면 바로 반영)"""
+        print('JWT 인증 사용자 cache')
+        header = self.auth_header(self.user)
+        self.client.get('/api/v1/users/me/', **header)
+        with self.assertNumQueries(1):  # 최근 팔로워 미리보기 조회만 실행된다.
+            response = self.client.get('/api/v1/users/me/', **header)
+        self.assertEqual(self.user.email, response.data['email'])
+        # password hash는 process 안의 cache에 남기지 않는다.
+        self.assertNotIn(self.user.password, authentication.user_cache.get(self.user.pk))
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get('/api/v1/users/me/', **header)
+        self.assertEqual(403, response.status_code)
+
+
+class FollowSuggestionTest(Test):
+    """팔로우 추천 (친구의 친구)"""
+
+    def setUp(self):
+        super().setUp()
+        self.others = [User.objects.create(email=f'friend{i}@test.com', nickname=f'friend{i}') for i in range(3)]
+
+    def suggestion_rows(self, user):
+        return list(FollowSuggestion.objects.filter(user=user).order_by('-mutual_count', 'candidate_id').values_list(
+            'candidate_id', 'mutual_count'
+        ))
+
+    def test_incremental_matches_rebuild(self):
+        """팔로우/취소할때 증감한 값과 다시 계산한 값이 같다"""
+        print('팔로우 추천 증감')
+        a, b, c = self.others
+        for follower, following in ((a, c), (b, c), (b, self.user2), (self.user2, self.user), (self.user, a)):
+            Follow.objects.create(follower=follower, following=following)
+        self.client.post('/api/v1/users/follow/', {'following_id': b.pk}, **self.auth_header(self.user))
+        self.assertEqual([(c.pk, 2), (self.user2.pk, 1)], self.suggestion_rows(self.user))
+        # 나를 팔로우 하는 사용자에게는 내가 팔로우 한 사용자가 추천된다.
+        self.assertEqual([(a.pk, 1), (b.pk, 1)], self.suggestion_rows(self.user2))
+
+        users = [self.user, self.user2, *self.others]
+        incremental = {user.pk: self.suggestion_rows(user) for user in users}
+        suggestions.rebuild()
+        self.assertEqual(incremental, {user.pk: self.suggestion_rows(user) for user in users})
+
+        self.client.post('/api/v1/users/follow/', {'following_id': b.pk}, **self.auth_header(self.user))
+        self.assertEqual([(c.pk, 1)], self.suggestion_rows(self.user))
+
+    def test_incremental_trim(self):
+        """증가한 다음에는 사용자별 상위 FOLLOW_SUGGESTION_SIZE 명만 남는다"""
+        print('팔로우 추천 크기 제한')
+        a, b, c = self.others
+        for follower, following in ((self.user2, b), (self.user2, c), (c, b), (a, self.user), (a, c)):
+            Follow.objects.create(follower=follower, following=following)
+        users = [self.user, self.user2, *self.others]
+        with self.settings(FOLLOW_SUGGESTION_SIZE=1):
+            suggestions.rebuild()
+            self.client.post('/api/v1/users/follow/', {'following_id': self.user2.pk}, **self.auth_header(self.user))
+            self.assertEqual([(b.pk, 1)], self.suggestion_rows(self.user))
+            self.assertEqual([(self.user2.pk, 1)], self.suggestion_rows(a))
+            incremental = {user.pk: self.suggestion_rows(user) for user in users}
+            suggestions.rebuild()
+            self.assertEqual(incremental, {user.pk: self.suggestion_rows(user) for user in users})
+
+        # 팔로우 한 사용자가 팔로우 하는 사용자가 FAN_OUT_LIMIT 명이 넘으면 본인 후보는 다시 계산한다.
+        d = User.objects.create(email='friend3@test.com', nickname='friend3')
+        with self.settings(FOLLOW_SUGGESTION_FAN_OUT_LIMIT=1):
+            Follow.objects.create(follower=d, following=self.user2)
+        self.assertEqual([(b.pk, 1), (c.pk, 1)], self.suggestion_rows(d))
+
+    def test_suggestion_view(self):
+        """저장된 후보를 겹치는 수 순서로 보여준다"""
+        print('팔로우 추천 조회')
+        a, b, c = self.others
+        for follower, following in ((self.user, a), (self.user, b), (a, c), (b, c), (a, self.user2)):
+            Follow.objects.create(follower=follower, following=following)
+        self.assertEqual(403, self.client.get('/api/v1/users/suggestions/').status_code)
+        response = self.client.get(
+            '/api/v1/users/suggestions/', {'fields': 'id,mutual_count'}, **self.auth_header(self.user)
+        )
+        self.assertEqual(
+            [{'id': c.pk, 'mutual_count': 2}, {'id': self.user2.pk, 'mutual_count': 1}], response.data['results']
+        )
+
+
+class ExportTest(Test):
+    """내 데이터 내보내기 (NDJSON / CSV streaming)"""
+
+    def setUp(self):
+        super().setUp()
+        self.post = Post.objects.create(user=self.user, content='내 게시물', lat='37.5', lng='127.0')
+        Post.objects.create(user=self.user2, content='다른 사용자 게시물', lat='37.5', lng='127.0')
+        Comment.objects.create(user=self.user, post=self.post, content='내 댓글')
+        Like.objects.create(user=self.user, post=self.post)
+
+    def test_export_ndjson(self):
+        """본인의 게시물, 댓글, 좋아요만 한줄씩 내려준다"""
+        print('NDJSON 내보내기')
+        response = self.client.get('/api/v1/users/me/export/', **self.auth_header(self.user))
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.streaming)
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(['post', 'comment', 'like'], [line['type'] for line in lines])
+        self.assertEqual('37.500000', lines[0]['lat'])
+
+    def test_export_since_and_csv(self):
+        """since 이후에 바뀐 데이터만, CSV 형식"""
+        print('CSV, since 내보내기')
+        since = timezone.now().isoformat()
+        self.post.content = '수정한 게시물'
+        self.post.save()
+        response = self.client.get(
+            '/api/v1/users/me/export/', {'output': 'csv', 'since': since}, **self.auth_header(self.user)
+        )
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual('type', rows[0][0])
+        self.assertEqual([['post', str(self.post.pk)]], [row[:2] for row in rows[1:]])
+
+        response = self.client.get('/api/v1/users/me/export/', {'since': 'yesterday'}, **self.auth_header(self.user))
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(403, self.client.get('/api/v1/users/me/export/').status_code)
+
+
+class FollowListTest(Test):
+    """팔로워/팔로잉 리스트 (cursor 방식)"""
+
+    def setUp(self):
+        super().setUp()
+        self.fans = [User.objects.create(email=f'fan{i}@test.com', nickname=f'fan{i}') for i in range(25)]
+        for fan in self.fans:
+            Follow.objects.create(follower=fan, following=self.user)
+
+    def test_follower_pages(self):
+        """최근 팔로우 순서로 page를 나눠서 읽고 page당 쿼리는 2번이다"""
+        print('팔로워 리스트 cursor pagination')
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/v1/users/{self.user.pk}/followers/')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('fan24', response.data['results'][0]['nickname'])
+        self.assertEqual(20, len(response.data['results']))
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(['fan4', 'fan3', 'fan2', 'fan1', 'fan0'], [row['nickname'] for row in response.data['results']])
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(f'/api/v1/users/{self.fans[0].pk}/followings/')
+        self.assertEqual([self.user.pk], [row['id'] for row in response.data['results']])
+        self.assertEqual(400, self.client.get(f'/api/v1/users/{self.user.pk}/followers/', {'cursor': 'x'}).status_code)
+        self.assertEqual(404, self.client.get('/api/v1/users/0/followers/').status_code)
+
+    def test_detail_preview(self):
+        """회원 정보에는 전체 팔로워 대신 수와 최근 미리보기만 들어간다"""
+        print('회원 정보 팔로워 미리보기')
+        response = self.client.get(f'/api/v1/users/{self.user.pk}/')
+        self.assertEqual(25, response.data['following_count'])
+        self.assertEqual(['fan24', 'fan23'], response.data['follower_users'][:2])
+        self.assertEqual(10, len(response.data['follower_users']))
+
+
+class FollowGraphTest(Test):
+    """팔로우 관계 in-memory index"""
+
+    def test_sorted_arrays(self):
+        """정렬된 배열로 팔로우 확인, 공통 팔로잉 계산"""
+        print('팔로우 관계 index')
+        follow_graph = graph.FollowGraph()
+        for follower_id, following_id in [(1, 5), (1, 3), (2, 3), (2, 5), (2, 4), (5, 1), (1, 3)]:
+            follow_graph.add(follower_id, following_id)
+        self.assertEqual([3, 5], list(follow_graph.followings[1]))
+        self.assertTrue(follow_graph.follows(2, 4))
+        self.assertEqual({3: True, 4: False}, follow_graph.follows_many(1, [3, 4]))
+        self.assertEqual([3, 5], follow_graph.mutual_followings(1, 2))
+        self.assertTrue(follow_graph.is_mutual(1, 5))
+
+        follow_graph.remove(1, 5)
+        self.assertFalse(follow_graph.is_mutual(1, 5))
+        follow_graph.add(1, 2 ** 40)
+        self.assertEqual('q', follow_graph.typecode)
+
+    def test_follow_toggle(self):
+        """팔로우 확인은 index로 하고 다른 process의 변경은 cache 기록으로 반영한다"""
+        print('팔로우 관계 index 동기화')
+        header = self.auth_header(self.user)
+        response = self.client.post('/api/v1/users/follow/', {'following_id': self.user2.pk}, **header)
+        self.assertEqual(201, response.status_code)
+        self.assertTrue(graph.get_graph().follows(self.user.pk, self.user2.pk))
+
+        # 다른 process의 index는 다음에 사용할때 변경 기록을 가져온다.
+        other = graph.load()
+        Follow.objects.create(follower=self.user2, following=self.user)
+        self.assertTrue(graph.sync(other).is_mutual(self.user.pk, self.user2.pk))
+
+        # index가 늦게 반영되었어도 unique 제약으로 팔로우 취소가 된다.
+        graph.get_graph().remove(self.user.pk, self.user2.pk)
+        response = self.client.post('/api/v1/users/follow/', {'following_id': self.user2.pk}, **header)
+        self.assertEqual(200, response.status_code)
+        self.assertFalse(Follow.objects.filter(follower=self.user, following=self.user2).exists())
+
+        response = self.client.get(f'/api/v1/users/{self.user.pk}/followers/', **header)
+        self.assertEqual([False], [row['is_following'] for row in response.data['results']])
+
+
+class NicknameAutocompleteTest(Test):
+    """닉네임 자동완성 (정규화한 닉네임 index 범위 조회)"""
+
+    def setUp(self):
+        super().setUp()
+        for nickname in ('Alice', 'ａｌｂｅｒｔ', 'alpha', 'bob', '홍길동', '홍길순'):
+            User.objects.create(email=f'{nickname}@test.com', nickname=nickname)
+
+    def test_prefix(self):
+        """대소문자, 전각/반각 구분 없이 앞부분이 같은 닉네임을 닉네임 순서로"""
+        print('닉네임 자동완성')
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/users/autocomplete/', {'q': 'AL', 'limit': 2})
+        self.assertEqual(['ａｌｂｅｒｔ', 'Alice'], [row['nickname'] for row in response.data['results']])
+        self.assertEqual({'id', 'nickname', 'profile_image'}, set(response.data['results'][0]))
+        self.assertIn('max-age', response['Cache-Control'])
+        self.assertEqual(2, len(autocomplete.search('홍길', 10)))
+        self.assertEqual(400, self.client.get('/api/v1/users/autocomplete/').status_code)
+
+        user = User.objects.get(nickname='bob')
+        user.nickname = 'Alan'
+        user.save(update_fields=['nickname'])
+        self.assertEqual('alan', autocomplete.search('al', 1)[0]['nickname'].lower())
+
+    def test_index_range(self):
+        """LIKE '%...%' 대신 (nickname_key, id) index 범위 조회"""
+        print('닉네임 자동완성 index')
+        users = User.objects.filter(nickname_key__gte='al', nickname_key__lt='am').order_by('nickname_key', 'id')
+        sql, params = users.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('user_nickname_key_idx', plan)
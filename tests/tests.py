@@ -1,6 +1,10 @@
+import jwt
+from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase
 from django.http.request import HttpRequest
 from users.models import User
+from apps import viewers
 
 
 class Test(TestCase):
@@ -8,6 +12,8 @@ class Test(TestCase):
 
     def setUp(self) -> None:
         """테스트 환경을 위한 DB 세팅"""
+        cache.clear()
+        viewers.clear()
         self.user = User(
             fullname='테스트',
             nickname='test_user',
@@ -39,3 +45,9 @@ class Test(TestCase):
 
         self.request2 = HttpRequest()
         self.request.user2 = self.user2
+
+    @staticmethod
+    def auth_header(user):
+        """JWT 인증 header 만들기 (self.client.get(url, **self.auth_header(user)))"""
+        token = jwt.encode({'pk': user.pk}, settings.SECRET_KEY, algorithm='HS256')
+        return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
@@ -0,0 +1,42 @@
+"""
+닉네임 자동완성 (/api/v1/users/autocomplete/)
+
+user_search의 nickname__contains(LIKE '%...%')는 index를 쓰지 못해서 입력할때마다 사용자 table 전체를 읽는다.
+자동완성은 앞부분이 같은 닉네임만 찾기 때문에 정규화한 닉네임(User.nickname_key)의 B-tree index 범위 조회로 바꾼다.
+
+    nickname_key >= 'ab' AND nickname_key < 'ac' ORDER BY nickname_key, id LIMIT k
+
+(nickname_key, id) index 순서대로 k개만 읽고 멈추기 때문에 사용자 수와 상관없이 빠르다.
+입력 중인 마지막 한글 글자(ex. '홍기' -> '홍길')는 완성된 글자가 아니라서 찾지 못한다.
+"""
+from django.core.files.storage import default_storage
+from .models import User, normalize_nickname
+
+
+def next_prefix(prefix):
+    """prefix로 시작하는 모든 문자열보다 큰 가장 작은 문자열 (마지막 글자 + 1)"""
+    while prefix and ord(prefix[-1]) == 0x10FFFF:
+        prefix = prefix[:-1]
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def search(prefix, limit):
+    """닉네임이 prefix로 시작하는 사용자 [{'id', 'nickname', 'profile_image'}, ...] (닉네임 순서, 쿼리 1번)"""
+    key = normalize_nickname(prefix)
+    if not key:
+        return []
+    users = User.objects.filter(is_active=True, nickname_key__gte=key)
+    upper = next_prefix(key)
+    if upper is not None:
+        users = users.filter(nickname_key__lt=upper)
+    rows = users.order_by('nickname_key', 'id').values('id', 'nickname', 'profile_image')[:limit]
+    return [
+        {
+            'id': row['id'],
+            'nickname': row['nickname'],
+            'profile_image': default_storage.url(row['profile_image']) if row['profile_image'] else None,
+        }
+        for row in rows
+    ]
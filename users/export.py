@@ -0,0 +1,70 @@
+"""
+내 데이터 내보내기 (게시물, 댓글, 좋아요)
+
+row를 한번에 메모리에 올리지 않고 .iterator(chunk_size)로 읽으면서 한줄씩 만들어서 streaming 한다.
+(게시물이 수십만개인 사용자도 메모리 사용량이 일정하다.)
+
+- ndjson: 한줄에 JSON object 하나 ({"type": "post", "id": 1, ...})
+- csv: 모든 type이 같은 column(EXPORT_COLUMNS)을 사용하고 해당 없는 값은 비워둔다.
+"""
+import csv
+from django.conf import settings
+from apps.models import Post, Comment, Like
+from core.renderers import json_dumps, default
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+EXPORT_COLUMNS = ('type', 'id', 'post_id', 'content', 'lat', 'lng', 'is_public', 'created_at', 'updated_at')
+
+# (type, model, 읽을 column, since를 비교할 column)
+EXPORT_SOURCES = (
+    ('post', Post, ('id', 'content', 'lat', 'lng', 'is_public', 'created_at', 'updated_at'), 'updated_at'),
+    ('comment', Comment, ('id', 'post_id', 'content', 'created_at', 'updated_at'), 'updated_at'),
+    ('like', Like, ('id', 'post_id', 'created_at'), 'created_at'),
+)
+
+
+def export_rows(user, since=None):
+    """내보낼 row를 type 순서(게시물 -> 댓글 -> 좋아요), id 순서로 하나씩 반환한다."""
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    for row_type, model, fields, since_field in EXPORT_SOURCES:
+        queryset = model.objects.filter(user=user)
+        if since is not None:
+            queryset = queryset.filter(**{f'{since_field}__gt': since})
+        # model instance를 만들지 않고 값만 읽는다.
+        for row in queryset.order_by('id').values(*fields).iterator(chunk_size=chunk_size):
+            row['type'] = row_type
+            for name in ('lat', 'lng'):
+                if name in row:
+                    # 좌표는 소수점 자리가 바뀌지 않도록 문자열로 내보낸다.
+                    row[name] = str(row[name])
+            yield row
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json_dumps({'type': row.pop('type'), **row}) + b'\n'
+
+
+class Echo:
+    """csv.writer가 쓴 값을 그대로 반환하는 file 대신 사용하는 객체 (StreamingHttpResponse용)"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow([
+            # 날짜는 JSON과 같은 형식으로 쓴다.
+            default(value) if hasattr(value, 'isoformat') else value
+            for value in (row.get(column, '') for column in EXPORT_COLUMNS)
+        ])
+
+
+def export_lines(user, export_format, since=None):
+    rows = export_rows(user, since)
+    if export_format == 'csv':
+        return csv_lines(rows)
+    return ndjson_lines(rows)
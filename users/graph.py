@@ -0,0 +1,233 @@
+"""
+팔로우 관계 in-memory index (settings.FOLLOW_GRAPH_ENABLED)
+
+"A가 B를 팔로우 하는지", 공통으로 팔로우 하는 사용자 같은 관계 확인을 DB 대신 process 안의 index로 한다.
+- 사용자별로 정렬된 사용자 id 배열(array)을 followings(내가 팔로우 한), followers(나를 팔로우 한) 두 방향으로 가진다.
+  확인은 이분 탐색(O(log n)), 공통 사용자는 정렬된 배열 교집합이다.
+- id가 모두 int32 범위면 4 bytes 배열을 사용한다. (edge 1개당 양방향 8 bytes + 사용자별 배열/dict overhead)
+  ./manage.py bench_follow_graph 로 크기와 속도를 확인할 수 있다.
+- 처음 사용할때 DB에서 읽고(process마다 1번), 그 다음부터는 Follow signal로 바뀐 관계만 반영한다.
+  다른 process의 변경은 cache에 순서 번호(follow_graph:seq)와 함께 남기고, 사용할때 밀린 변경을 순서대로 가져온다.
+  변경 기록이 만료되었거나 너무 많이 밀렸으면 DB에서 다시 읽는다.
+  그래서 여러 process로 실행할때는 같이 사용하는 cache backend(memcached, redis 등)가 필요하다. (config.settings.prod에서 확인)
+
+signal은 transaction이 rollback 되어도 취소되지 않기 때문에 index가 DB와 잠깐 다를 수 있다.
+쓰기(팔로우/취소)는 DB의 unique 제약으로 다시 확인한다. (users.views.follows_view)
+"""
+import bisect
+import sys
+import threading
+from array import array
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from .models import User, Follow
+
+SEQUENCE_KEY = 'follow_graph:seq'
+CHANGE_KEY = 'follow_graph:change:{}'
+INT32_MAX = 2 ** 31 - 1
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def contains(values, value):
+    """정렬된 배열에 value가 있는지 (이분 탐색)"""
+    index = bisect.bisect_left(values, value)
+    return index < len(values) and values[index] == value
+
+
+def intersect(left, right):
+    """정렬된 두 배열의 공통 값 (짧은 배열의 값을 긴 배열에서 이어서 이분 탐색)"""
+    if len(left) > len(right):
+        left, right = right, left
+    result = []
+    start = 0
+    for value in left:
+        start = bisect.bisect_left(right, value, start)
+        if start == len(right):
+            break
+        if right[start] == value:
+            result.append(value)
+    return result
+
+
+def group(pairs, typecode):
+    """(key, value) 순서로 정렬된 pair -> {key: 정렬된 value 배열}"""
+    rows = {}
+    current_key, values = None, None
+    for key, value in pairs:
+        if key != current_key:
+            current_key, values = key, rows.setdefault(key, array(typecode))
+        if not values or values[-1] != value:
+            values.append(value)
+    return compact(rows, typecode)
+
+
+def compact(rows, typecode):
+    """append 하면서 늘어난 여유 공간 없이 다시 만들기 (배열 1개당 header가 80 bytes 정도라 사용자가 많으면 차이가 크다.)"""
+    for key, values in rows.items():
+        rows[key] = array(typecode, values)
+    return rows
+
+
+class FollowGraph(object):
+    """
+    followings: {follower_id: 정렬된 following_id 배열}, followers: {following_id: 정렬된 follower_id 배열}
+    변경은 lock 안에서 한다. 읽기는 lock 없이 한다. (array의 insert/pop, bisect는 GIL 안에서 한번에 실행된다.)
+    """
+    def __init__(self, typecode='i', sequence=0):
+        self.typecode = typecode
+        self.sequence = sequence
+        self.followings = {}
+        self.followers = {}
+        self._lock = threading.Lock()
+
+    def add(self, follower_id, following_id):
+        with self._lock:
+            if self.typecode == 'i' and max(follower_id, following_id) > INT32_MAX:
+                self.widen()
+            self.insert(self.followings, follower_id, following_id)
+            self.insert(self.followers, following_id, follower_id)
+
+    def remove(self, follower_id, following_id):
+        with self._lock:
+            self.delete(self.followings, follower_id, following_id)
+            self.delete(self.followers, following_id, follower_id)
+
+    def insert(self, rows, key, value):
+        values = rows.get(key)
+        if values is None:
+            values = rows[key] = array(self.typecode)
+        index = bisect.bisect_left(values, value)
+        if index == len(values) or values[index] != value:
+            values.insert(index, value)
+
+    @staticmethod
+    def delete(rows, key, value):
+        values = rows.get(key)
+        if values is None:
+            return
+        index = bisect.bisect_left(values, value)
+        if index < len(values) and values[index] == value:
+            values.pop(index)
+        if not values:
+            del rows[key]
+
+    def widen(self):
+        """int32 범위를 넘는 id가 들어오면 8 bytes 배열로 바꾼다."""
+        self.typecode = 'q'
+        for rows in (self.followings, self.followers):
+            for key, values in rows.items():
+                rows[key] = array('q', values)
+
+    def follows(self, follower_id, following_id):
+        return contains(self.followings.get(follower_id, ()), following_id)
+
+    def follows_many(self, viewer_id, user_ids):
+        """viewer가 user_ids를 각각 팔로우 하는지 {user_id: bool} (목록의 is_following 표시용)"""
+        followings = self.followings.get(viewer_id, ())
+        return {user_id: contains(followings, user_id) for user_id in user_ids}
+
+    def is_mutual(self, user_id, other_id):
+        """서로 팔로우 하는지 (맞팔로우)"""
+        return self.follows(user_id, other_id) and self.follows(other_id, user_id)
+
+    def mutual_followings(self, user_id, other_id):
+        """두 사용자가 모두 팔로우 하는 사용자 id (정렬)"""
+        return intersect(self.followings.get(user_id, ()), self.followings.get(other_id, ()))
+
+    def edge_count(self):
+        return sum(len(values) for values in self.followings.values())
+
+    def nbytes(self):
+        """index가 사용하는 메모리 (dict + 배열, key int object는 제외)"""
+        total = sys.getsizeof(self.followings) + sys.getsizeof(self.followers)
+        for rows in (self.followings, self.followers):
+            total += sum(sys.getsizeof(values) for values in rows.values())
+        return total
+
+
+def load():
+    """DB의 팔로우 관계로 index 만들기 (읽기 전의 변경 순서 번호부터 다시 가져온다.)"""
+    cache.add(SEQUENCE_KEY, 0, None)
+    sequence = cache.get(SEQUENCE_KEY, 0)
+    max_id = User.objects.aggregate(max_id=Max('pk'))['max_id'] or 0
+    graph = FollowGraph('i' if max_id <= INT32_MAX else 'q', sequence)
+    size = settings.FOLLOW_GRAPH_LOAD_CHUNK_SIZE
+    graph.followings = group(
+        Follow.objects.order_by('follower_id', 'following_id').values_list(
+            'follower_id', 'following_id'
+        ).iterator(chunk_size=size),
+        graph.typecode,
+    )
+    # (following, follower) unique index 순서
+    graph.followers = group(
+        Follow.objects.order_by('following_id', 'follower_id').values_list(
+            'following_id', 'follower_id'
+        ).iterator(chunk_size=size),
+        graph.typecode,
+    )
+    return graph
+
+
+def sync(graph):
+    """
+    다른 process의 변경을 순서대로 반영 -> 반영한 index (기록이 없으면 DB에서 다시 읽은 index)
+    순서대로 다시 반영하면 같은 (follower, following)은 마지막 변경이 남기 때문에 이미 반영한 변경이 섞여 있어도 된다.
+    """
+    sequence = cache.get(SEQUENCE_KEY)
+    if sequence is None or sequence < graph.sequence:
+        # cache가 비워졌다.
+        return load()
+    if sequence == graph.sequence:
+        return graph
+    if sequence - graph.sequence > settings.FOLLOW_GRAPH_MAX_REPLAY:
+        return load()
+    keys = [CHANGE_KEY.format(number) for number in range(graph.sequence + 1, sequence + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) != len(keys):
+        return load()
+    for key in keys:
+        follower_id, following_id, followed = changes[key]
+        (graph.add if followed else graph.remove)(follower_id, following_id)
+    graph.sequence = sequence
+    return graph
+
+
+def get_graph():
+    """process에서 같이 사용하는 index (처음 사용할때 DB에서 읽는다.)"""
+    global _graph
+    with _graph_lock:
+        _graph = load() if _graph is None else sync(_graph)
+        return _graph
+
+
+def publish(follower_id, following_id, followed):
+    """
+    팔로우/취소 기록 (Follow signal)
+    현재 process의 index에는 바로 반영하고, 다른 process는 다음에 사용할때 cache에서 가져간다.
+    """
+    cache.add(SEQUENCE_KEY, 0, None)
+    sequence = cache.incr(SEQUENCE_KEY)
+    cache.set(CHANGE_KEY.format(sequence), (follower_id, following_id, followed), settings.FOLLOW_GRAPH_CHANGE_TIMEOUT)
+    graph = _graph
+    if graph is not None:
+        (graph.add if followed else graph.remove)(follower_id, following_id)
+
+
+def follows(follower_id, following_id):
+    """follower가 following을 팔로우 하는지 (FOLLOW_GRAPH_ENABLED가 False면 DB 조회)"""
+    if not settings.FOLLOW_GRAPH_ENABLED:
+        return Follow.objects.filter(follower_id=follower_id, following_id=following_id).exists()
+    return get_graph().follows(follower_id, following_id)
+
+
+def follows_many(viewer_id, user_ids):
+    """viewer가 user_ids를 각각 팔로우 하는지 {user_id: bool} (FOLLOW_GRAPH_ENABLED가 False면 IN 쿼리 1번)"""
+    if not settings.FOLLOW_GRAPH_ENABLED:
+        followings = set(Follow.objects.filter(follower_id=viewer_id, following_id__in=list(user_ids)).values_list(
+            'following_id', flat=True
+        ))
+        return {user_id: user_id in followings for user_id in user_ids}
+    return get_graph().follows_many(viewer_id, user_ids)
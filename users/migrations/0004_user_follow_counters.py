@@ -0,0 +1,36 @@
+# Generated by Django 3.2.4 on 2026-10-18 07:45
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_follow_counters(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Follow = apps.get_model('users', 'Follow')
+    for field, relation in (('followers_count', 'following'), ('followings_count', 'follower')):
+        rows = Follow.objects.filter(**{relation: OuterRef('pk')}).order_by().values(relation)
+        User.objects.update(**{
+            field: Coalesce(Subquery(rows.annotate(count=Count('pk')).values('count')), 0)
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_alter_user_introduce'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='followings_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_follow_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2.4 on 2026-10-18 08:28
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_follows(apps, schema_editor):
+    """unique 제약을 추가하기 전에 중복 팔로우는 처음 것만 남기고 삭제하고 해당 사용자의 팔로우 수를 다시 센다."""
+    Follow = apps.get_model('users', 'Follow')
+    User = apps.get_model('users', 'User')
+    duplicates = (
+        Follow.objects.order_by().values('following_id', 'follower_id')
+        .annotate(first_id=Min('id'), count=Count('id')).filter(count__gt=1)
+    )
+    user_ids = set()
+    for row in list(duplicates):
+        Follow.objects.filter(
+            following_id=row['following_id'], follower_id=row['follower_id']
+        ).exclude(id=row['first_id']).delete()
+        user_ids.update((row['following_id'], row['follower_id']))
+    for user_id in user_ids:
+        User.objects.filter(pk=user_id).update(
+            followers_count=Follow.objects.filter(following_id=user_id).count(),
+            followings_count=Follow.objects.filter(follower_id=user_id).count(),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_follow_created_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_follows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('following', 'follower'), name='follow_following_follower_unique'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 3.2.4 on 2026-10-18 08:32
+
+import unicodedata
+from django.db import migrations, models
+
+
+def normalize_nickname(value):
+    """
+    migration을 만들때의 users.models.normalize_nickname (나중에 바뀌어도 이 migration의 결과는 바뀌지 않게 복사해둔다.)
+    """
+    return unicodedata.normalize('NFKC', value or '').casefold().strip()[:100]
+
+
+def use_binary_collation(apps, schema_editor):
+    """
+    prefix 범위 조회(nickname_key >= 'ab' AND < 'ac')가 문자 코드 순서여야 index 범위 하나로 찾을 수 있다.
+    SQLite는 기본(BINARY)이 문자 코드 순서이고, PostgreSQL은 컬럼 collation을 "C"로 바꾼다.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE users_user ALTER COLUMN nickname_key TYPE varchar(100) COLLATE "C"')
+
+
+def fill_nickname_key(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    users = []
+    for user in User.objects.only('id', 'nickname').iterator(chunk_size=2000):
+        user.nickname_key = normalize_nickname(user.nickname)
+        users.append(user)
+        if len(users) >= 2000:
+            User.objects.bulk_update(users, ['nickname_key'])
+            users = []
+    User.objects.bulk_update(users, ['nickname_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_follow_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='nickname_key',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.RunPython(use_binary_collation, migrations.RunPython.noop),
+        migrations.RunPython(fill_nickname_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['nickname_key', 'id'], name='user_nickname_key_idx'),
+        ),
+    ]
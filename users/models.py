@@ -1,4 +1,5 @@
 import os
+import unicodedata
 from uuid import uuid4
 from django.db import models
 from django.contrib.auth.models import BaseUserManager, AbstractBaseUser
@@ -14,6 +15,17 @@ def get_user_profile_path(instance, filename):
     return '/'.join([url, ymd_path, uuid_name + extension])
 
 
+NICKNAME_KEY_MAX_LENGTH = 100
+
+
+def normalize_nickname(value):
+    """
+    닉네임 검색 키 (NFKC 정규화 + 대소문자 구분 없음)
+    전각/반각, 조합형 한글 등 같은 글자를 같은 값으로 만든다.
+    """
+    return unicodedata.normalize('NFKC', value or '').casefold().strip()[:NICKNAME_KEY_MAX_LENGTH]
+
+
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **kwargs):
         if not email:
@@ -52,6 +64,8 @@ class User(AbstractBaseUser):
     )
     fullname = models.CharField(verbose_name='username', max_length=25, blank=True)  # 이름
     nickname = models.CharField(verbose_name='nickname', max_length=50, blank=True)  # 닉네임
+    # 닉네임 자동완성 검색 키 (save()에서 nickname으로 만든다, users.autocomplete)
+    nickname_key = models.CharField(max_length=NICKNAME_KEY_MAX_LENGTH, blank=True, editable=False)
     profile_image = models.ImageField(verbose_name='profile image', upload_to=get_user_profile_path, blank=True)
     email = models.EmailField(verbose_name='email address', max_length=255, unique=True)  # 이메일
     introduce = models.TextField(blank=True, null=True)  # 소개
@@ -61,6 +75,10 @@ class User(AbstractBaseUser):
     is_active = models.BooleanField(default=True)
     is_admin = models.BooleanField(default=False)
 
+    # 팔로우 수 캐시 (Follow 생성, 삭제시 users.signals에서 F()로 증감)
+    followers_count = models.PositiveIntegerField(default=0)  # 나를 팔로우 한 사용자 수
+    followings_count = models.PositiveIntegerField(default=0)  # 내가 팔로우 한 사용자 수
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -69,19 +87,47 @@ class User(AbstractBaseUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # cursor pagination 조회 키 (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='user_created_id_idx'),
+            # 닉네임 prefix 범위 조회 + 정렬 (users.autocomplete)
+            models.Index(fields=['nickname_key', 'id'], name='user_nickname_key_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
+    def save(self, *args, **kwargs):
+        self.nickname_key = normalize_nickname(self.nickname)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'nickname' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'nickname_key'}
+        super().save(*args, **kwargs)
+
     def get_full_name(self):
         return self.fullname
 
     def following_count(self):
-        return self.following.count()
-
-    def follower_list(self):
-        follower_users = Follow.objects.filter(following=self.id)
-        user_list = [i.follower.nickname for i in follower_users]
-        return user_list
+        """
+        Follow.following(팔로우 당한 user)이 본인인 row의 수
+        매번 COUNT 하지 않고 row에 저장된 값을 사용한다.
+        """
+        return self.followers_count
+
+    def follower_list(self, limit=None):
+        """
+        나를 팔로우 한 사용자 닉네임 (최근 팔로우 순서, JOIN 쿼리 1번)
+        팔로워가 많을 수 있기 때문에 응답에 넣을때는 limit(FOLLOW_PREVIEW_SIZE)을 주고 전체는 /followers/로 조회한다.
+        """
+        rows = Follow.objects.filter(following=self.id).order_by('-created_at', '-id')
+        return list(rows.values_list('follower__nickname', flat=True)[:limit])
+
+    def following_list(self, limit=None):
+        """내가 팔로우 한 사용자 닉네임 (최근 팔로우 순서, JOIN 쿼리 1번)"""
+        rows = Follow.objects.filter(follower=self.id).order_by('-created_at', '-id')
+        return list(rows.values_list('following__nickname', flat=True)[:limit])
 
     @property
     def is_staff(self):
@@ -108,3 +154,33 @@ class Follow(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # 팔로워/팔로잉 리스트 cursor pagination 조회 키
+            models.Index(fields=['following', '-created_at', '-id'], name='follow_following_created_idx'),
+            models.Index(fields=['follower', '-created_at', '-id'], name='follow_follower_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['following', 'follower'], name='follow_following_follower_unique'),
+        ]
+
+
+class FollowSuggestion(models.Model):
+    """
+    팔로우 추천 후보 (users.suggestions)
+    user가 팔로우 한 사용자들 중 mutual_count명이 candidate를 팔로우 하고 있다.
+    rebuild_follow_suggestions로 사용자별 상위 후보를 미리 계산하고, 팔로우/취소할때 증감한다.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='follow_suggestions')
+    candidate = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    mutual_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'candidate'], name='follow_suggestion_unique'),
+        ]
+        indexes = [
+            # 추천 조회 키 (user별 mutual_count 순서)
+            models.Index(fields=['user', '-mutual_count', 'candidate'], name='follow_suggestion_rank_idx'),
+        ]
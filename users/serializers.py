@@ -1,8 +1,16 @@
+from django.db.models import Exists, OuterRef
 from rest_framework import serializers
+from core.serializers import EagerLoadingMixin, SparseFieldsMixin
 from .models import User, Follow
 
+# UserSerializer가 실제로 사용하는 column (password, profile_image 등은 읽지 않는다.)
+# updated_at은 응답에는 없지만 조건부 GET(ETag/Last-Modified) 계산에 사용한다.
+USER_READ_FIELDS = (
+    'id', 'fullname', 'nickname', 'email', 'introduce', 'phone', 'gender', 'is_active', 'is_admin', 'updated_at',
+)
 
-class UserSerializer(serializers.Serializer):
+
+class UserSerializer(EagerLoadingMixin, SparseFieldsMixin, serializers.Serializer):
     """
     read_only_fields Serializer에서 어떻게 쓰는지 알기
     -> ModelSerializer가 아닌 Serializer를 사용할때 각 필드안에 read_only를 사용할 수 있는데,
@@ -19,6 +27,8 @@ class UserSerializer(serializers.Serializer):
     is_active = serializers.BooleanField(default=True)
     is_admin = serializers.BooleanField(default=False)
 
+    only_fields = USER_READ_FIELDS
+
     # def validate_email(self, value):
     #     """user 생성시 email에 대한 값이 unique인데 똑같은 값으로 생성시 예외 처리"""
     #     email = User.objects.filter(email__icontains=value).exists()
@@ -51,7 +61,10 @@ class UserSerializer(serializers.Serializer):
         instance.is_active = validated_data.get('is_active', instance.is_active)
         instance.is_admin = validated_data.get('is_admin', instance.is_admin)
 
-        instance.save()
+        # 팔로우 수는 F()로 따로 증감하기 때문에 수정한 column만 저장한다.
+        instance.save(update_fields=[
+            'fullname', 'nickname', 'email', 'introduce', 'phone', 'gender', 'is_active', 'is_admin', 'updated_at',
+        ])
         return instance
 
     def create(self, validated_data):
@@ -62,7 +75,19 @@ class UserSerializer(serializers.Serializer):
         return user
 
 
-class FollowSerializer(serializers.Serializer):
+class UserListSerializer(UserSerializer):
+    """사용자 리스트 조회 전용 serializer (내가 팔로우 하는 사용자인지 같이 응답한다.)"""
+    is_following = serializers.BooleanField(read_only=True, default=False)
+
+    @classmethod
+    def get_viewer_annotations(cls, viewer, fields=None, ref='pk'):
+        """Follow의 (following, follower) unique index"""
+        if viewer is None or not viewer.is_authenticated or not cls.is_selected('is_following', fields):
+            return {}
+        return {'is_following': Exists(Follow.objects.filter(following=OuterRef(ref), follower=viewer.pk))}
+
+
+class FollowSerializer(SparseFieldsMixin, serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     following = UserSerializer(read_only=True)
     follower = UserSerializer(read_only=True)
@@ -0,0 +1,57 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from config.authentication import invalidate_cached_user
+from core.cache import bump_version
+from core.counters import change_counter
+from . import graph, suggestions
+from .models import User, Follow
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    """내정보 수정/관리자 수정/탈퇴(비활성화)시 JWT 인증 cache, 상세 조회 cache에서 빼기"""
+    invalidate_cached_user(instance.pk)
+    bump_version(sender, instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+def increase_follow_counter(sender, instance, created, **kwargs):
+    if created:
+        change_counter(User, instance.following_id, 'followers_count', 1)
+        change_counter(User, instance.follower_id, 'followings_count', 1)
+        invalidate_cached_user(instance.following_id)
+        invalidate_cached_user(instance.follower_id)
+
+
+@receiver(post_delete, sender=Follow)
+def decrease_follow_counter(sender, instance, **kwargs):
+    """사용자 삭제로 인한 CASCADE 삭제에서도 호출된다."""
+    change_counter(User, instance.following_id, 'followers_count', -1)
+    change_counter(User, instance.follower_id, 'followings_count', -1)
+    invalidate_cached_user(instance.following_id)
+    invalidate_cached_user(instance.follower_id)
+
+
+@receiver(post_save, sender=Follow)
+def add_follow_suggestions(sender, instance, created, **kwargs):
+    """팔로우 추천 후보 증감"""
+    if created:
+        suggestions.follow_added(instance.follower_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Follow)
+def remove_follow_suggestions(sender, instance, **kwargs):
+    suggestions.follow_removed(instance.follower_id, instance.following_id)
+
+
+@receiver(post_save, sender=Follow)
+def add_follow_graph(sender, instance, created, **kwargs):
+    """팔로우 관계 index (users.graph) 반영"""
+    if created:
+        graph.publish(instance.follower_id, instance.following_id, True)
+
+
+@receiver(post_delete, sender=Follow)
+def remove_follow_graph(sender, instance, **kwargs):
+    graph.publish(instance.follower_id, instance.following_id, False)
@@ -0,0 +1,141 @@
+"""
+팔로우 추천 (/api/v1/users/suggestions/)
+
+내가 팔로우 한 사용자들이 팔로우 하는 사용자(친구의 친구)를 겹치는 수(mutual_count) 순서로 추천한다.
+조회할때 2단계 JOIN을 하지 않고 FollowSuggestion에 미리 저장한 후보를 (user, mutual_count) index로 읽는다.
+
+- rebuild(): 사용자별 상위 FOLLOW_SUGGESTION_SIZE 명을 다시 계산한다. (rebuild_follow_suggestions, 주기적으로 실행)
+- follow_added() / follow_removed(): 팔로우/취소할때 바뀌는 후보만 증감한다.
+  증가한 다음에는 사용자별 상위 FOLLOW_SUGGESTION_SIZE 명만 남긴다. (trim, rebuild와 같은 크기)
+  취소할때는 row를 새로 만들지 않는다. (사용자 삭제 CASCADE 중에도 호출되기 때문)
+
+증감한 값이 rebuild와 달라지는 경우 (다음 rebuild에서 정확해진다.)
+- 잘려서 없던 후보가 다시 올라오면 겹치는 수가 1부터 다시 시작한다.
+- 팔로워가 FOLLOW_SUGGESTION_FAN_OUT_LIMIT 명이 넘는 사용자가 팔로우 하면 앞의 FAN_OUT_LIMIT 명에게만 증가한다.
+  (팔로우 한 사용자가 팔로우 하는 사용자가 FAN_OUT_LIMIT 명이 넘으면 본인 후보는 증감하지 않고 rebuild 한다.)
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from .models import Follow, FollowSuggestion
+
+
+def followings(user_id):
+    """user가 팔로우 한 사용자 id (subquery)"""
+    return Follow.objects.filter(follower_id=user_id).values('following_id')
+
+
+def followers(user_id):
+    """user를 팔로우 한 사용자 id (subquery)"""
+    return Follow.objects.filter(following_id=user_id).values('follower_id')
+
+
+def candidates(user_id, size):
+    """user의 친구의 친구 중 겹치는 수 상위 size명 [(사용자 id, 겹치는 수), ...] (이미 팔로우 한 사용자, 본인 제외)"""
+    rows = Follow.objects.filter(follower_id__in=followings(user_id)).exclude(
+        following_id=user_id
+    ).exclude(following_id__in=followings(user_id)).values('following_id').annotate(
+        mutual=Count('follower_id', distinct=True)
+    ).order_by('-mutual', 'following_id')
+    return list(rows.values_list('following_id', 'mutual')[:size])
+
+
+def rebuild(user_ids=None):
+    """사용자별 추천 후보 다시 계산하기 (user_ids가 없으면 누군가를 팔로우 한 모든 사용자) -> 계산한 사용자 수"""
+    if user_ids is None:
+        user_ids = list(Follow.objects.order_by().values_list('follower_id', flat=True).distinct())
+        FollowSuggestion.objects.exclude(user_id__in=Follow.objects.values('follower_id')).delete()
+    count = 0
+    for user_id in user_ids:
+        rows = candidates(user_id, settings.FOLLOW_SUGGESTION_SIZE)
+        with transaction.atomic():
+            FollowSuggestion.objects.filter(user_id=user_id).delete()
+            FollowSuggestion.objects.bulk_create([
+                FollowSuggestion(user_id=user_id, candidate_id=candidate_id, mutual_count=mutual)
+                for candidate_id, mutual in rows
+            ])
+        count += 1
+    return count
+
+
+def increase(pairs, rows):
+    """(user, candidate) 후보의 겹치는 수 +1 (rows: pairs와 같은 row를 고르는 queryset)"""
+    if not pairs:
+        return
+    FollowSuggestion.objects.bulk_create(
+        [FollowSuggestion(user_id=user_id, candidate_id=candidate_id) for user_id, candidate_id in pairs],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    rows.update(mutual_count=F('mutual_count') + 1, updated_at=timezone.now())
+
+
+def trim(user_ids):
+    """사용자별로 겹치는 수 상위 FOLLOW_SUGGESTION_SIZE 명보다 뒤에 있는 후보 삭제"""
+    if not user_ids:
+        return
+    # 같은 사용자의 후보 중 순서(-mutual_count, candidate_id)가 앞에 있는 후보 수
+    ahead = FollowSuggestion.objects.filter(user_id=OuterRef('user_id')).filter(
+        Q(mutual_count__gt=OuterRef('mutual_count')) |
+        Q(mutual_count=OuterRef('mutual_count'), candidate_id__lt=OuterRef('candidate_id'))
+    ).order_by().values('user_id').annotate(count=Count('pk')).values('count')
+    trimmed = list(FollowSuggestion.objects.filter(user_id__in=user_ids).annotate(
+        rank=Subquery(ahead)
+    ).filter(rank__gte=settings.FOLLOW_SUGGESTION_SIZE).values_list('pk', flat=True))
+    if trimmed:
+        FollowSuggestion.objects.filter(pk__in=trimmed).delete()
+
+
+def decrease(rows):
+    rows.update(mutual_count=Greatest(F('mutual_count') - 1, 0), updated_at=timezone.now())
+    rows.filter(mutual_count=0).delete()
+
+
+def follow_added(follower_id, following_id):
+    """
+    follower가 following을 팔로우 했을때
+    - follower: following이 팔로우 하는 사용자들 +1, following은 후보에서 빼기
+    - follower를 팔로우 하는 사용자들: following +1
+    """
+    limit = settings.FOLLOW_SUGGESTION_FAN_OUT_LIMIT
+    FollowSuggestion.objects.filter(user_id=follower_id, candidate_id=following_id).delete()
+
+    # 잘렸는지 알 수 있도록 limit + 1명까지 읽는다.
+    targets = list(Follow.objects.filter(follower_id=following_id).exclude(following_id=follower_id).exclude(
+        following_id__in=followings(follower_id)
+    ).values_list('following_id', flat=True).distinct()[:limit + 1])
+    if len(targets) > limit:
+        rebuild([follower_id])
+    else:
+        increase(
+            [(follower_id, candidate_id) for candidate_id in targets],
+            FollowSuggestion.objects.filter(user_id=follower_id, candidate_id__in=targets),
+        )
+        trim([follower_id])
+
+    # 팔로워가 limit명이 넘으면 나머지는 다음 rebuild에서 반영된다.
+    fans = list(Follow.objects.filter(following_id=follower_id).exclude(follower_id=following_id).exclude(
+        follower_id__in=followers(following_id)
+    ).values_list('follower_id', flat=True).distinct()[:limit])
+    increase(
+        [(user_id, following_id) for user_id in fans],
+        FollowSuggestion.objects.filter(candidate_id=following_id, user_id__in=fans),
+    )
+    trim(fans)
+
+
+def follow_removed(follower_id, following_id):
+    """follow_added()의 반대 (following이 다시 후보가 되는 것은 다음 rebuild에서 반영된다.)"""
+    decrease(FollowSuggestion.objects.filter(user_id=follower_id, candidate_id__in=followings(following_id)))
+    decrease(FollowSuggestion.objects.filter(candidate_id=following_id, user_id__in=followers(follower_id)))
+
+
+def get_suggestions(user_id, limit):
+    """추천 후보 [FollowSuggestion(candidate 포함), ...] (index 조회 1번)"""
+    return list(
+        FollowSuggestion.objects.filter(user_id=user_id, candidate__is_active=True).select_related(
+            'candidate'
+        ).order_by('-mutual_count', 'candidate_id')[:limit]
+    )
@@ -6,8 +6,13 @@ app_name = 'users'
 urlpatterns = [
     path('', views.user_view),
     path('me/', views.me_view),
+    path('me/export/', views.export_view),
     path('search/', views.user_search),
+    path('autocomplete/', views.autocomplete_view),
+    path('suggestions/', views.suggestion_view),
     path('<int:pk>/', views.user_detail),
+    path('<int:pk>/followers/', views.follower_list_view),
+    path('<int:pk>/followings/', views.following_list_view),
     path('token/', views.login),
     path('follow/', views.follows_view),
     path('follow/<int:pk>/', views.follow_view),
@@ -1,22 +1,54 @@
 import jwt
+from django.db import IntegrityError, transaction
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from django.contrib.auth import authenticate
 from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_datetime
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
 from .permissions import IsSelf, IsFollow
 from .models import User, Follow
-from .serializers import UserSerializer, FollowSerializer
+from .serializers import UserSerializer, UserListSerializer, FollowSerializer
+from . import autocomplete, export, graph, suggestions
+from core import cache as detail_cache
+from core import conditional
 from core.error import error_controlloer
+from core.pagination import KeysetPagination, InvalidCursor
+from core.serializers import InvalidQueryParam
 
 
-class UserPagination(PageNumberPagination):
+class UserPagination(KeysetPagination):
     page_size = 20
 
 
+class FollowPagination(KeysetPagination):
+    """팔로워/팔로잉 리스트는 cursor 방식만 사용한다. (Follow의 (대상, created_at, id) index)"""
+    page_size = 20
+    cursor_only = True
+
+
+def user_detail_validators(pk):
+    """회원 정보 조회 ETag, Last-Modified (팔로워 수가 바뀌면 updated_at도 바뀐다.)"""
+    return conditional.query_validators(User.objects, pk, ('updated_at',))
+
+
+def user_detail_data(pk):
+    """회원 정보 조회 응답과 응답에 사용한 object 목록 (core.cache)"""
+    user = User.objects.get(pk=pk)
+    data = UserSerializer(user).data
+    data.update({
+        'following_count': user.following_count(),
+        'followings_count': user.followings_count,
+        'follower_users': user.follower_list(settings.FOLLOW_PREVIEW_SIZE),
+    })
+    return data, [(User, user.pk, user.updated_at)]
+
+
 users_response_schema_dict = {
     400: openapi.Schema(
         'error_response',
@@ -119,9 +151,10 @@ me_response_schema_dict = {
             "gender": openapi.Schema('성별(비공개:0, 남자:1, 여자:2)', type=openapi.TYPE_INTEGER),
             "is_active": openapi.Schema('계정 활성', type=openapi.TYPE_BOOLEAN),
             "is_admin": openapi.Schema('관리자', type=openapi.TYPE_BOOLEAN),
-            "following_count": openapi.Schema('팔로잉 수', type=openapi.TYPE_INTEGER),
+            "following_count": openapi.Schema('팔로워 수', type=openapi.TYPE_INTEGER),
+            "followings_count": openapi.Schema('팔로잉 수', type=openapi.TYPE_INTEGER),
             "follower_users": openapi.Schema(
-                '팔로잉 사용자(닉네임) 리스트',
+                '최근 팔로워(닉네임) 미리보기 (최대 FOLLOW_PREVIEW_SIZE명, 전체는 /followers/)',
                 type=openapi.TYPE_ARRAY,
                 items=openapi.Items(type=openapi.TYPE_STRING)
             )
@@ -252,7 +285,8 @@ def me_view(request):
             serializer = UserSerializer(request.user).data
             serializer.update({
                 'following_count': request.user.following_count(),
-                'follower_users': request.user.follower_list(),
+                'followings_count': request.user.followings_count,
+                'follower_users': request.user.follower_list(settings.FOLLOW_PREVIEW_SIZE),
             })
             return Response(serializer, status=status.HTTP_200_OK)
         elif request.method == 'PUT':
@@ -276,6 +310,107 @@ def me_view(request):
         return Response(response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+export_response_schema_dict = {
+    200: openapi.Schema(
+        'NDJSON(한줄에 JSON object 하나) 또는 CSV',
+        type=openapi.TYPE_STRING,
+        default='{"type":"post","id":1,"content":"...","lat":"37.500000","lng":"127.000000",...}'
+    ),
+    400: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_400_VALUE_NOT_VALID.get_error_code():
+                error_controlloer.APPLY_400_VALUE_NOT_VALID.get_error_description()
+        }
+    ),
+    403: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_403_FORBIDDEN.get_error_code():
+                error_controlloer.APPLY_403_FORBIDDEN.get_error_description()
+        }
+    ),
+    500: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_500_SERVER_ERROR.get_error_code():
+                error_controlloer.APPLY_500_SERVER_ERROR.get_error_description()
+        }
+    )
+}
+
+
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=[
+        openapi.Parameter(
+            'authorication',
+            openapi.IN_PATH,
+            type=openapi.TYPE_STRING,
+            description='API 키: 헤더에 Authorization Bearer {API Key} 형태로 전달'
+        ),
+        openapi.Parameter(
+            'output',
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            description='ndjson(기본값) / csv'
+        ),
+        openapi.Parameter(
+            'since',
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            description='이 시간 이후에 생성/수정된 데이터만 (ISO 8601, ex. 2021-07-01T00:00:00Z)'
+        ),
+    ],
+    responses=export_response_schema_dict
+)
+@api_view(['GET'])
+def export_view(request):
+    """
+    내 데이터 내보내기
+
+    ---
+    ## `/api/v1/users/me/export/`
+    **내가 작성한 게시물, 댓글, 좋아요를 streaming으로 내려준다.** (page 없이 한번에)
+
+        - output: ndjson(기본값) / csv
+        - since: 이 시간 이후에 생성/수정된 데이터만 (이전 내보내기 이후 바뀐 것만 받을때 사용)
+    """
+    try:
+        if not request.user.is_authenticated:
+            response_message = {'003': '자격 인증 데이터(JWT)가 조회되지 않습니다.'}
+            return Response(data=response_message, status=status.HTTP_403_FORBIDDEN)
+        export_format = request.GET.get('output', 'ndjson')
+        since = None
+        if 'since' in request.GET:
+            try:
+                since = parse_datetime(request.GET['since'])
+            except ValueError:
+                since = None
+            if since is None:
+                response_message = {'002': 'since 값이 유효하지 않습니다.'}
+                return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        if export_format not in export.EXPORT_FORMATS:
+            response_message = {'002': 'output 값이 유효하지 않습니다.'}
+            return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+
+        content_type = 'text/csv; charset=utf-8' if export_format == 'csv' else 'application/x-ndjson'
+        response = StreamingHttpResponse(
+            export.export_lines(request.user, export_format, since), content_type=content_type
+        )
+        response['Content-Disposition'] = f'attachment; filename="export-{request.user.pk}.{export_format}"'
+        return response
+    except Exception as e:
+        print(f'error : {e}')
+        response_message = {'999': '서버 에러'}
+        return Response(response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 search_response_schema_dict = {
     200: openapi.Schema(
         'response_data',
@@ -303,6 +438,7 @@ search_response_schema_dict = {
                         "gender": openapi.Schema('성별(비공개:0, 남자:1, 여자:2)', type=openapi.TYPE_INTEGER),
                         "is_active": openapi.Schema('계정 활성', type=openapi.TYPE_BOOLEAN),
                         "is_admin": openapi.Schema('관리자', type=openapi.TYPE_BOOLEAN),
+                        "is_following": openapi.Schema('내가 팔로우 하는 사용자인지 (로그인 안했으면 false)', type=openapi.TYPE_BOOLEAN),
                     }
                 )
             ),
@@ -342,16 +478,118 @@ def user_search(request):
     **아래 파라미터들은 URL query string으로 전달되어야 합니다.**
 
         - nickname: 사용자 닉네임
+        - cursor: cursor 방식 pagination 사용 (첫 page는 빈 값, 이후는 응답의 next 사용)
     '''
     try:
         user_nickname = request.GET.get('nickname', '')
         paginator = UserPagination()
-        user = User.objects.filter(nickname__contains=user_nickname)
+        fields = UserListSerializer.get_sparse_fields(request)
+        # 내가 팔로우 하는 사용자인지(is_following)는 page 쿼리에 Exists로 같이 읽는다.
+        user = UserListSerializer.setup_queryset(
+            User.objects.filter(nickname__contains=user_nickname), fields, request.user
+        )
         if user is None:
             user = User.objects.all()
         result = paginator.paginate_queryset(user, request)
-        serializer = UserSerializer(result, many=True)
-        return paginator.get_paginated_response(data=serializer.data)
+        etag, last_modified = conditional.page_validators(
+            result, (paginator.get_page_state(), fields, request.user.pk)
+        )
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        serializer = UserListSerializer(result, many=True, fields=fields)
+        response = paginator.get_paginated_response(data=serializer.data)
+        return conditional.with_validators(response, etag, last_modified)
+    except InvalidCursor:
+        response_message = {'002': 'cursor 값이 유효하지 않습니다.'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except InvalidQueryParam as e:
+        response_message = {'002': f'{e.param} 값이 유효하지 않습니다. ({", ".join(e.values)})'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        print(f'error : {e}')
+        response_message = {'999': '서버 에러'}
+        return Response(response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+autocomplete_response_schema_dict = {
+    200: openapi.Schema(
+        'response_data',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'results': openapi.Schema(
+                '닉네임이 q로 시작하는 사용자 (닉네임 순서)',
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Items(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'id': openapi.Schema('사용자 ID', type=openapi.TYPE_INTEGER),
+                        'nickname': openapi.Schema('사용자 닉네임', type=openapi.TYPE_STRING),
+                        'profile_image': openapi.Schema('프로필 이미지 주소 (없으면 null)', type=openapi.TYPE_STRING),
+                    }
+                )
+            ),
+        }
+    ),
+    400: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_400_NO_REQUIRED_PARAMETERS.get_error_code():
+                error_controlloer.APPLY_400_NO_REQUIRED_PARAMETERS.get_error_description(),
+            error_controlloer.APPLY_400_VALUE_NOT_VALID.get_error_code():
+                error_controlloer.APPLY_400_VALUE_NOT_VALID.get_error_description()
+        }
+    ),
+    500: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_500_SERVER_ERROR.get_error_code():
+                error_controlloer.APPLY_500_SERVER_ERROR.get_error_description()
+        }
+    )
+}
+
+
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=[
+        openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='입력한 닉네임 앞부분'),
+        openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='사용자 수 (기본값 10)'),
+    ],
+    responses=autocomplete_response_schema_dict
+)
+@api_view(['GET'])
+def autocomplete_view(request):
+    """
+    닉네임 자동완성
+
+    ---
+    ## `/api/v1/users/autocomplete/?q=`
+    ## Query Parameters
+    **닉네임이 q로 시작하는 사용자를 닉네임 순서로 limit명 보여준다. (대소문자, 전각/반각 구분 없음)**
+
+        - q: 입력한 닉네임 앞부분
+        - limit: 사용자 수 (기본값 NICKNAME_AUTOCOMPLETE_LIMIT, 최대 NICKNAME_AUTOCOMPLETE_MAX_LIMIT)
+
+    같은 입력을 다시 보내는 경우(지웠다가 다시 입력)는 client가 NICKNAME_AUTOCOMPLETE_MAX_AGE 초 동안 저장한 응답을 사용한다.
+    """
+    try:
+        prefix = request.GET.get('q', '')
+        if not prefix.strip():
+            response_message = {'000': '필수 파라미터(q) 없음'}
+            return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.GET.get('limit', settings.NICKNAME_AUTOCOMPLETE_LIMIT))
+        except ValueError:
+            response_message = {'002': '값이 유효하지 않습니다.'}
+            return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.NICKNAME_AUTOCOMPLETE_MAX_LIMIT))
+
+        response = Response(data={'results': autocomplete.search(prefix, limit)}, status=status.HTTP_200_OK)
+        patch_cache_control(response, max_age=settings.NICKNAME_AUTOCOMPLETE_MAX_AGE)
+        return response
     except Exception as e:
         print(f'error : {e}')
         response_message = {'999': '서버 에러'}
@@ -372,9 +610,10 @@ user_detail_schema_dict = {
             "gender": openapi.Schema('성별(비공개:0, 남자:1, 여자:2)', type=openapi.TYPE_INTEGER),
             "is_active": openapi.Schema('계정 활성', type=openapi.TYPE_BOOLEAN),
             "is_admin": openapi.Schema('관리자', type=openapi.TYPE_BOOLEAN),
-            "following_count": openapi.Schema('팔로잉 수', type=openapi.TYPE_INTEGER),
+            "following_count": openapi.Schema('팔로워 수', type=openapi.TYPE_INTEGER),
+            "followings_count": openapi.Schema('팔로잉 수', type=openapi.TYPE_INTEGER),
             "follower_users": openapi.Schema(
-                '팔로잉 사용자(닉네임) 리스트',
+                '최근 팔로워(닉네임) 미리보기 (최대 FOLLOW_PREVIEW_SIZE명, 전체는 /followers/)',
                 type=openapi.TYPE_ARRAY,
                 items=openapi.Items(type=openapi.TYPE_STRING)
             )
@@ -417,16 +656,112 @@ def user_detail(request, pk):
     '''
     try:
         if request.method == 'GET':
-            user = User.objects.get(pk=pk)
-            serializer = UserSerializer(user).data
-            serializer.update({
-                'following_count': user.following_count(),
-                'follower_users': user.follower_list(),
-            })
-            return Response(data=serializer, status=status.HTTP_200_OK)
+            fields = UserSerializer.get_sparse_fields(
+                request, extra_fields=('following_count', 'followings_count', 'follower_users')
+            )
+            return detail_cache.detail_response(
+                request, User, pk, lambda: user_detail_data(pk), lambda: user_detail_validators(pk), fields
+            )
     except User.DoesNotExist:
         response_message = {'004': '찾고자 하는 사용자가 없습니다.'}
         return Response(data=response_message, status=status.HTTP_404_NOT_FOUND)
+    except InvalidQueryParam as e:
+        response_message = {'002': f'{e.param} 값이 유효하지 않습니다. ({", ".join(e.values)})'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        print(f'error : {e}')
+        response_message = {'999': '서버 에러'}
+        return Response(response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+suggestion_response_schema_dict = {
+    200: openapi.Schema(
+        'response_data',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'results': openapi.Schema(
+                '추천 사용자 리스트 (겹치는 수 순서)',
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Items(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'id': openapi.Schema('사용자 ID', type=openapi.TYPE_INTEGER),
+                        'nickname': openapi.Schema('사용자 닉네임', type=openapi.TYPE_STRING),
+                        'mutual_count': openapi.Schema('내가 팔로우 한 사용자 중 이 사용자를 팔로우 하는 수', type=openapi.TYPE_INTEGER),
+                    }
+                )
+            ),
+        }
+    ),
+    400: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_400_VALUE_NOT_VALID.get_error_code():
+                error_controlloer.APPLY_400_VALUE_NOT_VALID.get_error_description()
+        }
+    ),
+    403: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_403_FORBIDDEN.get_error_code():
+                error_controlloer.APPLY_403_FORBIDDEN.get_error_description()
+        }
+    ),
+    500: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_500_SERVER_ERROR.get_error_code():
+                error_controlloer.APPLY_500_SERVER_ERROR.get_error_description()
+        }
+    )
+}
+
+
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=[
+        openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='사용자 수 (기본값 20)'),
+    ],
+    responses=suggestion_response_schema_dict
+)
+@api_view(['GET'])
+def suggestion_view(request):
+    """
+    팔로우 추천
+
+    ---
+    ## `/api/v1/users/suggestions/`
+    ## Query Parameters
+    **내가 팔로우 한 사용자들이 많이 팔로우 하는 사용자 순서로 보여준다. (미리 계산된 후보)**
+
+        - limit: 사용자 수 (기본값 20, 최대 FOLLOW_SUGGESTION_SIZE)
+        - fields / exclude: 응답할/뺄 field
+    """
+    try:
+        if not request.user.is_authenticated:
+            response_message = {'003': '자격 인증 데이터(JWT)가 조회되지 않습니다.'}
+            return Response(data=response_message, status=status.HTTP_403_FORBIDDEN)
+        try:
+            limit = int(request.GET.get('limit', 20))
+        except ValueError:
+            response_message = {'002': '값이 유효하지 않습니다.'}
+            return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.FOLLOW_SUGGESTION_SIZE))
+        fields = UserSerializer.get_sparse_fields(request, extra_fields=('mutual_count',))
+
+        results = []
+        for suggestion in suggestions.get_suggestions(request.user.pk, limit):
+            data = UserSerializer(suggestion.candidate, fields=fields).data
+            if fields is None or 'mutual_count' in fields:
+                data['mutual_count'] = suggestion.mutual_count
+            results.append(data)
+        return Response(data={'results': results}, status=status.HTTP_200_OK)
+    except InvalidQueryParam as e:
+        response_message = {'002': f'{e.param} 값이 유효하지 않습니다. ({", ".join(e.values)})'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         print(f'error : {e}')
         response_message = {'999': '서버 에러'}
@@ -690,19 +1025,26 @@ def follows_view(request):
                 return Response(data=response_message, status=status.HTTP_403_FORBIDDEN)
 
             serializer = FollowSerializer(data=request.data)
-            user = Follow.objects.filter(following=following, follower=request.user).first()
-
-            if not user:
-                if serializer.is_valid():
-                    follow = serializer.save(following=following, follower=request.user)
-                    follow_serializer = FollowSerializer(follow).data
-                    return Response(data=follow_serializer, status=status.HTTP_201_CREATED)
-                else:
-                    return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            unfollow_message = {'message': f'{following}님을 팔로우 취소 합니다.'}
+            # 팔로우 여부는 index(users.graph)로 확인하고 index가 늦게 반영된 경우는 삭제 결과/unique 제약으로 바로잡는다.
+            if graph.follows(request.user.pk, following.pk):
+                deleted, _ = Follow.objects.filter(following=following, follower=request.user).delete()
+                if deleted:
+                    return Response(data=unfollow_message, status=status.HTTP_200_OK)
+
+            if serializer.is_valid():
+                try:
+                    # Follow 생성과 양쪽 사용자의 팔로우 수 증가를 하나의 transaction으로 묶는다.
+                    with transaction.atomic():
+                        follow = serializer.save(following=following, follower=request.user)
+                except IntegrityError:
+                    # 이미 팔로우 하고 있었다.
+                    Follow.objects.filter(following=following, follower=request.user).delete()
+                    return Response(data=unfollow_message, status=status.HTTP_200_OK)
+                follow_serializer = FollowSerializer(follow).data
+                return Response(data=follow_serializer, status=status.HTTP_201_CREATED)
             else:
-                response_message = {'message': f'{following}님을 팔로우 취소 합니다.'}
-                user.delete()
-                return Response(data=response_message, status=status.HTTP_200_OK)
+                return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     except User.DoesNotExist:
         response_message = {'004': '찾고자 하는 사용자가 없습니다.'}
         return Response(data=response_message, status=status.HTTP_404_NOT_FOUND)
@@ -720,7 +1062,7 @@ follow_list_response_schema_dict = {
             'follower_nickname': openapi.Schema('사용자 닉네임', type=openapi.TYPE_STRING),
             'following_count': openapi.Schema('팔로우 수', type=openapi.TYPE_INTEGER),
             'following_nicknames': openapi.Schema(
-                '팔로우 한 사용자 리스트',
+                '최근 팔로워(닉네임) 미리보기 (최대 FOLLOW_PREVIEW_SIZE명, 전체는 /api/v1/users/{id}/followers/)',
                 type=openapi.TYPE_ARRAY,
                 items=openapi.Items(
                     type=openapi.TYPE_STRING
@@ -771,7 +1113,7 @@ def follow_view(request, pk):
             serializer = {
                 'follower_nickname': user.nickname,
                 'following_count': user.following_count(),
-                'following_nicknames': user.follower_list()
+                'following_nicknames': user.follower_list(settings.FOLLOW_PREVIEW_SIZE)
             }
             return Response(serializer, status=status.HTTP_200_OK)
     except User.DoesNotExist:
@@ -781,3 +1123,141 @@ def follow_view(request, pk):
         print(f'error : {e}')
         response_message = {'999': '서버 에러'}
         return Response(data=response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+follow_page_response_schema_dict = {
+    200: openapi.Schema(
+        'response_data',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'next': openapi.Schema('다음 page 주소 (없으면 null)', type=openapi.TYPE_STRING),
+            'results': openapi.Schema(
+                '사용자 리스트 (최근 팔로우 순서)',
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Items(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'id': openapi.Schema('사용자 ID', type=openapi.TYPE_INTEGER),
+                        'nickname': openapi.Schema('사용자 닉네임', type=openapi.TYPE_STRING),
+                        'followed_at': openapi.Schema('팔로우 한 시각', type=openapi.TYPE_STRING),
+                        'is_following': openapi.Schema('내가 팔로우 하는지 (로그인 했을때만)', type=openapi.TYPE_BOOLEAN),
+                    }
+                )
+            ),
+        }
+    ),
+    400: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_400_VALUE_NOT_VALID.get_error_code():
+                error_controlloer.APPLY_400_VALUE_NOT_VALID.get_error_description()
+        }
+    ),
+    404: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_404_NOT_FOUND.get_error_code():
+                error_controlloer.APPLY_404_NOT_FOUND.get_error_description()
+        }
+    ),
+    500: openapi.Schema(
+        'error_response',
+        type=openapi.TYPE_OBJECT,
+        properties={
+            error_controlloer.APPLY_500_SERVER_ERROR.get_error_code():
+                error_controlloer.APPLY_500_SERVER_ERROR.get_error_description()
+        }
+    )
+}
+
+follow_page_parameters = [
+    openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='이전 응답의 next에 들어있는 cursor'),
+]
+
+
+def follow_page(request, pk, target, other):
+    """
+    pk 사용자의 팔로우 관계(target) 상대방(other) 리스트
+    사용자 확인 1번 + (target, created_at, id) index를 타는 JOIN 쿼리 1번 (닉네임은 values로 같이 읽는다.)
+    """
+    if not User.objects.filter(pk=pk).exists():
+        raise User.DoesNotExist
+    queryset = Follow.objects.filter(**{target: pk}).values('id', 'created_at', f'{other}_id', f'{other}__nickname')
+    paginator = FollowPagination()
+    rows = paginator.paginate_queryset(queryset, request)
+    results = [
+        {'id': row[f'{other}_id'], 'nickname': row[f'{other}__nickname'], 'followed_at': row['created_at']}
+        for row in rows
+    ]
+    if request.user.is_authenticated:
+        # 맞팔로우 버튼 표시 (in-memory index, page 전체를 한번에 확인)
+        is_following = graph.follows_many(request.user.pk, [row['id'] for row in results])
+        for row in results:
+            row['is_following'] = is_following[row['id']]
+    return paginator.get_paginated_response(results)
+
+
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=follow_page_parameters,
+    responses=follow_page_response_schema_dict
+)
+@api_view(['GET'])
+def follower_list_view(request, pk):
+    """
+    팔로워 리스트
+
+    ---
+    **특정 사용자를 팔로우 한 사용자 리스트 (최근 팔로우 순서, cursor 방식)**
+    ## `/api/v1/users/{id}/followers/`
+    ## Query Parameters
+
+        - id: 사용자 id 값 (URL path)
+        - cursor: 이전 응답의 next에 들어있는 cursor (없으면 첫 page)
+    """
+    try:
+        return follow_page(request, pk, 'following', 'follower')
+    except User.DoesNotExist:
+        response_message = {'004': '찾고자 하는 사용자가 없습니다.'}
+        return Response(data=response_message, status=status.HTTP_404_NOT_FOUND)
+    except InvalidCursor:
+        response_message = {'002': 'cursor 값이 유효하지 않습니다.'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        print(f'error : {e}')
+        response_message = {'999': '서버 에러'}
+        return Response(data=response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=follow_page_parameters,
+    responses=follow_page_response_schema_dict
+)
+@api_view(['GET'])
+def following_list_view(request, pk):
+    """
+    팔로잉 리스트
+
+    ---
+    **특정 사용자가 팔로우 한 사용자 리스트 (최근 팔로우 순서, cursor 방식)**
+    ## `/api/v1/users/{id}/followings/`
+    ## Query Parameters
+
+        - id: 사용자 id 값 (URL path)
+        - cursor: 이전 응답의 next에 들어있는 cursor (없으면 첫 page)
+    """
+    try:
+        return follow_page(request, pk, 'follower', 'following')
+    except User.DoesNotExist:
+        response_message = {'004': '찾고자 하는 사용자가 없습니다.'}
+        return Response(data=response_message, status=status.HTTP_404_NOT_FOUND)
+    except InvalidCursor:
+        response_message = {'002': 'cursor 값이 유효하지 않습니다.'}
+        return Response(data=response_message, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        print(f'error : {e}')
+        response_message = {'999': '서버 에러'}
+        return Response(data=response_message, status=status.HTTP_500_INTERNAL_SERVER_ERROR)